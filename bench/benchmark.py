@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+#
+# Замеры скорости сборки датасета на синтетических каталогах разного объёма (см. synthetic.py).
+# Сеть не нужна: каталоги генерируются на месте.
+# Для каждого объёма (--rows) в папке <dir>/<rows>_<pastel_rows>_<seed> создаются каталоги (если их
+# там ещё нет), туда же копируются исходные коды src/*.py, и сборка выполняется в этой папке,
+# как в корне репозитория:
+#   - каждый этап по отдельности, в порядке зависимостей, без кэша и параллельности - время этапа;
+#   - вся сборка целиком (python src/compile_catalogs.py --force) - время от начала до конца.
+# Выходные файлы сборки сравниваются с эталоном - контрольными суммами, записанными ранее
+# ключом --save-golden. Так проверяется, что ускорение не изменило результат:
+#   python bench/benchmark.py --rows 1000 10000 100000 --save-golden golden.json   (до изменений)
+#   python bench/benchmark.py --rows 1000 10000 100000 --golden golden.json        (после)
+# По умолчанию в датасет берутся все звёзды (--vmag-limit 99), чтобы объём сборки рос с объёмом каталогов.
+# Ключ --json - записать результаты замеров в файл.
+#
+# Дмитрий Клыков, 2025. dyuk108.ru
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from synthetic import dirname_repo, generate
+
+# Выходные файлы, которые сравниваются с эталоном. Файл указателя обозначений (.npz) не сравнивается:
+# в архиве записано время создания.
+outputs_golden = ['dataset_bright_stars.csv', 'dataset_bright_stars_excel.csv', 'cross_bayer_hip.csv']
+
+# Папка с каталогами объёма rows (создаются, если их нет).
+def prepare(dirname, rows, pastel_rows, seed):
+    root = os.path.join(dirname, f'{rows}_{pastel_rows}_{seed}')
+    marker = os.path.join(root, 'synthetic.json') # признак того, что каталоги созданы полностью
+    seconds = None
+    if not os.path.isfile(marker):
+        t = time.perf_counter()
+        generate(root, rows, pastel_rows, seed)
+        seconds = time.perf_counter() - t
+        with open(marker, 'w') as f:
+            json.dump({'rows': rows, 'pastel_rows': pastel_rows, 'seed': seed}, f)
+    for name in os.listdir(os.path.join(dirname_repo, 'src')):
+        if name.endswith('.py'):
+            shutil.copy(os.path.join(dirname_repo, 'src', name), os.path.join(root, 'src'))
+    return root, seconds
+
+# Время каждого этапа (выполняется в отдельном процессе в папке root, см. time_stages).
+def run_stages(root, args):
+    command = [sys.executable, os.path.abspath(__file__), '--time-stages', root, '--vmag-limit', str(args.vmag_limit), \
+        '--formats', args.formats]
+    result = subprocess.run(command, cwd=root, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f'Ошибка при замере этапов:\n{result.stderr}')
+    return json.loads(result.stdout.splitlines()[-1])
+
+# Время сборки целиком.
+def run_build(root, args):
+    command = [sys.executable, 'src/compile_catalogs.py', '--force', '--vmag-limit', str(args.vmag_limit), \
+        '--formats', args.formats, '--jobs', str(args.jobs)]
+    if args.stream:
+        command.append('--stream')
+    t = time.perf_counter()
+    result = subprocess.run(command, cwd=root, capture_output=True, text=True)
+    seconds = time.perf_counter() - t
+    if result.returncode != 0:
+        raise RuntimeError(f'Ошибка сборки:\n{result.stderr}')
+    return seconds
+
+# Контрольные суммы выходных файлов сборки.
+def output_hashes(root):
+    hashes = dict()
+    for name in outputs_golden:
+        with open(os.path.join(root, name), 'rb') as f:
+            hashes[name] = hashlib.sha1(f.read()).hexdigest()
+    return hashes
+
+# Замер этапов - выполняется в папке с каталогами (модуль compile_catalogs читает файлы
+# по путям от текущей папки). Результат (секунды по этапам) выводится строкой JSON.
+def time_stages(root, vmag_limit, formats):
+    os.chdir(root)
+    sys.path.insert(0, os.path.join(root, 'src'))
+    from compile_catalogs import Pipeline
+    params = {'vmag_limit': vmag_limit, 'teff_method': 'mean', 'teff_stats': False, 'pastel_crossmatch': 0, 'pastel_names': False, \
+        'formats': formats.split(','), 'epochs': []}
+    pipeline = Pipeline(tempfile.mkdtemp(), True, params)
+    todo = [] # этапы в порядке зависимостей
+    pipeline.plan('write', todo)
+    seconds = dict()
+    for name in todo:
+        t = time.perf_counter()
+        pipeline.run(name)
+        seconds[name] = time.perf_counter() - t
+    shutil.rmtree(pipeline.cache_dir)
+    print(json.dumps(seconds))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Замеры скорости сборки датасета на синтетических каталогах.')
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000], \
+        help='объёмы каталога Hipparcos (по умолчанию 1000 10000 100000, не больше 999999)')
+    parser.add_argument('--pastel-rows', type=int, nargs='+', default=None, \
+        help='кол-во строк PASTEL для каждого объёма (по умолчанию половина rows)')
+    parser.add_argument('--seed', type=int, default=1, help='начальное значение генератора случайных чисел')
+    parser.add_argument('--dir', default=None, help='папка для каталогов (по умолчанию временная, удаляется)')
+    parser.add_argument('--vmag-limit', type=float, default=99, help='предельная звёздная величина (по умолчанию все звёзды)')
+    parser.add_argument('--formats', default='csv,excel', help='форматы датасета (как в compile_catalogs.py)')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help='кол-во процессов при сборке целиком')
+    parser.add_argument('--stream', action='store_true', help='сборка целиком - в потоковом режиме')
+    parser.add_argument('--golden', default=None, help='сравнить выходные файлы с эталоном из файла')
+    parser.add_argument('--save-golden', default=None, help='записать контрольные суммы выходных файлов как эталон')
+    parser.add_argument('--json', default=None, help='записать результаты замеров в файл')
+    parser.add_argument('--time-stages', default=None, help=argparse.SUPPRESS) # внутренний режим, см. time_stages
+    args = parser.parse_args()
+
+    if args.time_stages:
+        time_stages(args.time_stages, args.vmag_limit, args.formats)
+        sys.exit()
+
+    pastel_rows = args.pastel_rows or [rows // 2 for rows in args.rows]
+    if len(pastel_rows) != len(args.rows):
+        parser.error('--pastel-rows: нужно столько же значений, сколько в --rows')
+    dirname = args.dir or tempfile.mkdtemp(prefix='bench_')
+    golden = dict()
+    if args.golden:
+        with open(args.golden) as f:
+            golden = json.load(f)
+
+    results = []
+    failed = False
+    for rows, pastel in zip(args.rows, pastel_rows):
+        root, generated = prepare(dirname, rows, pastel, args.seed)
+        stages_seconds = run_stages(root, args)
+        build = run_build(root, args)
+        hashes = output_hashes(root)
+        key = f'{rows}_{pastel}_{args.seed}_{args.vmag_limit}'
+        results.append({'rows': rows, 'pastel_rows': pastel, 'seed': args.seed, 'generate': generated, \
+            'stages': stages_seconds, 'build': build, 'outputs': hashes})
+
+        print(f'Hipparcos {rows}, PASTEL {pastel}:' + (f' каталоги созданы за {generated:.2f} с' if generated else ''))
+        for name, seconds in stages_seconds.items():
+            print(f'  {name:<12}{seconds:9.3f} с')
+        print(f'  {"всего":<12}{sum(stages_seconds.values()):9.3f} с')
+        print(f'  {"сборка":<12}{build:9.3f} с (--jobs {args.jobs}{", --stream" if args.stream else ""})')
+        if args.golden:
+            if not key in golden:
+                print('  эталона для этого объёма нет')
+            else:
+                diff = [name for name in outputs_golden if golden[key].get(name) != hashes[name]]
+                print(f'  отличается от эталона: {", ".join(diff)}' if diff else '  совпадает с эталоном')
+                failed |= bool(diff)
+
+    if args.save_golden:
+        saved = dict()
+        if os.path.isfile(args.save_golden):
+            with open(args.save_golden) as f:
+                saved = json.load(f)
+        for result in results:
+            saved[f'{result["rows"]}_{result["pastel_rows"]}_{result["seed"]}_{args.vmag_limit}'] = result['outputs']
+        with open(args.save_golden, 'w') as f:
+            json.dump(saved, f, indent=1)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=1)
+    if not args.dir:
+        shutil.rmtree(dirname)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,333 @@
+# -*- coding: utf-8 -*-
+#
+# Генератор синтетических исходных каталогов для замеров скорости сборки датасета на разных объёмах.
+# Файлы записываются в тех же форматах, что и настоящие каталоги (те же байты полей, что читает
+# compile_catalogs.py), в папку root так же, как в корне репозитория:
+#   src/hipparcos/hip_main.dat - Hipparcos (поля разделены "|", как в оригинале);
+#   src/hipparcos/ident5.doc - обозначения переменных звёзд;
+#   src/cross/catalog.dat - IV/27A Cross Index (HD, HIP, Флемстид, Байер);
+#   src/pastel/pastel.dat - PASTEL: несколько измерений Teff на звезду, обозначения HIP, HD,
+#                           по Байеру (как в SIMBAD) и BD (такие находятся только по координатам);
+#   src/my_data/star_names_wiki_rus.csv - имена звёзд;
+#   src/my_data/constellations.csv - список созвездий (копия из репозитория);
+#   src/boundaries/*.txt - границы созвездий в формате файлов IAU. Границы условные: полярные
+#                          шапки М. Медведицы и Октанта, остальные созвездия - участки полос по склонению.
+# Данные случайные, но воспроизводимые: при тех же rows, pastel_rows и seed файлы совпадают побайтно.
+# Строки не форматируются по одной: порция строк - матрица байтов (строки x ширина строки),
+# поля заполняются сразу для всей порции (класс Lines), так что и 10^7 строк PASTEL пишутся быстро.
+# Поле HIP в Hipparcos - 6 цифр, поэтому звёзд Hipparcos не больше 999999; большие объёмы -
+# за счёт PASTEL (pastel_rows).
+#
+# Из корня репозитория:
+#   python bench/synthetic.py /tmp/bench --rows 100000
+#   python bench/synthetic.py /tmp/bench --rows 1000000 --pastel-rows 10000000
+#
+# Дмитрий Клыков, 2025. dyuk108.ru
+
+import argparse
+import os
+import shutil
+import numpy as np
+
+# Папка репозитория (отсюда берётся список созвездий).
+dirname_repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+filename_constell = os.path.join(dirname_repo, 'src', 'my_data', 'constellations.csv')
+
+max_hip = 999999 # поле HIP - 6 цифр
+chunk_size = 1 << 18 # строк Hipparcos в порции (от него зависят случайные числа - не менять)
+
+greek = ['alf', 'bet', 'gam', 'del', 'eps', 'zet', 'eta', 'the', 'iot', 'kap', 'lam', 'mu.']
+sp_classes = ['O', 'B', 'A', 'F', 'G', 'K', 'M']
+sp_luminosity = ['V', 'III', 'II-III', 'Ia', 'IV/V', 'e', 'V+...', '']
+
+# Строки файла фиксированной ширины - матрица байтов. Поля задаются, как в compile_catalogs.py:
+# первый и последний байт, байты с 1.
+class Lines:
+    def __init__(self, n, width):
+        self.data = np.full((n, width + 1), 32, dtype=np.uint8)
+        self.data[:, -1] = 10 # перевод строки
+
+    def __len__(self):
+        return self.data.shape[0]
+
+    # Заполнение поля start..end байтами values (матрица строки x ширина поля, см. number и text).
+    # rows - только эти строки (тогда в values - строки только для них).
+    def put(self, start, end, values, rows = None):
+        if rows is None:
+            self.data[:, start - 1 : end] = values
+        else:
+            self.data[rows, start - 1 : end] = values
+
+    # Символ в байте pos всех строк (например, разделитель "|").
+    def fill(self, pos, char):
+        self.data[:, pos - 1] = ord(char)
+
+    def write(self, f):
+        f.write(self.data.tobytes())
+
+# Числа в виде байтов поля шириной width: decimals знаков после точки, plus - знак "+" у положительных,
+# zeros - ведущие нули (как в формате '%012.8f'). NaN - пустое поле.
+# Как в Hipparcos, если отрицательное число не помещается, ноль перед точкой опускается: -.03
+def number(values, width, decimals = 0, plus = False, zeros = False):
+    values = np.asarray(values, dtype=float)
+    blank = ~np.isfinite(values)
+    negative = values < 0
+    out = np.full((values.size, width), 32, dtype=np.uint8)
+    q = np.rint(np.abs(np.where(blank, 0, values)) * 10 ** decimals).astype(np.int64)
+
+    col = width - 1
+    for i in range(decimals):
+        out[:, col] = 48 + q % 10
+        q //= 10
+        col -= 1
+    if decimals > 0:
+        out[:, col] = ord('.')
+        col -= 1
+
+    # Целая часть: хотя бы одна цифра, с ведущими нулями - до знака.
+    signed = plus | negative
+    last = 1 if zeros and (plus or negative.any()) else 0 # самый левый байт для цифр при zeros
+    units = col # байт единиц
+    digits = np.zeros(values.size, dtype=np.int64) # кол-во цифр целой части
+    while col >= last:
+        write = (digits == 0) | (q > 0) | zeros
+        out[write, col] = 48 + q[write] % 10
+        digits += write
+        q //= 10
+        col -= 1
+        if not zeros and not (q > 0).any():
+            break
+    if (q > 0).any():
+        raise ValueError(f'Число не помещается в поле шириной {width}.')
+
+    pos = np.where(zeros, last - 1, units - digits) # байт знака
+    drop = signed & (pos < 0) & (digits == 1) & (out[np.arange(values.size), units] == 48)
+    pos = np.where(drop, units, pos) # -0.03 -> -.03
+    if (signed & (pos < 0)).any():
+        raise ValueError(f'Число со знаком не помещается в поле шириной {width}.')
+    rows = np.flatnonzero(signed)
+    out[rows, pos[rows]] = np.where(negative[rows], ord('-'), ord('+'))
+    out[blank] = 32
+    return out
+
+# Строки в виде байтов поля шириной width, по левому краю (длинные обрезаются).
+def text(values, width):
+    s = np.asarray(values).astype(f'S{width}')
+    out = s.view(np.uint8).reshape(s.size, width).copy()
+    out[out == 0] = 32
+    return out
+
+# Сокращённые названия созвездий из списка созвездий.
+def constellations():
+    with open(filename_constell, encoding='utf-8') as f:
+        return [s.split(',')[0] for s in f.read().splitlines()[1:] if s.strip() != '']
+
+# Звёзды порции Hipparcos: номера HIP с first по first + n - 1. Результат - словарь полей (массивы).
+def make_stars(rng, first, n):
+    stars = dict()
+    stars['HIP'] = np.arange(first, first + n)
+    RA = rng.uniform(0, 360, n)
+    Dec = np.degrees(np.arcsin(rng.uniform(-1, 1, n))) # равномерно по сфере
+    # В условных границах звёзды у полюса с RA > 270 не попадают в М. Медведицу - сдвигаем.
+    RA = np.where((Dec > 80) & (RA > 270), RA - 200, RA)
+    stars['RA'] = np.round(RA, 8)
+    stars['Dec'] = np.round(Dec, 8)
+    # Распределение звёздных величин - примерно как в Hipparcos: до 6,5m - около 7% звёзд.
+    stars['Vmag'] = np.round(np.clip(rng.normal(8.3, 1.2, n), -1.46, 14), 2)
+    stars['Vmag'][rng.random(n) < 1e-5] = np.nan # как HIP 120412 - без Vmag
+    stars['VarFlag'] = np.where(rng.random(n) < 0.2, rng.integers(2, 4, n), np.nan)
+    stars['has_deg'] = rng.random(n) > 0.01 # RAdeg, DEdeg есть не во всех строках
+    astrometry = rng.random(n) > 0.002
+    stars['Plx'] = np.where(astrometry, np.round(rng.lognormal(1.5, 1, n).clip(-2, 300), 2), np.nan)
+    stars['pmRA'] = np.where(astrometry, np.round(rng.normal(0, 80, n).clip(-9999, 9999), 2), np.nan)
+    stars['pmDE'] = np.where(astrometry, np.round(rng.normal(0, 80, n).clip(-9999, 9999), 2), np.nan)
+    stars['B-V'] = np.where(astrometry, np.round(rng.uniform(-0.3, 2.2, n), 3), np.nan)
+    stars['V-I'] = np.where(astrometry, np.round(rng.uniform(-0.4, 4.9, n), 2), np.nan)
+    stars['Ncomp'] = np.where(astrometry, rng.choice([1, 1, 1, 2], n), np.nan)
+    stars['Period'] = np.where(rng.random(n) < 0.05, np.round(rng.uniform(0.1, 900, n), 2), np.nan)
+    stars['HvarType'] = np.where(rng.random(n) < 0.6, rng.choice(list('CDMPRU'), n), '')
+    stars['MultFlag'] = np.where(rng.random(n) < 0.1, rng.choice(list('CGOXV'), n), '')
+    stars['m_HIP'] = np.where(rng.random(n) < 0.1, 'AB', '')
+    # HD - разные у разных звёзд, не больше 359083 (как в каталоге HD).
+    HD = 3 * stars['HIP'] - rng.integers(0, 3, n)
+    stars['HD'] = np.where((HD <= 359083) & (rng.random(n) > 0.001), HD, 0)
+    stars['SpType'] = np.char.add(np.char.add(rng.choice(sp_classes, n), rng.integers(0, 10, n).astype(str)), \
+        rng.choice(sp_luminosity, n))
+    return stars
+
+# Строки Hipparcos (hip_main.dat).
+def hip_lines(stars):
+    n = stars['HIP'].size
+    lines = Lines(n, 450)
+    lines.fill(1, 'H')
+    for pos in (2, 15, 17, 29, 41, 47, 49, 51, 64, 77, 79, 87, 96, 105, 252, 265, 321, 323, 346, 348, 355, 397, 448):
+        lines.fill(pos, '|')
+    lines.put(9, 14, number(stars['HIP'], 6))
+
+    # RA в Ч М С (сотые доли секунды), Dec в Г М С (десятые доли секунды).
+    t = np.rint(stars['RA'] / 15 * 360000).astype(np.int64) % 8640000
+    lines.put(18, 19, number(t // 360000, 2, zeros=True))
+    lines.put(21, 22, number(t // 6000 % 60, 2, zeros=True))
+    lines.put(24, 28, number(t % 6000 / 100, 5, 2, zeros=True))
+    t = np.rint(np.abs(stars['Dec']) * 36000).astype(np.int64)
+    lines.put(30, 30, text(np.where(stars['Dec'] < 0, '-', '+'), 1))
+    lines.put(31, 32, number(t // 36000, 2, zeros=True))
+    lines.put(34, 35, number(t // 600 % 60, 2, zeros=True))
+    lines.put(37, 40, number(t % 600 / 10, 4, 1, zeros=True))
+
+    lines.put(42, 46, number(stars['Vmag'], 5, 2))
+    lines.put(48, 48, number(stars['VarFlag'], 1))
+    lines.put(52, 63, number(np.where(stars['has_deg'], stars['RA'], np.nan), 12, 8, zeros=True))
+    lines.put(65, 76, number(np.where(stars['has_deg'], stars['Dec'], np.nan), 12, 8, plus=True, zeros=True))
+    lines.put(80, 86, number(stars['Plx'], 7, 2))
+    lines.put(88, 95, number(stars['pmRA'], 8, 2))
+    lines.put(97, 104, number(stars['pmDE'], 8, 2))
+    lines.put(246, 251, number(stars['B-V'], 6, 3))
+    lines.put(261, 264, number(stars['V-I'], 4, 2))
+    lines.put(314, 320, number(stars['Period'], 7, 2))
+    lines.put(322, 322, text(stars['HvarType'], 1))
+    lines.put(344, 345, number(stars['Ncomp'], 2))
+    lines.put(347, 347, text(stars['MultFlag'], 1))
+    lines.put(353, 354, text(stars['m_HIP'], 2))
+    lines.put(391, 396, number(np.where(stars['HD'] > 0, stars['HD'], np.nan), 6))
+    lines.put(436, 447, text(stars['SpType'], 12))
+    return lines
+
+# Строки Cross Index (catalog.dat) - для 70% звёзд.
+def cross_lines(rng, stars, csts):
+    n = stars['HIP'].size
+    rows = np.flatnonzero(rng.random(n) < 0.7)
+    m = rows.size
+    lines = Lines(m, 77)
+    lines.put(1, 6, number(np.where(stars['HD'][rows] > 0, stars['HD'][rows], np.nan), 6))
+    lines.put(32, 37, number(stars['HIP'][rows], 6))
+    lines.put(65, 67, number(np.where(rng.random(m) < 0.4, rng.integers(1, 141, m), np.nan), 3))
+    bayer = np.char.add(rng.choice(greek, m), rng.choice(['', '01', '02'], m))
+    lines.put(69, 73, text(np.where(rng.random(m) < 0.3, bayer, ''), 5))
+    lines.put(75, 77, text(rng.choice(csts, m), 3))
+    return lines
+
+# Строки ident5.doc (обозначения переменных звёзд) - для 15% звёзд. Формат: "V1234_Ori  |  1234"
+def var_lines(rng, stars, csts):
+    rows = np.flatnonzero(rng.random(stars['HIP'].size) < 0.15)
+    names = np.char.add(np.char.add('V', stars['HIP'][rows].astype(str)), np.char.add('_', rng.choice(csts, rows.size)))
+    lines = Lines(rows.size, 18)
+    lines.put(1, 11, text(names, 11))
+    lines.fill(12, '|')
+    lines.put(13, 18, number(stars['HIP'][rows], 6))
+    return lines
+
+# Строки PASTEL (pastel.dat): m измерений для случайных звёзд порции.
+def pastel_lines(rng, stars, csts, m):
+    n = stars['HIP'].size
+    star = rng.integers(0, n, m) if n > 0 else np.zeros(0, dtype=np.int64)
+    HIP = stars['HIP'][star]
+    HD = stars['HD'][star]
+    kind = rng.random(m)
+    IDs = np.where(kind < 0.4, np.char.add('HIP ', HIP.astype(str)), np.char.add('HD ', HD.astype(str)))
+    IDs = np.where((kind >= 0.4) & (kind < 0.8) & (HD == 0), np.char.add('HIP ', HIP.astype(str)), IDs)
+    bayer = np.char.add(np.char.add('* ', rng.choice(greek, m)), np.char.add(rng.choice([' ', '  '], m), rng.choice(csts, m)))
+    IDs = np.where((kind >= 0.8) & (kind < 0.9), bayer, IDs)
+    # BD - обозначения, которых нет в указателе: звезда находится только по координатам.
+    IDs = np.where(kind >= 0.9, np.char.add('BD+', HIP.astype(str)), IDs)
+
+    lines = Lines(m, 160)
+    lines.put(1, 33, text(IDs, 33))
+    offset = rng.normal(0, 2 / 3600, (2, m)) # несколько угловых секунд
+    Dec = np.clip(stars['Dec'][star] + offset[1], -90, 90)
+    RA = (stars['RA'][star] + offset[0] / np.maximum(np.cos(np.radians(Dec)), 0.01)) % 360
+    lines.put(35, 49, number(RA, 15, 8))
+    lines.put(51, 65, number(Dec, 15, 8))
+    lines.put(83, 88, number(np.round(stars['Vmag'][star] + rng.normal(0, 0.05, m), 2), 6, 2))
+    # Teff: бывают пустые и ошибочные (7) значения, как в настоящем каталоге.
+    Teff = np.rint(np.clip(rng.lognormal(np.log(5800), 0.35, m), 2500, 40000))
+    Teff = np.where(rng.random(m) < 0.1, np.nan, Teff)
+    Teff = np.where(rng.random(m) < 0.001, 7, Teff)
+    lines.put(141, 145, number(Teff, 5))
+    return lines
+
+# Имена звёзд: для каждой сотой звезды ярче 6,5m (но не больше 500). bright - номера HIP таких звёзд.
+def write_names(filename, bright):
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.write('HIP,Name_r,Name,Bayer\n')
+        for HIP in bright[::100][:500]:
+            f.write(f'{HIP},Звезда{HIP},Star{HIP},α And\n')
+
+# Точка границы в формате файлов IAU: "22 57 51.6729| 35.1682358|AND"
+def boundary_point(RA, Dec, abbr):
+    t = round(RA % 360 / 15 * 3600 * 10000) % (24 * 3600 * 10000) # десятитысячные доли секунды
+    ss = t % 600000
+    return f'{t // 36000000:02d} {t // 600000 % 60:02d} {ss // 10000:02d}.{ss % 10000:04d}|{Dec:+11.7f}|{abbr.upper()}\n'
+
+# Условные границы созвездий: полярные шапки (М. Медведица и Октант - до ±80°),
+# остальные (и две части Змеи) - участки 8 полос по склонению шириной 20°.
+def write_boundaries(dirname, csts):
+    os.makedirs(dirname, exist_ok=True)
+    polygons = dict()
+    polygons['umi'] = [(120 + 15 * i, 80) for i in range(16)] + [(0, 80), (30, 80), (60, 80), (90, 80)]
+    polygons['oct'] = [(210 + 15 * i, -80) for i in range(11)] + [(0, -80), (60, -80), (120, -80), (180, -80)]
+    parts = []
+    for abbr in csts:
+        if abbr == 'Ser':
+            parts += ['ser1', 'ser2']
+        elif not abbr in ('UMi', 'Oct'):
+            parts.append(abbr.lower())
+    counts = [11] * 7 + [10]
+    for band, count in enumerate(counts):
+        segments = parts[sum(counts[:band]) : sum(counts[:band]) + count]
+        if segments[0] == 'uma': # первый участок проходит через 0h (для Б. Медведицы так нельзя)
+            segments[0], segments[1] = segments[1], segments[0]
+        Dec1, Dec2 = -80 + 20 * band, -60 + 20 * band
+        width = 360 / count
+        for i, name in enumerate(segments):
+            RA1 = 3 - width / 2 + i * width
+            RA2 = RA1 + width
+            points = [(RA1 + (RA2 - RA1) * j / 12, Dec1) for j in range(13)] + \
+                [(RA2, Dec1 + (Dec2 - Dec1) * j / 4) for j in range(1, 5)] + \
+                [(RA2 - (RA2 - RA1) * j / 12, Dec2) for j in range(1, 13)] + \
+                [(RA1, Dec2 - (Dec2 - Dec1) * j / 4) for j in range(1, 4)]
+            polygons[name] = points
+    for name, points in polygons.items():
+        with open(os.path.join(dirname, name + '.txt'), 'w') as f:
+            for RA, Dec in points:
+                f.write(boundary_point(RA, Dec, name[:3]))
+            f.write('\n')
+
+# Все исходные файлы в папке root. rows - звёзд Hipparcos, pastel_rows - строк PASTEL.
+def generate(root, rows, pastel_rows = None, seed = 1):
+    if rows > max_hip:
+        raise ValueError(f'Звёзд Hipparcos не может быть больше {max_hip} (поле HIP - 6 цифр).')
+    if pastel_rows is None:
+        pastel_rows = rows // 2
+    for dirname in ('hipparcos', 'cross', 'pastel', 'my_data'):
+        os.makedirs(os.path.join(root, 'src', dirname), exist_ok=True)
+    csts = constellations()
+    shutil.copy(filename_constell, os.path.join(root, 'src', 'my_data'))
+    write_boundaries(os.path.join(root, 'src', 'boundaries'), csts)
+
+    rng = np.random.default_rng(seed)
+    bright = [] # звёзды ярче 6,5m (для списка имён)
+    files = {name: open(os.path.join(root, 'src', *name.split('/')), 'wb') \
+        for name in ('hipparcos/hip_main.dat', 'cross/catalog.dat', 'hipparcos/ident5.doc', 'pastel/pastel.dat')}
+    for first in range(1, rows + 1, chunk_size):
+        n = min(chunk_size, rows + 1 - first)
+        stars = make_stars(rng, first, n)
+        hip_lines(stars).write(files['hipparcos/hip_main.dat'])
+        cross_lines(rng, stars, csts).write(files['cross/catalog.dat'])
+        var_lines(rng, stars, csts).write(files['hipparcos/ident5.doc'])
+        # Строки PASTEL делятся между порциями пропорционально числу звёзд.
+        m = pastel_rows * (first - 1 + n) // rows - pastel_rows * (first - 1) // rows
+        pastel_lines(rng, stars, csts, m).write(files['pastel/pastel.dat'])
+        bright += stars['HIP'][stars['Vmag'] <= 6.5].tolist()
+    for f in files.values():
+        f.close()
+    write_names(os.path.join(root, 'src', 'my_data', 'star_names_wiki_rus.csv'), bright)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Синтетические исходные каталоги для замеров скорости сборки.')
+    parser.add_argument('root', help='папка, в которой создаётся src/ с каталогами')
+    parser.add_argument('--rows', type=int, default=100000, help=f'кол-во звёзд Hipparcos (не больше {max_hip})')
+    parser.add_argument('--pastel-rows', type=int, default=None, help='кол-во строк PASTEL (по умолчанию половина rows)')
+    parser.add_argument('--seed', type=int, default=1, help='начальное значение генератора случайных чисел')
+    args = parser.parse_args()
+    generate(args.root, args.rows, args.pastel_rows, args.seed)
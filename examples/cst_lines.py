@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+#
+# Линии созвездий ("фигуры") для карт неба: пары звёзд из examples/cst_lines.csv (HIP1, HIP2, Cst)
+# соединяются с датасетом одним слиянием таблиц, без поиска каждой звезды по отдельности.
+# Результат - массив отрезков (кол-во, 2 точки, x и y) для одной коллекции линий matplotlib:
+#   ax.add_collection(LineCollection(cst_segments(df, 'RAdeg', 'DEdeg'), colors='#ffffff'))
+# Координаты отрезков - как на картах примеров: долгота (RA или галактическая l) в радианах, растёт влево,
+# 0 посередине карты (см. lon2x), широта - в радианах. Отрезок, пересекающий край карты (долгота 180°),
+# разрезается на два - до края с одной стороны и от края с другой.
+# Отрезки вычисляются один раз для каждой проекции (полей координат) и тех же координат звёзд.
+# Клыков Д.Ю., 2025. https://dyuk108.ru
+
+import hashlib
+import numpy as np
+import pandas as pd
+
+# Вычисленные отрезки: (файл, поле долготы, поле широты, контрольная сумма координат) -> массив отрезков.
+segments_cache = dict()
+
+# Долгота (градусы) -> x на карте (радианы): 0 посередине, -pi слева, pi справа, долгота растёт влево.
+def lon2x(lon):
+    lon = np.asarray(lon, dtype=float)
+    return -np.radians(np.where(lon <= 180, lon, lon - 360))
+
+# Отрезки линий созвездий. df - датасет (поле или индекс HIP) с полями координат lon, lat (градусы).
+# Линии, звёзд которых нет в df, пропускаются.
+def cst_segments(df, lon = 'RAdeg', lat = 'DEdeg', filename = 'examples/cst_lines.csv'):
+    stars = df[[lon, lat]].reset_index() if not 'HIP' in df.columns else df[['HIP', lon, lat]]
+    h = hashlib.sha1(pd.util.hash_pandas_object(stars, index=False).to_numpy().tobytes()).hexdigest()
+    key = (filename, lon, lat, h)
+    if not key in segments_cache:
+        segments_cache[key] = make_segments(pd.read_csv(filename), stars, lon, lat)
+    return segments_cache[key]
+
+# Слияние линий с координатами звёзд и разрезание отрезков на краю карты.
+def make_segments(lines, stars, lon, lat):
+    stars = stars.drop_duplicates('HIP')
+    lines = lines.merge(stars.rename(columns={'HIP': 'HIP1', lon: 'lon1', lat: 'lat1'}), on='HIP1') \
+        .merge(stars.rename(columns={'HIP': 'HIP2', lon: 'lon2', lat: 'lat2'}), on='HIP2')
+    x1, x2 = lon2x(lines['lon1']), lon2x(lines['lon2'])
+    y1, y2 = np.radians(lines['lat1'].to_numpy()), np.radians(lines['lat2'].to_numpy())
+
+    # Отрезок пересекает край карты, если по карте его концы дальше друг от друга, чем на pi:
+    # короткий путь между ними идёт через долготу 180°.
+    seam = np.abs(x2 - x1) > np.pi
+    edge = np.where(x1 > 0, np.pi, -np.pi) # край карты со стороны первой звезды
+    dx = x2 - x1 + 2 * edge # смещение по x по короткому пути
+    with np.errstate(invalid='ignore', divide='ignore'):
+        y_edge = y1 + (edge - x1) / dx * (y2 - y1) # широта точки пересечения края
+    segments = np.stack([np.stack([x1, y1], axis=1), np.stack([np.where(seam, edge, x2), np.where(seam, y_edge, y2)], axis=1)], axis=1)
+    parts = np.stack([np.stack([-edge, y_edge], axis=1), np.stack([x2, y2], axis=1)], axis=1)[seam]
+    return np.concatenate([segments, parts])
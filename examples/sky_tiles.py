@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+#
+# Карта неба в виде пирамиды плиток (тайлов) разного масштаба - для просмотра с увеличением,
+# как у онлайн-карт: на уровне z всё небо - картинка из 2^(z+1) x 2^z плиток tile_size x tile_size пикселей
+# в равнопромежуточной проекции (RA по горизонтали, растёт влево, от 360° до 0°; Dec по вертикали, от +90° до -90°).
+# Звёзды рисуются без matplotlib: каждая - сглаженный кружок, размер по Vmag (как Vmag_map в allsky_eq_map.py),
+# на каждом следующем уровне - в growth раз больше; цвет по B-V (star_colors.py). Вклады кружков в пиксели суммируются массивами numpy (bincount),
+# так что результат не зависит от порядка звёзд.
+# Плитки строятся полосами (ряд плиток одного уровня), полосы - параллельно, в нескольких процессах.
+# Готовые плитки (PNG) хранятся на диске в папке cache_dir/<ключ>/z/x/y.png. Ключ - контрольная сумма
+# координат, величин и цветов звёзд и параметров рисования: если датасет изменился, плитки строятся заново
+# в новой папке (старые можно удалить методом prune).
+#
+# Пример:
+#   tiles = SkyTiles.load('dataset_bright_stars.csv')
+#   tiles.render([0, 1, 2, 3]) # все плитки уровней 0-3
+#   png = tiles.tile(3, 10, 2) # одна плитка (байты PNG), из кэша или построенная сразу
+# Запуск из корня репозитория:
+#   python examples/sky_tiles.py --levels 0 1 2 3 - построить плитки в папке tiles
+#   python examples/sky_tiles.py --serve 8000 - ещё и раздавать их по http://localhost:8000/z/x/y.png
+# Клыков Д.Ю., 2025. https://dyuk108.ru
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import os
+import shutil
+import struct
+import zlib
+import numpy as np
+import pandas as pd
+
+from star_colors import bv2t, t2rgb_array
+
+# Версия способа рисования: входит в ключ плиток, при изменении рисования плитки строятся заново.
+version = 1
+
+# Запись картинки (массив uint8 высота x ширина x 3) в формате PNG. Без сторонних библиотек:
+# строки картинки с байтом фильтра 0 перед каждой, сжатые zlib, и служебные блоки.
+def png_bytes(image):
+    height, width = image.shape[:2]
+    raw = np.zeros((height, width * 3 + 1), dtype=np.uint8)
+    raw[:, 1:] = image.reshape(height, width * 3)
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+    return b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)) + \
+        chunk(b'IDAT', zlib.compress(raw.tobytes(), 6)) + chunk(b'IEND', b'')
+
+# Запись файла целиком: сначала во временный, затем переименование - чтобы параллельные процессы
+# и сервер не увидели недописанную плитку.
+def write_file(filename, data):
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    temp = f'{filename}.{os.getpid()}.tmp'
+    with open(temp, 'wb') as f:
+        f.write(data)
+    os.replace(temp, filename)
+
+class SkyTiles:
+    # stars - датасет (DataFrame или словарь поле -> массив) с полями RAdeg, DEdeg, Vmag, B-V.
+    # tile_size - размер плитки в пикселях; scale - множитель размеров кружков звёзд на уровне 0,
+    # growth - во сколько раз кружки больше на следующем уровне (по умолчанию площадь вдвое больше);
+    # background - цвет фона; cache_dir - папка для плиток.
+    def __init__(self, stars, cache_dir = 'tiles', tile_size = 256, scale = 1.0, growth = 2 ** 0.5, background = '#203050'):
+        RA = np.asarray(stars['RAdeg'], dtype=float)
+        Dec = np.asarray(stars['DEdeg'], dtype=float)
+        Vmag = np.asarray(stars['Vmag'], dtype=float)
+        BV = np.nan_to_num(np.asarray(stars['B-V'], dtype=float)) # нет B-V - 0 (белый цвет), как в примерах
+        ok = np.isfinite(RA) & np.isfinite(Dec) & np.isfinite(Vmag)
+        # Звёзды по убыванию Dec - в порядке строк пикселей, чтобы звёзды полосы находились searchsorted.
+        order = np.flatnonzero(ok)[np.argsort(-Dec[ok], kind='stable')]
+        self.RA, self.Dec = RA[order], Dec[order]
+        self.colors = t2rgb_array(bv2t(BV[order])).astype(np.float32)
+        # Радиус кружка (пиксели, уровень 0): в примерах площадь маркера s = ((6.6 - Vmag)/6.6)^1.6 * 15,
+        # диаметр - корень из s.
+        self.radius = np.sqrt(np.clip((6.6 - Vmag[order]) / 6.6, 0, None) ** 1.6 * 15) / 2 * scale
+        self.growth = growth
+        self.tile_size = tile_size
+        self.background = np.array([int(background[i : i + 2], 16) for i in (1, 3, 5)], dtype=np.float32)
+
+        h = hashlib.sha1(f'{version} {tile_size} {scale} {growth} {background}'.encode())
+        for values in (self.RA, self.Dec, self.radius, self.colors):
+            h.update(np.ascontiguousarray(values).tobytes())
+        self.key = h.hexdigest()
+        self.cache_dir = cache_dir
+        self.blank = None # PNG пустой плитки (только фон)
+
+    # Загрузка датасета из файла CSV.
+    @staticmethod
+    def load(filename = 'dataset_bright_stars.csv', **kwargs):
+        return SkyTiles(pd.read_csv(filename, usecols=['RAdeg', 'DEdeg', 'Vmag', 'B-V']), **kwargs)
+
+    # Кол-во плиток уровня z по горизонтали и вертикали.
+    def size(self, z):
+        return 2 ** (z + 1), 2 ** z
+
+    # Файл плитки в кэше.
+    def path(self, z, x, y):
+        return os.path.join(self.cache_dir, self.key, str(z), str(x), f'{y}.png')
+
+    # Плитка (байты PNG): из кэша, а если её там нет - строится её полоса (весь ряд плиток).
+    def tile(self, z, x, y):
+        nx, ny = self.size(z)
+        if not (0 <= x < nx and 0 <= y < ny):
+            raise ValueError(f'Нет плитки {z}/{x}/{y}: на уровне {z} плиток {nx} x {ny}')
+        filename = self.path(z, x, y)
+        if not os.path.isfile(filename):
+            self.render_band(z, y)
+        with open(filename, 'rb') as f:
+            return f.read()
+
+    # Построение всех плиток уровней levels, которых ещё нет в кэше. jobs - кол-во процессов.
+    # Возвращает кол-во построенных полос.
+    def render(self, levels, jobs = os.cpu_count() or 1):
+        bands = [(z, y) for z in levels for y in range(self.size(z)[1]) if not self.band_done(z, y)]
+        if jobs > 1 and len(bands) > 1:
+            with ProcessPoolExecutor(jobs, initializer=init_worker, initargs=(self,)) as executor:
+                list(executor.map(render_band_worker, bands))
+        else:
+            for z, y in bands:
+                self.render_band(z, y)
+        return len(bands)
+
+    # Полоса построена, если есть все её плитки (плитки записываются слева направо).
+    def band_done(self, z, y):
+        return os.path.isfile(self.path(z, self.size(z)[0] - 1, y))
+
+    # Удаление из папки кэша плиток с другими ключами (прежних версий датасета и параметров).
+    def prune(self):
+        if not os.path.isdir(self.cache_dir):
+            return
+        for name in os.listdir(self.cache_dir):
+            if name != self.key and len(name) == 40 and os.path.isdir(os.path.join(self.cache_dir, name)):
+                shutil.rmtree(os.path.join(self.cache_dir, name))
+
+    # Вклады звёзд в пиксели полосы y уровня z: номера пикселей (в полосе из плиток nx x 1)
+    # и доли пикселей, покрытые кружками, для каждой звезды - своё окно пикселей вокруг центра.
+    def splat(self, z, y):
+        T = self.tile_size
+        nx, ny = self.size(z)
+        width, height = nx * T, ny * T
+        top, bottom = y * T, (y + 1) * T
+        # Звёзды, кружки которых могут попасть в полосу (с запасом на наибольший радиус).
+        py_all = (90 - self.Dec) / 180 * height
+        radius = np.maximum(self.radius * self.growth ** z, 0.5) # самые слабые звёзды - точкой в пиксель
+        margin = (radius.max() if radius.size else 0) + 1
+        i1, i2 = np.searchsorted(py_all, [top - margin, bottom + margin])
+        px = (360 - self.RA[i1:i2]) / 360 * width
+        py = py_all[i1:i2]
+        r = radius[i1:i2]
+        stars = np.arange(i1, i2)
+
+        pixels, weights, owners = [], [], []
+        # Звёзды с одинаковым размером окна обрабатываются вместе: окно (2R+1) x (2R+1) пикселей.
+        R = np.ceil(r + 0.5).astype(int)
+        for size in np.unique(R):
+            sel = np.flatnonzero(R == size)
+            dx, dy = np.meshgrid(np.arange(-size, size + 1), np.arange(-size, size + 1))
+            gx = np.floor(px[sel])[:, None].astype(int) + dx.ravel()
+            gy = np.floor(py[sel])[:, None].astype(int) + dy.ravel()
+            dist = np.hypot(gx + 0.5 - px[sel][:, None], gy + 0.5 - py[sel][:, None])
+            cover = np.clip(r[sel][:, None] + 0.5 - dist, 0, 1) # сглаживание края кружка
+            inside = (cover > 0) & (gy >= top) & (gy < bottom)
+            gx = gx % width # через 0h - на другой край карты
+            pixels.append((gy - top)[inside] * width + gx[inside])
+            weights.append(cover[inside])
+            owners.append(np.broadcast_to(stars[sel][:, None], inside.shape)[inside])
+        return np.concatenate(pixels), np.concatenate(weights), np.concatenate(owners)
+
+    # Построение и запись плиток полосы y уровня z.
+    def render_band(self, z, y):
+        T = self.tile_size
+        nx = self.size(z)[0]
+        width = nx * T
+        pixels, weights, owners = self.splat(z, y)
+        # Плитка каждого пикселя; пиксели группируются по плиткам сортировкой.
+        tiles = pixels % width // T
+        order = np.argsort(tiles, kind='stable')
+        pixels, weights, owners, tiles = pixels[order], weights[order], owners[order], tiles[order]
+        bounds = np.searchsorted(tiles, np.arange(nx + 1))
+        for x in range(nx):
+            s = slice(bounds[x], bounds[x + 1])
+            if bounds[x] == bounds[x + 1]: # пустая плитка - только фон
+                if self.blank is None:
+                    self.blank = png_bytes(np.broadcast_to(self.background.astype(np.uint8), (T, T, 3)))
+                write_file(self.path(z, x, y), self.blank)
+                continue
+            local = pixels[s] // width * T + pixels[s] % width % T # номер пикселя в плитке
+            image = self.compose(local, weights[s], owners[s])
+            write_file(self.path(z, x, y), png_bytes(image))
+
+    # Картинка плитки по вкладам звёзд: цвет пикселя - средний цвет звёзд с весами-долями покрытия,
+    # непрозрачность - сумма долей (не больше 1), под ним - фон.
+    def compose(self, local, weights, owners):
+        T = self.tile_size
+        cover = np.bincount(local, weights, T * T)
+        touched = np.flatnonzero(cover) # смешивать с фоном нужно только пиксели со звёздами
+        color = np.stack([np.bincount(local, weights * self.colors[owners, i], T * T)[touched] for i in range(3)], axis=1)
+        color /= cover[touched, None]
+        alpha = np.minimum(cover[touched], 1)[:, None]
+        image = np.empty((T * T, 3), dtype=np.uint8)
+        image[:] = np.round(self.background).astype(np.uint8)
+        image[touched] = np.round(self.background * (1 - alpha) + color * alpha).astype(np.uint8)
+        return image.reshape(T, T, 3)
+
+# Процессы для параллельного построения: объект SkyTiles передаётся каждому процессу один раз.
+worker = dict()
+
+def init_worker(tiles):
+    worker['tiles'] = tiles
+
+def render_band_worker(band):
+    worker['tiles'].render_band(*band)
+
+# Простой HTTP-сервер плиток: http://localhost:port/z/x/y.png (недостающие плитки строятся по запросу).
+def serve(tiles, port):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            try:
+                z, x, y = (int(s) for s in self.path.strip('/').removesuffix('.png').split('/'))
+                data = tiles.tile(z, x, y)
+            except ValueError:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'image/png')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    print(f'Плитки: http://localhost:{port}/z/x/y.png')
+    ThreadingHTTPServer(('', port), Handler).serve_forever()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Карта неба в виде пирамиды плиток.')
+    parser.add_argument('--dataset', default='dataset_bright_stars.csv', help='файл датасета')
+    parser.add_argument('--dir', default='tiles', help='папка для плиток')
+    parser.add_argument('--levels', type=int, nargs='+', default=[0, 1, 2, 3], help='уровни (по умолчанию 0 1 2 3)')
+    parser.add_argument('--tile-size', type=int, default=256, help='размер плитки в пикселях')
+    parser.add_argument('--scale', type=float, default=1.0, help='множитель размеров звёзд на уровне 0')
+    parser.add_argument('--growth', type=float, default=2 ** 0.5, help='во сколько раз звёзды больше на следующем уровне')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help='кол-во процессов')
+    parser.add_argument('--prune', action='store_true', help='удалить плитки прежних версий датасета')
+    parser.add_argument('--serve', type=int, default=None, help='раздавать плитки по HTTP на этом порту')
+    args = parser.parse_args()
+
+    tiles = SkyTiles.load(args.dataset, cache_dir=args.dir, tile_size=args.tile_size, scale=args.scale, \
+        growth=args.growth)
+    if args.prune:
+        tiles.prune()
+    print(f'Построено полос: {tiles.render(args.levels, args.jobs)}; плитки в {os.path.join(args.dir, tiles.key)}')
+    if args.serve:
+        serve(tiles, args.serve)
@@ -11,8 +11,8 @@ import pandas as pd
 from star_colors import * # функции для получения RGB цвета звёзд, см. https://github.com/dyuk108/star_colors
 
 # Читаем датасет dataset_bright_stars.csv
-# Индексы столбцов: 0 - Vmag, 1 - RA, 2 - Dec, 3 - B-V .
-df = pd.read_csv('dataset_bright_stars.csv', usecols=[21])
+# Нужен только спектральный класс, уже выделенный из SpType при сборке датасета.
+df = pd.read_csv('dataset_bright_stars.csv', usecols=['SpClass'])
 
 # Спектральные классы.
 sp_types = ['O', 'B', 'A', 'F', 'G', 'K', 'M', 'Misc'] # Misc - прочие.
@@ -23,9 +23,8 @@ for i in range(7):
     colors.append(t2rgb(sptype2t(sp_types[i] + '5')))
 colors.append('#909090') # для прочих классов - серый цвет
 
-# Создаём столбец с обработанным значением 
-crop_sp_type = lambda sp_type: sp_type[0].upper() if sp_type[0].upper() in sp_types else 'Misc'
-df['SpType_crop'] = df['SpType'].apply(crop_sp_type)
+# Создаём столбец с обработанным значением: прочие классы (C, S, WN, DA ...) - Misc.
+df['SpType_crop'] = df['SpClass'].where(df['SpClass'].isin(sp_types), 'Misc')
 
 # Количественное распределение по классам.
 df_sptypes = df['SpType_crop'].value_counts()
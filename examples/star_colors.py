@@ -5,6 +5,9 @@
 # Функция t2rgb() превращает Teff в RGB,
 # функция sptype2t() выдаёт для данного спектрального класса/подкласса типичную Teff,
 # функция bv2t() превращает показатель цвета B-V в эффективную темературу Teff.
+# Для большого кол-ва звёзд (целых столбцов) - функции t2rgb_array(), sptype2t_array()
+# и sp_class2t_array() (по полям SpClass, SpSub датасета), а bv2t()
+# принимает и массивы: цвета миллиона звёзд вычисляются за десятки миллисекунд, без apply для каждой звезды.
 # Клыков Д.Ю., 2025. https://dyuk108.ru
 
 import numpy as np
@@ -37,13 +40,53 @@ def t2rgb(t):
     else:
         blue = 254
 
-    rgb = (int(red), int(green), int(blue))
+    rgb = [int(red), int(green), int(blue)]
     for i in range(3):
         if rgb[i] < 0:
             rgb[i] = 0
         elif rgb[i] > 255:
             rgb[i] = 255
-    return '#%02x%02x%02x' % rgb
+    return '#%02x%02x%02x' % tuple(rgb)
+
+# Таблица цветов для t2rgb_array(): значения R, G, B по формулам t2rgb() (ещё не округлённые до целых)
+# для температур от 1000 до 200000 K с равным шагом по логарифму температуры.
+def t2rgb_table(n = 4096):
+    t = np.geomspace(1000, 200_000, n)
+    with np.errstate(divide='ignore', invalid='ignore'): # np.where вычисляет все ветви
+        red = np.where(t <= 6000, 0.0026*t+239, np.where(t <= 7000, -5937/500000*t+81461/250, 329.698*(t/100-60)**-0.133))
+        green = np.where(t < 4500, 99.47*np.log(t/100)-161.12, \
+            np.where(t < 7500, -(((t-6500)*0.003)**2)+251, 288.122*((t/100-60)**-0.0755) + 5))
+        blue = np.where(t < 2500, (7/250)*t, np.where(t <= 6650, 138.5177*np.log(t/100-10)-305.0448, 254))
+    return np.clip(np.stack([red, green, blue], axis=1), 0, 255).astype(np.float32)
+
+t2rgb_values = t2rgb_table()
+t2rgb_diff = np.diff(t2rgb_values, axis=0) # приращения до следующей строки таблицы - для интерполяции
+t2rgb_step = np.log(200_000 / 1000) / (len(t2rgb_values) - 1) # шаг таблицы по логарифму температуры
+
+# Шестнадцатеричные записи чисел 0..255 для t2rgb_array(hex=True).
+# Коды символов - uint32, как в строках numpy ('U'), чтобы строки собирались без перекодирования.
+hex_digits = np.array([[ord(c) for c in '%02x' % i] for i in range(256)], dtype=np.uint32)
+
+# Преобразование массива цветовых температур в цвета: массив uint8 размером (кол-во, 3) с R, G, B
+# или, если hex=True, массив строк '#RRGGBB'. Цвет берётся из таблицы с линейной интерполяцией
+# и совпадает с t2rgb() с точностью до единицы (кроме границ участков формул). Температуры вне таблицы
+# (1000..200000 K) - как на её краях, неизвестная температура (NaN) - белый цвет.
+def t2rgb_array(t, hex = False):
+    t = np.asarray(t, dtype=float)
+    unknown = np.isnan(t)
+    # Шаг таблицы постоянный, поэтому место температуры в таблице вычисляется, а не ищется.
+    pos = np.log(np.clip(np.where(unknown, 1000, t), 1000, 200_000) / 1000) / t2rgb_step
+    i = np.minimum(pos.astype(np.intp), len(t2rgb_values) - 2)
+    frac = (pos - i).astype(np.float32)[..., np.newaxis]
+    rgb = (np.take(t2rgb_values, i, axis=0) + np.take(t2rgb_diff, i, axis=0) * frac).astype(np.uint8)
+    rgb[unknown] = 255
+    if not hex:
+        return rgb
+    # Символы строк собираются сразу для всех звёзд: '#' и по две шестнадцатеричные цифры на R, G, B.
+    chars = np.empty(t.shape + (7,), dtype=np.uint32)
+    chars[..., 0] = ord('#')
+    chars[..., 1:] = np.take(hex_digits, rgb, axis=0).reshape(t.shape + (6,))
+    return chars.view('U7').reshape(t.shape)
 
 # Функция преобразования сп. класса (в виде цифры) в эффективную темперктуру Teff.
 # В сп. классе буквы O, B... заменяются на цифры 0, 1. К ней дописывается цифра подкласса.
@@ -105,7 +148,7 @@ def sptype2t(sp):
         return None # тип нестандартный или не указан
     
     # Подкласс.
-    if sp[1].isdigit(): # если второй символ - цифра
+    if len(sp) > 1 and sp[1].isdigit(): # если второй символ - цифра
         sp_dig += int(sp[1])
     else:
         sp_dig += 5 # возьмём середину сп. класса
@@ -114,8 +157,23 @@ def sptype2t(sp):
 
 # Функция преобразования показателя B-V в температуру Teff.
 # Формула для преобразования взята отсюда https://stackoverflow.com/questions/21977786/star-b-v-color-index-to-apparent-rgb-color
+# bv - число или массив (тогда и результат - массив).
 def bv2t(bv):
-    if bv < -0.5:
-        bv = -0.5
+    bv = np.maximum(bv, -0.5)
     t = 4600.0 * ((1.0 / ((0.92 * bv) + 1.7)) +(1.0 / ((0.92 * bv) + 0.62)) )
     return t
+
+# sptype2t() для массива спектральных классов: каждый класс разбирается один раз.
+# Результат - массив float, NaN - класс не распознан.
+def sptype2t_array(sp):
+    values, inverse = np.unique(np.asarray(sp, dtype=str), return_inverse=True)
+    t = np.array([np.nan if sptype2t(x) is None else sptype2t(x) for x in values], dtype=float)
+    return t[inverse.reshape(-1)].reshape(np.shape(sp))
+
+# Типичная Teff по уже разобранному спектральному классу - полям датасета SpClass и SpSub
+# (класс и подкласс, NaN - подкласс не указан): строка SpType заново не разбирается.
+def sp_class2t_array(sp_class, sp_sub):
+    sp_sub = np.asarray(sp_sub, dtype=float)
+    sub = np.where(np.isnan(sp_sub), '', np.nan_to_num(sp_sub).astype(int).astype(str))
+    return sptype2t_array(np.char.add(np.asarray(sp_class, dtype=str), sub))
+
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+#
+# Двоичный формат каталога звёзд для чтения через numpy.memmap - без разбора текста и без копирования.
+# Несколько процессов (карты, поиск звёзд) могут пользоваться одним файлом из кэша страниц ОС.
+#
+# Устройство файла (все числа - little-endian):
+#   8 байт  - сигнатура b'BSTARCAT';
+#   4 байта - версия формата (uint32);
+#   4 байта - длина заголовка (uint32);
+#   заголовок - JSON в UTF-8: кол-во строк, поля (имя, тип numpy, вид), словари кодированных полей,
+#               положение разделов (смещения - от начала данных);
+#   данные (начинаются с границы 8 байт, каждый раздел - тоже):
+#     записи - строки фиксированной длины, в них все числовые поля и коды кодированных полей;
+#     строковые поля - для каждого: смещения (uint32, строк + 1) и байты строк UTF-8 подряд;
+#     индекс блоков - номера первых строк ячеек неба (uint32, ячеек + 2).
+# Строки упорядочены по ячейкам неба: полосы по склонению шагом step градусов, в полосе - ячейки
+# по прямому восхождению тем же шагом (в конце - ячейка для звёзд без координат). Поэтому звёзды
+# одной области неба лежат в файле рядом, и для области читаются только её блоки (rows_in_box).
+#
+# Пример:
+#   cat = BinaryCatalog('dataset_bright_stars.bin')
+#   rows = cat.rows_in_box(80, 90, -10, 10) # Орион
+#   cat['Vmag'][rows], cat.strings('Name', rows)
+#
+# Дмитрий Клыков, 2025. dyuk108.ru
+
+import json
+import numpy as np
+
+MAGIC = b'BSTARCAT'
+VERSION = 1
+
+# Выравнивание до границы 8 байт.
+def _align(n):
+    return (n + 7) // 8 * 8
+
+# Номера ячеек неба для координат (градусы). step - размер ячейки; без координат - последняя ячейка.
+def sky_cells(RA, Dec, step):
+    n_ra = int(round(360 / step))
+    n_dec = int(round(180 / step))
+    RA = np.asarray(RA, dtype=float)
+    Dec = np.asarray(Dec, dtype=float)
+    ok = np.isfinite(RA) & np.isfinite(Dec)
+    band = np.clip(np.floor((np.where(ok, Dec, 0) + 90) / step), 0, n_dec - 1).astype(np.int64)
+    cell = np.floor(np.where(ok, RA, 0) % 360 / step).astype(np.int64) % n_ra
+    return np.where(ok, band * n_ra + cell, n_ra * n_dec)
+
+# Запись каталога. columns - словарь: имя поля -> массив (числа или строки), порядок полей сохраняется.
+# categorical - строковые поля, которые хранятся кодами (int16) и словарём значений.
+# RA, Dec - имена полей координат (градусы) для упорядочивания строк по ячейкам неба шагом step.
+def write_catalog(filename, columns, categorical = (), RA = 'RAdeg', Dec = 'DEdeg', step = 5.0):
+    n = len(next(iter(columns.values())))
+    cells = sky_cells(columns[RA], columns[Dec], step)
+    order = np.argsort(cells, kind='stable')
+    n_cells = int(round(360 / step)) * int(round(180 / step)) + 1
+    index = np.searchsorted(cells[order], np.arange(n_cells + 1)).astype('<u4')
+
+    fields = [] # описание полей для заголовка
+    record_fields = [] # поля записей (имя, тип)
+    strings = dict() # строковые поля: имя -> (смещения, байты)
+    for name, values in columns.items():
+        values = np.asarray(values)[order]
+        if name in categorical:
+            categories, codes = np.unique(values.astype(str), return_inverse=True)
+            fields.append({'name': name, 'kind': 'category', 'dtype': '<i2', 'categories': categories.tolist()})
+            record_fields.append((name, codes.astype('<i2')))
+        elif values.dtype.kind in 'USO':
+            encoded = [s.encode('utf-8') for s in values.astype(str).tolist()]
+            offsets = np.zeros(n + 1, dtype='<u4')
+            offsets[1:] = np.cumsum([len(s) for s in encoded])
+            fields.append({'name': name, 'kind': 'string'})
+            strings[name] = (offsets, b''.join(encoded))
+        else:
+            dtype = values.dtype.newbyteorder('<')
+            fields.append({'name': name, 'kind': 'number', 'dtype': dtype.str})
+            record_fields.append((name, values.astype(dtype)))
+
+    record_dtype = np.dtype([(name, values.dtype) for name, values in record_fields])
+    records = np.zeros(n, dtype=record_dtype)
+    for name, values in record_fields:
+        records[name] = values
+
+    # Раздел данных: смещения разделов от начала данных.
+    sections = [] # (смещение, байты)
+    pos = 0
+    def add(data):
+        nonlocal pos
+        sections.append((pos, data))
+        offset = pos
+        pos = _align(pos + len(data))
+        return offset
+
+    header = {'version': VERSION, 'rows': n, 'fields': fields, 'spatial': {'RA': RA, 'Dec': Dec, 'step': step}}
+    header['records'] = {'offset': add(records.tobytes()), 'dtype': [[name, values.dtype.str] for name, values in record_fields]}
+    header['strings'] = dict()
+    for name, (offsets, blob) in strings.items():
+        header['strings'][name] = {'offsets': add(offsets.tobytes()), 'blob': add(blob), 'size': len(blob)}
+    header['index'] = {'offset': add(index.tobytes()), 'cells': n_cells}
+
+    text = json.dumps(header, ensure_ascii=False).encode('utf-8')
+    start = _align(16 + len(text))
+    with open(filename, 'wb') as f:
+        f.write(MAGIC + np.array([VERSION, len(text)], dtype='<u4').tobytes() + text)
+        f.write(b'\0' * (start - 16 - len(text)))
+        for offset, data in sections:
+            f.seek(start + offset)
+            f.write(data)
+        f.truncate(start + pos)
+
+class BinaryCatalog:
+    def __init__(self, filename):
+        self.buf = np.memmap(filename, dtype=np.uint8, mode='r')
+        if self.buf[:8].tobytes() != MAGIC:
+            raise ValueError(f'{filename}: не двоичный каталог звёзд.')
+        version, length = self.buf[8:16].view('<u4').tolist()
+        if version > VERSION:
+            raise ValueError(f'{filename}: версия формата {version} не поддерживается (поддерживается до {VERSION}).')
+        self.header = json.loads(self.buf[16 : 16 + length].tobytes().decode('utf-8'))
+        self.start = _align(16 + length)
+        self.rows = self.header['rows']
+        self.fields = {field['name']: field for field in self.header['fields']}
+
+        dtype = np.dtype([(name, dt) for name, dt in self.header['records']['dtype']])
+        offset = self.start + self.header['records']['offset']
+        self.records = self.buf[offset : offset + self.rows * dtype.itemsize].view(dtype)
+        index = self.header['index']
+        self.index = self.section(index['offset'], (index['cells'] + 1) * 4).view('<u4')
+        self.hip_order = None # для поиска по HIP (строится при первом поиске)
+
+    # Байты раздела данных.
+    def section(self, offset, size):
+        return self.buf[self.start + offset : self.start + offset + size]
+
+    def __len__(self):
+        return self.rows
+
+    def __contains__(self, name):
+        return name in self.fields
+
+    def keys(self):
+        return list(self.fields)
+
+    # Значения поля (всех строк или строк rows). Числовые поля - без копирования (memmap).
+    def __getitem__(self, name):
+        return self.column(name)
+
+    def column(self, name, rows = None):
+        field = self.fields[name]
+        if field['kind'] == 'string':
+            return np.array(self.strings(name, rows), dtype=str)
+        values = self.records[name] if rows is None else self.records[name][rows]
+        if field['kind'] == 'category':
+            return np.array(field['categories'], dtype=str)[values]
+        return values
+
+    # Строковое поле - список строк.
+    def strings(self, name, rows = None):
+        info = self.header['strings'][name]
+        offsets = self.section(info['offsets'], (self.rows + 1) * 4).view('<u4')
+        blob = self.section(info['blob'], info['size'])
+        rows = range(self.rows) if rows is None else np.asarray(rows).tolist()
+        return [blob[offsets[i] : offsets[i + 1]].tobytes().decode('utf-8') for i in rows]
+
+    # Номера строк звёзд в прямоугольнике на небе (градусы). Если RA1 > RA2, область проходит через 0h.
+    # Читаются только блоки ячеек, которые пересекает область.
+    def rows_in_box(self, RA1, RA2, Dec1, Dec2):
+        step = self.header['spatial']['step']
+        n_ra = int(round(360 / step))
+        n_dec = int(round(180 / step))
+        band1, band2 = [int(np.clip(np.floor((Dec + 90) / step), 0, n_dec - 1)) for Dec in (Dec1, Dec2)]
+        cell1, cell2 = [int(np.clip(np.floor(RA / step), 0, n_ra - 1)) for RA in (RA1, RA2)]
+        spans = [(cell1, cell2)] if RA1 <= RA2 else [(cell1, n_ra - 1), (0, cell2)]
+
+        rows = []
+        for band in range(band1, band2 + 1):
+            for c1, c2 in spans:
+                rows.append(np.arange(self.index[band * n_ra + c1], self.index[band * n_ra + c2 + 1]))
+        rows = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+
+        spatial = self.header['spatial']
+        RA = self.records[spatial['RA']][rows]
+        Dec = self.records[spatial['Dec']][rows]
+        inside_RA = (RA >= RA1) & (RA <= RA2) if RA1 <= RA2 else (RA >= RA1) | (RA <= RA2)
+        return rows[inside_RA & (Dec >= Dec1) & (Dec <= Dec2)]
+
+    # Номера строк звёзд по номерам HIP (-1 - такой звезды нет).
+    def rows_by_hip(self, HIP, key = 'HIP'):
+        hips = self.records[key]
+        if self.hip_order is None:
+            self.hip_order = np.argsort(hips, kind='stable')
+        HIP = np.asarray(HIP, dtype=np.int64)
+        if self.rows == 0:
+            return np.full(HIP.shape, -1)
+        pos = np.minimum(np.searchsorted(hips, HIP, sorter=self.hip_order), self.rows - 1)
+        rows = self.hip_order[pos]
+        return np.where(hips[rows] == HIP, rows, -1)
+
+    # Несколько полей строк rows - словарь поле -> массив.
+    def read(self, rows = None, names = None):
+        return {name: self.column(name, rows) for name in (names or self.keys())}
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+#
+# Замеры этапов сборки (см. pipeline.py) для отчёта о сборке: время по часам и процессорное время,
+# пиковая память процесса (RSS), счётчики строк - сколько прочитано, сколько и почему отброшено,
+# как нашлись обозначения звёзд PASTEL и т.п.
+# Счётчики ведёт сам этап вызовами count('имя', n); measure выполняет функцию этапа, собирает
+# счётчики и замеры. Этапы могут выполняться в других процессах (run_parallel) - measure
+# выполняется там же, где этап, и возвращает замеры вместе с результатом.
+# По желанию этап выполняется под профилировщиком: cProfile (файл .prof, смотреть, например,
+# python -m pstats или snakeviz) или pyinstrument (файл .html, нужна библиотека pyinstrument).
+#
+# Дмитрий Клыков, 2025. dyuk108.ru
+
+import json
+import time
+
+try:
+    import resource
+except ImportError: # Windows
+    resource = None
+
+# Счётчики этапа, который выполняется в этом процессе. Словарь - внутри объекта, а не глобальный:
+# глобальные словари, к которым обращается код этапа, входят в ключ этапа (см. code_hash в pipeline.py).
+class Counters:
+    def __init__(self):
+        self.values = dict() # имя -> значение
+
+counters = Counters()
+
+# Увеличение счётчика name на n.
+def count(name, n = 1):
+    counters.values[name] = counters.values.get(name, 0) + int(n)
+
+# Сброс пиковой памяти процесса, чтобы замерить её для одного этапа (Linux 4.0+).
+# Если сбросить нельзя, пиковая память - за всё время работы процесса.
+def reset_peak_rss():
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+# Пиковая память процесса (МБ). None - неизвестно.
+def peak_rss():
+    try:
+        with open('/proc/self/status') as f:
+            for s in f:
+                if s.startswith('VmHWM:'):
+                    return int(s.split()[1]) / 1024
+    except OSError:
+        pass
+    if resource is not None: # macOS и др.: в байтах
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2 ** 20
+    return None
+
+# Выполнение func(*args, **kwargs) с замерами. profiler - None, 'cprofile' или 'pyinstrument';
+# profile_file - файл для результатов профилировщика.
+# Возвращает (результат функции, замеры - словарь для отчёта).
+def measure(func, args = (), kwargs = None, profiler = None, profile_file = None):
+    counters.values = dict()
+    reset_peak_rss()
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    if profiler == 'cprofile':
+        import cProfile
+        profile = cProfile.Profile()
+        result = profile.runcall(func, *args, **(kwargs or dict()))
+        profile.dump_stats(profile_file)
+    elif profiler == 'pyinstrument':
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            raise ImportError('Для профилирования pyinstrument-ом нужна библиотека pyinstrument (pip install pyinstrument).')
+        profile = Profiler()
+        profile.start()
+        try:
+            result = func(*args, **(kwargs or dict()))
+        finally:
+            profile.stop()
+        with open(profile_file, 'w', encoding='utf-8') as f:
+            f.write(profile.output_html())
+    else:
+        result = func(*args, **(kwargs or dict()))
+
+    stats = {'wall': time.perf_counter() - wall, 'cpu': time.process_time() - cpu, 'peak_rss_mb': peak_rss(), \
+        'counters': counters.values}
+    if profiler:
+        stats['profile'] = profile_file
+    return result, stats
+
+# Запись отчёта в файл JSON. stages - замеры этапов (имя -> словарь), params - параметры сборки.
+def write_report(filename, stages, params, wall):
+    report = {'params': params, 'wall': wall, 'stages': stages}
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=1)
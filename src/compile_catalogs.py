@@ -1,15 +1,49 @@
 # -*- coding: utf-8 -*-
 #
 # Скрипт генерирует датасет CSV из нескольких звёздных каталогов, 
-# основной из которых - Hipparcos. Ограничение - до 6,5m.
+# основной из которых - Hipparcos. Ограничение - до 6,5m (можно изменить ключом --vmag-limit).
 #
 # Предназначен для учебных целей. На основе такого датасета можно
 # тренироваться в работе с даннами при помощи библиотек наподобие pandas,
 # и СУБД, наподобие DuckDB, строить карты и диаграммы.
 # Можно сделать просто справочник по ярким звёздам и созвездиям.
 #
+# Сборка разбита на этапы (см. pipeline.py), результаты этапов кэшируются в папке src/cache.
+# Запуск из корня репозитория:
+#   python src/compile_catalogs.py          - собрать датасет (выполняются только изменившиеся этапы)
+#   python src/compile_catalogs.py --force  - выполнить все этапы заново
+#   python src/compile_catalogs.py --list   - список этапов
+#   python src/compile_catalogs.py --stage hip - выполнить этап (и то, от чего он зависит)
+#   python src/compile_catalogs.py --vmag-limit 9 --stream - более глубокий каталог, потоковая сборка
+#   python src/compile_catalogs.py --jobs 1 - без параллельного выполнения этапов
+#   python src/compile_catalogs.py --formats csv,excel,parquet,npy - датасет и в форматах с типами полей
+#   python src/compile_catalogs.py --stage sqlite - база SQLite с индексами
+#   python src/compile_catalogs.py --report build_report.json --profile pastel - отчёт о сборке (время,
+#                                   память, счётчики строк по этапам), этап pastel - под профилировщиком
+#   python src/compile_catalogs.py --teff-method median --teff-stats - Teff - медиана измерений,
+#                                   в датасете и кол-во измерений, и погрешность
+#   python src/compile_catalogs.py --pastel-names - звёзды PASTEL ищутся и по собственным именам
+#   python src/compile_catalogs.py --epochs - и положения на эпохи J2000, J2016 (поля RAdeg_J2000 и т.д.)
+#
 # Дмитрий Клыков, 2025. dyuk108.ru
 
+import argparse
+import os
+import numpy as np
+
+from pipeline import stage, stages, Pipeline
+from build_report import count
+from fixed_width import FixedWidthFile
+from star_table import StarTable, SortedColumns
+from spectral_types import sptype_columns
+from frames import transform
+from epochs import Epochs, epoch_keys
+from display_columns import display_columns
+from running_stats import RunningStats
+from identifiers import IdIndex, filename_ids
+from crossmatch import CrossMatch
+from writers import CsvWriter, ExcelCsvWriter, ArrowWriter, NpyWriter, SqliteWriter, BinaryWriter
+
 # Имена файлов используемых каталогов.
 filename_hip = 'src/hipparcos/hip_main.dat' # Hipparcos
 filename_hip_var = 'src/hipparcos/ident5.doc'# файл из комплекта Hip с обозначениями переменных звёзд
@@ -18,36 +52,22 @@ filename_constell = 'src/my_data/constellations.csv' # список созвез
 filename_pastel = 'src/pastel/pastel.dat' # обработанный каталог PASTEL
 filename_proper_names = 'src/my_data/star_names_wiki_rus.csv' # список собственных названий звёзд, в т.ч. на русском
 
-# -----------------------------------
-# Полезные запчасти.
-# -----------------------------------
-# Функция убирает нули в начале строки (незначащие нули чисел).
-def ins_zeros(s):
-    sw = ''
-    for i in range(len(s)):
-        if not(0 <= i <= 1 and s[i] == '0' and sw == ''):
-            sw += s[i]
-    return sw
-
-# Словарь греческих букв - написание латиницей как в доп файле ident4.doc для Hip.
-greek_hip = {'alf': 'α', 'bet': 'β', 'gam': 'γ', 'del': 'δ', 'eps': 'ε', 'zet': 'ζ', \
-        'eta': 'η', 'the': 'θ', 'iot': 'ι', 'kap': 'κ', 'lam': 'λ', 'mu.': 'μ', \
-        'nu.': 'ν', 'ksi': 'ξ', 'omi': 'ο', 'pi.': 'π', 'rho': 'ρ', 'sig': 'σ', \
-        'tau': 'τ', 'ups': 'υ', 'phi': 'φ', 'chi': 'χ', 'psi': 'ψ', 'ome': 'ω' }
-
-# Массив сокращённых названий созвездий (с большими и мал буквами).
-constellations = []
-fc = open(filename_constell, encoding='utf-8')
-for s in fc:
-    l = s.split(',')
-    if len(l) < 3 or l[0] == 'short_name':
-        continue
-    constellations.append(l[0])
-fc.close()
-
-# Объект для работы с созвездиями.
-from constellations import Constellations
-cons = Constellations() # объект с каталогом созвездий
+# Файлы, от которых зависит определение созвездий: сам класс и границы созвездий.
+files_constellations = ['src/constellations.py', filename_constell] + \
+    sorted('src/boundaries/' + name for name in os.listdir('src/boundaries') if name.endswith('.txt')) \
+    if os.path.isdir('src/boundaries') else ['src/constellations.py', filename_constell]
+
+# Выходные файлы.
+filename_dataset = 'dataset_bright_stars.csv'
+filename_dataset_excel = 'dataset_bright_stars_excel.csv' # для работы в русском Excel-е
+filename_cross_bayer = 'cross_bayer_hip.csv'
+# Датасет в форматах с типами полей (ключ --formats).
+filename_dataset_parquet = 'dataset_bright_stars.parquet'
+filename_dataset_feather = 'dataset_bright_stars.feather'
+dirname_dataset_npy = 'dataset_bright_stars_npy' # папка с файлами .npy, по одному на поле
+filename_dataset_sqlite = 'dataset_bright_stars.sqlite' # база SQLite с индексами
+filename_dataset_bin = 'dataset_bright_stars.bin' # двоичный каталог для numpy.memmap (см. binary_catalog.py)
+# Указатель обозначений звёзд -> HIP (см. identifiers.py) - filename_ids.
 
 # ----------------------------------------------------------------------------
 # Сформируем окончательный список полей, который нам нужен на основе keys_hip.
@@ -81,128 +101,211 @@ keys_compiled = [
             'SpType', # Spectral type
             'Teff', # Эффективная температура
             'Name', # Оригинальное собственное имя
-            'Name_r'] # Русское собственное имя
+            'Name_r', # Русское собственное имя
+            # Поля, вычисляемые при сборке, - в конце строки, чтобы номера прежних столбцов не менялись.
+            'SpClass', # спектральный класс основного компонента (из SpType)
+            'SpSub', # спектральный подкласс (из SpType)
+            'LumClass', # класс светимости (из SpType)
+            'GLON', # галактическая долгота, градусы
+            'GLAT', # галактическая широта, градусы
+            'ELON', # эклиптическая долгота (J2000), градусы
+            'ELAT', # эклиптическая широта (J2000), градусы
+            'Bayer_greek', # буква Байера греческой буквой, номер - верхним индексом (α, π²)
+            'Dist_pc', # расстояние по параллаксу, пк
+            'M_V', # абсолютная звёздная величина
+            'Label', # подпись: обозначение (Байер, Флемстид, переменная, HIP) и имя
+            'Label_r'] # подпись с русским именем
+
+# Поля, которые пишутся только в UTF-8 (в кодировке cp1251 для Excel-я нет греческих букв).
+keys_unicode = ['Bayer_greek', 'Label', 'Label_r']
+
+# Дополнительные поля (ключ --teff-stats): сколько измерений Teff в PASTEL и погрешность среднего.
+keys_teff_stats = ['Teff_n', 'Teff_err']
+
+# Список полей датасета. Дополнительные поля добавляются в конце строки, чтобы не сдвигать остальные:
+# teff_stats - поля keys_teff_stats, epochs - эпохи, положения на которые нужны (ключ --epochs).
+def keys_dataset(teff_stats = False, epochs = ()):
+    keys = keys_compiled + (keys_teff_stats if teff_stats else [])
+    return keys + [key for epoch in epochs for key in epoch_keys(epoch)]
+
+# Датасет в памяти - таблица StarTable (см. star_table.py), поля хранятся массивами numpy.
+# Поля, которые хранятся кодами (значений немного, а звёзд много).
+keys_categorical = ['Bayer_cst', 'Cst', 'HvarType', 'SpType', 'SpClass', 'LumClass']
+
+# Формат записи в датасет полей с плавающей точкой - как в каталоге Hipparcos.
+formats_compiled = {'Vmag': '.2f', 'RAdeg': '.8f', 'DEdeg': '+012.8f', 'GLON': '.8f', 'GLAT': '+012.8f', \
+        'ELON': '.8f', 'ELAT': '+012.8f', 'Plx': '.2f', 'Dist_pc': '.2f', 'M_V': '.2f', 'pmRA': '.2f', \
+        'pmDE': '.2f', 'B-V': '.3f', 'V-I': '.2f', 'Period': '.2f', 'Teff_err': '.0f', 'SpSub': 'g'}
 
 # -----------------------------------------------------------
 # Hipparcos - основной каталог.
 # -----------------------------------------------------------
 # Почему не Tycho или Tycho-2? Они практически совпадают до 6,5m. 
 # В Hipparcos больше данных о звёздах, например, есть спектральные классы.
-fields_hip = (('HIP', 9, 14), # Identifier (HIP number)
+# Четвёртый элемент - тип поля (см. fixed_width.py): 'f' - число с плавающей точкой, 'i' - целое.
+fields_hip = (('HIP', 9, 14, 'i'), # Identifier (HIP number)
             #('RAhms', 18, 28), # Right ascension in h m s, ICRS (J1991.25)
             #('DEdms', 30, 40), # Declination in deg ' ", ICRS (J1991.25)   (H4)
-            ('Vmag', 42, 46), # Magnitude in Johnson V
-            ('VarFlag', 48, 48), # Var star: < 0.06mag ; 2: 0.06-0.6mag ; 3: >0.6mag
-            ('RAdeg', 52, 63), # alpha, degrees (ICRS, Epoch=J1991.25)
-            ('DEdeg', 65, 76), # delta, degrees (ICRS, Epoch=J1991.25)
-            ('Plx', 80, 86), # Trigonometric parallax
-            ('pmRA', 88, 95), # Proper motion mu_alpha.cos(delta), ICRS
-            ('pmDE', 97, 104), # Proper motion mu_delta, ICRS
+            ('Vmag', 42, 46, 'f'), # Magnitude in Johnson V
+            ('VarFlag', 48, 48, 'i'), # Var star: < 0.06mag ; 2: 0.06-0.6mag ; 3: >0.6mag
+            ('RAdeg', 52, 63, 'f'), # alpha, degrees (ICRS, Epoch=J1991.25)
+            ('DEdeg', 65, 76, 'f'), # delta, degrees (ICRS, Epoch=J1991.25)
+            ('Plx', 80, 86, 'f'), # Trigonometric parallax
+            ('pmRA', 88, 95, 'f'), # Proper motion mu_alpha.cos(delta), ICRS
+            ('pmDE', 97, 104, 'f'), # Proper motion mu_delta, ICRS
             #('BTmag', 218, 223),  # Mean BT magnitude
             #('VTmag', 231, 236), # Mean VT magnitude
-            ('B-V', 246, 251), # Johnson B-V colour
-            ('V-I', 261, 264), # Johnson B-V colour
-            ('Period', 314, 320), # Variability period (days)
+            ('B-V', 246, 251, 'f'), # Johnson B-V colour
+            ('V-I', 261, 264, 'f'), # Johnson B-V colour
+            ('Period', 314, 320, 'f'), # Variability period (days)
             ('HvarType', 322, 322), # [CDMPRU]? variability type
             #('CCDM', 328, 337), # CCDM identifier
             #('Nsys', 341, 342), # Number of entries with same CCDM
-            ('Ncomp', 344, 345), # Кол-во компонентов в этой строке
+            ('Ncomp', 344, 345, 'i'), # Кол-во компонентов в этой строке
             ('MultFlag', 347, 347), #  Double/Multiple Systems flag
             ('m_HIP', 353, 354), # Буквенные обозначения компонентов (если два)
             #('theta', 356, 358), # Position angle between components
             #('rho', 360, 366), # Angular separation between components
             #('dHp', 374, 378), # Magnitude difference of components
-            ('HD', 391, 396), # [1/359083]? HD number <III/135>
+            ('HD', 391, 396, 'i'), # [1/359083]? HD number <III/135>
             ('SpType', 436, 447)) # Spectral type
 
-# Создаём словарь для окончательного датасета. Ключ - номер HIP.
-# Значение - словарь полей строки каталога.
-df_compiled = dict()
-# Кросс-словарь, ключ - номер HD, значение - номер HIP
-cross_hd_hip = dict()
-
-f = open(filename_hip)
-for s in f:
-    if len(s) < 5: # пустые строки
-        continue
-
-    data = dict() # строка каталога
-    for field in fields_hip: # по полям данных строки
-        data[field[0]] = s[field[1]-1 : field[2]].strip()
-
-    # Нужно разобраться с Vmag: ограничиваем до 6.5m.
-    try:
-        Vmag_float = float(data['Vmag'])
-    except:
-        continue # только странный объект HIP 120412 без Vmag, координат и много чего.
-
-    if Vmag_float <= 6.5:
-        HIP = data['HIP']
-        # Координаты в градусах RAdeg и DEdeg почему-то не во всех строках есть. 
-        # поэтому в случае отсутствия считаем из 
-        if data['RAdeg'] == '':
-            RA = round((int(s[17:19]) + int(s[20:22])/60 + float(s[23:28])/3600) * 15, 8) # RA в градусах
-            data['RAdeg'] = str(RA)
-        else: # уберём незначащие нули
-            data['RAdeg'] = ins_zeros(data['RAdeg'])
-            RA = float(data['RAdeg']) # в виде числа с плавающей точкой тоже будет нужно
-
-        if data['DEdeg'] == '':
-            Dec = round(int(s[29:32]) + int(s[33:35])/60 + float(s[36:40])/3600, 8) # Dec в градусах
-            data['DEdeg'] = str(Dec)
-        else:
-            Dec = float(data['DEdeg']) # в виде числа с плавающей точкой тоже будет нужно
-
-        # Формируем строку окончательного датасета и помещаем туда имеющиеся данные из Hip.
-        data_compiled = dict.fromkeys(keys_compiled, '')
-        for key in data_compiled:
-            if key in data:
-                data_compiled[key] = data[key]
-
-        # Автоматическое определение созвездия.
-        data_compiled['Cst'] = cons.whatCons(RA, Dec)
-
-        df_compiled[HIP] = data_compiled # записываем в окончательный датасет
-
-        # Кросс-словарь HD -> HIP
-        HD = data['HD']
-        if HD != '':
-            if not(HD in cross_hd_hip):
-                cross_hd_hip[HD] = HIP
-            else:
-                print(f'HD {HD} дублируется, было HIP {cross_hd_hip[HD]}, записываетя {HIP}')
-        # Оказалось, что до 6,5m дубликатов HD нет.
-f.close()
-# Единственное исправление, которое я себе позволю в данных Hip, это спектральный класс эпсилон Волопаса.
-# Указано A0 - класс слабого (5m) компонента. Яркий компонент (2,7m) имеет класс K0.
-df_compiled['72105']['SpType'] = 'K0II-III'
+# Типы целых полей датасета в таблице (по умолчанию int64 - слишком много).
+dtypes_compiled = {'HD': np.int32, 'Fl': np.int16, 'VarFlag': np.int8, 'Ncomp': np.int8, 'Teff': np.int32, 'Teff_n': np.int16}
+
+# Пустое поле key для таблицы из n строк - чтобы у всех таблиц (и порций) были одни и те же поля и типы.
+def empty_column(key, n):
+    if key in dtypes_compiled:
+        return np.zeros(n, dtype=dtypes_compiled[key])
+    if key in formats_compiled:
+        return np.full(n, np.nan)
+    return np.full(n, '', dtype=str)
+
+# Этап hip_index: отбор звёзд Hipparcos для датасета - до звёздной величины vmag_limit.
+# Читаются только нужные для этого поля, поэтому этапы, которым нужен лишь список звёзд,
+# не ждут полного разбора каталога.
+# Результат: rows - номера отобранных строк каталога; HIP, HD - их номера HIP и HD (HD 0 - нет).
+# Только массивы чисел (16 байт на звезду), без словарей и списков строк: результат нужен
+# почти всем этапам и в потоковой сборке остаётся в памяти до конца.
+@stage('hip_index', files=[filename_hip, 'src/fixed_width.py'], params=['vmag_limit'])
+def read_hip_index(vmag_limit):
+    f = FixedWidthFile(filename_hip, min_length=4) # пустые строки пропускаются
+
+    # Нужно разобраться с Vmag: ограничиваем до vmag_limit (по умолчанию 6.5m).
+    # Строки без Vmag отбрасываются (NaN), это только странный объект HIP 120412 без Vmag, координат и много чего.
+    Vmag = f.floats(42, 46)
+    rows = np.flatnonzero(Vmag <= vmag_limit)
+    blank = f.nulls(42, 46)
+    count('rows_read', len(f))
+    count('rejected_no_vmag', blank.sum())
+    count('rejected_unparsable', (np.isnan(Vmag) & ~blank).sum())
+    count('rejected_vmag_limit', (Vmag > vmag_limit).sum())
+    count('rows_selected', rows.size)
+    return {'rows': rows, 'HIP': f.ints(9, 14, rows).astype(np.int32), 'HD': f.ints(391, 396, rows).astype(np.int32)}
+
+# Номера HIP звёзд датасета (результат этапа hip_index) - множество строк, для проверки, есть ли звезда
+# из другого каталога в датасете.
+def hip_set(index):
+    return set(index['HIP'].astype(str).tolist())
+
+# Таблица датасета (StarTable) из строк rows каталога Hipparcos (f - открытый FixedWidthFile).
+# В таблице - только данные из Hip.
+def hip_table(f, rows):
+    columns = f.read(fields_hip, rows) # поля нужных строк каталога
+    table = StarTable(columns['HIP'], keys_categorical)
+
+    # Координаты в градусах RAdeg и DEdeg почему-то не во всех строках есть. 
+    # поэтому в случае отсутствия считаем из координат в виде Ч М С и Г М С.
+    missing = np.flatnonzero(np.isnan(columns['RAdeg']))
+    if missing.size > 0:
+        rows_missing = rows[missing]
+        RA = (f.floats(18, 19, rows_missing) + f.floats(21, 22, rows_missing)/60 + f.floats(24, 28, rows_missing)/3600) * 15
+        columns['RAdeg'][missing] = np.round(RA, 8) # RA в градусах
+    missing = np.flatnonzero(np.isnan(columns['DEdeg']))
+    if missing.size > 0:
+        rows_missing = rows[missing]
+        sign = np.where(f.strings(30, 30, rows_missing) == '-', -1, 1) # знак относится и к минутам, и к секундам
+        Dec = np.abs(f.floats(30, 32, rows_missing)) + f.floats(34, 35, rows_missing)/60 + f.floats(37, 40, rows_missing)/3600
+        columns['DEdeg'][missing] = np.round(sign * Dec, 8) # Dec в градусах
+    # Галактические и эклиптические координаты - поворотом векторов (см. frames.py).
+    columns['GLON'], columns['GLAT'] = transform(columns['RAdeg'], columns['DEdeg'], 'icrs', 'galactic')
+    columns['ELON'], columns['ELAT'] = transform(columns['RAdeg'], columns['DEdeg'], 'icrs', 'ecliptic')
+
+    for key in keys_dataset(teff_stats=True):
+        if key in columns and key != 'HIP':
+            table.set(key, columns[key], dtype=dtypes_compiled.get(key))
+        elif key != 'HIP': # заполняется на других этапах
+            table.set(key, empty_column(key, len(table)))
+
+    # Единственное исправление, которое я себе позволю в данных Hip, это спектральный класс эпсилон Волопаса.
+    # Указано A0 - класс слабого (5m) компонента. Яркий компонент (2,7m) имеет класс K0.
+    row = table.rows([72105])
+    if row[0] >= 0:
+        table.set('SpType', ['K0II-III'], row)
+
+    # Разобранный спектральный класс - каждое значение SpType разбирается один раз (см. spectral_types.py).
+    for key, values in sptype_columns(table.categories['SpType'], table.columns['SpType']).items():
+        table.set(key, values)
+
+    return table
+
+# Этап hip: чтение Hipparcos.
+# Результат: таблица StarTable для окончательного датасета с данными из Hip.
+@stage('hip', files=[filename_hip, 'src/fixed_width.py', 'src/star_table.py', 'src/spectral_types.py', 'src/frames.py'], deps=['hip_index'])
+def read_hip(index):
+    f = FixedWidthFile(filename_hip, min_length=4)
+    return hip_table(f, index['rows'])
+
+# Определение созвездий для строк таблицы датасета, сразу для всех.
+# Результат: массив кратких названий созвездий (в порядке строк таблицы).
+def find_cst(cons, table):
+    cst = cons.whatCons_many(table['RAdeg'], table['DEdeg'])
+    count('stars', len(table))
+    count('cst_not_found', (cst == None).sum())
+    return cst
+
+# Этап cst: автоматическое определение созвездия, сразу для всех звёзд.
+@stage('cst', files=files_constellations, deps=['hip'])
+def find_constellations(table):
+    from constellations import Constellations
+    cons = Constellations() # объект с каталогом созвездий
+    return find_cst(cons, table)
 
 # --------------------------------------------------------------------
 # Оббозначение звёзд по Байеру и Флемстиду.
 # Нужно а) дополнить словарь каталога HIP;
 # б) сделдать словарь, ключ - обозначение по Байеру/Флемстиду, значение - HIP.
 # --------------------------------------------------------------------
-cross_bayer_hip = dict() # словарь для работы с каталогом PASTEL
-
 fields_cross = (('HD', 1, 6), #  Henry Draper Catalog Number <III/135>
     ('HIP', 32, 37), # Hipparcos Catalog <I/196> number
     ('Fl', 65, 67), # Flamsteed number (G1)
     ('Bayer', 69, 73), # Bayer designation (G1)
     ('Bayer_cst', 75, 77)) # Constellation abbreviation (G1)
 
-f = open(filename_cross)
-for s in f:
-    if len(s) < 3: # пустая строка
-        continue
-
-    data = dict() # строка каталога
-    for field in fields_cross: # по полям данных строки
-        data[field[0]] = s[field[1]-1 : field[2]].strip()
-    HIP = data['HIP']
-    
-    if data['HIP'] in df_compiled: # запись в основной датасет
+# Этап cross: обозначения по Байеру и Флемстиду.
+# Результат: cross_data - поля 'Fl', 'Bayer', 'Bayer_cst' для датасета, столбцами (с полем 'HIP');
+# cross_bayer_hip - словарь обозначение -> HIP (для работы с каталогом PASTEL).
+@stage('cross', files=[filename_cross, 'src/fixed_width.py'], deps=['hip_index'])
+def read_cross(index):
+    hips = hip_set(index) # звёзды основного датасета
+    cross_data = dict() # поля датасета из этого каталога
+    cross_bayer_hip = dict() # словарь для работы с каталогом PASTEL
+
+    f = FixedWidthFile(filename_cross, min_length=2) # пустые строки пропускаются
+    columns = f.read(fields_cross)
+    rows = np.flatnonzero(np.isin(columns['HIP'], list(hips))) # только звёзды основного датасета
+    columns = {key: values[rows].tolist() for key, values in columns.items()}
+    count('rows_read', len(f))
+    count('rows_in_dataset', rows.size)
+
+    for i in range(rows.size):
+        data = {key: columns[key][i] for key in columns} # строка каталога
+        HIP = data['HIP']
+        
+        # Запись в основной датасет.
+        data_cross = cross_data.setdefault(HIP, dict())
         # Созвездие.
-        df_compiled[HIP]['Bayer_cst'] = data['Bayer_cst']
+        data_cross['Bayer_cst'] = data['Bayer_cst']
 
         # Обозначения по Байеру.
         if data['Bayer'] != '':
@@ -210,22 +313,22 @@ for s in f:
             if HIP == '40167':
                 # HIP 40167 zet02 Cnc и zet01 Cnc
                 # Это система из 5 компонентов, zet01 Cnc - более яркая пара.
-                df_compiled['40167']['Bayer'] = 'zet'
+                data_cross['Bayer'] = 'zet'
                 cross_bayer_hip['zet01 Cnc'] = '40167'
             elif HIP == '76669':
                 # HIP 76669 zet01 CrB и zet02 CrB .
                 # Здесь более яркая звезда zet02 CrB.
-                df_compiled['76669']['Bayer'] = 'zet'
+                data_cross['Bayer'] = 'zet'
                 cross_bayer_hip['zet02 CrB'] = '76669'
             else:
-                df_compiled[HIP]['Bayer'] = data['Bayer']
-                df_compiled[HIP]['Bayer_cst'] = data['Bayer_cst']
+                data_cross['Bayer'] = data['Bayer']
+                data_cross['Bayer_cst'] = data['Bayer_cst']
                 key = data['Bayer'] + ' ' + data['Bayer_cst']
                 cross_bayer_hip[key] = HIP
 
         # Обозначения по Флемстиду.
         if data['Fl'] != '':
-            df_compiled[HIP]['Fl'] = data['Fl']
+            data_cross['Fl'] = data['Fl']
             key = data['Fl'] + ' ' + data['Bayer_cst']
             cross_bayer_hip[key] = HIP
 
@@ -236,33 +339,51 @@ for s in f:
         # HIP 7607 по Байеру - упсилон Персея, по Флемстиду - 51 And. Находится даже не на границе,
         # а вполне себе внутри территории созвездия Андромеды.
         # В данном каталоге конфликт уже разрешён в пользу Флемстида.
-f.close()
+
+    # Поля для датасета - столбцами.
+    HIPs = list(cross_data)
+    columns = {'HIP': np.array(HIPs, dtype=np.int32)}
+    columns['Fl'] = np.array([int(cross_data[HIP].get('Fl', 0)) for HIP in HIPs], dtype=dtypes_compiled['Fl'])
+    for key in ('Bayer', 'Bayer_cst'):
+        columns[key] = np.array([cross_data[HIP].get(key, '') for HIP in HIPs], dtype=str)
+
+    return {'cross_data': columns, 'cross_bayer_hip': cross_bayer_hip}
 
 # -------------------------------------
 # Добавляем в основной датасет обозначение VarID.
 # -------------------------------------
-f = open(filename_hip_var)
-for s in f:
-    if len(s) < 3: # пустая строка
-        continue
-
-    var_id, HIP = s.split('|')
-    var_id = var_id.strip().replace('_', ' ')
-    var_id = var_id.replace('  ', ' ')
-    HIP = HIP.strip()
-
-    if HIP in df_compiled:
-        df_compiled[HIP]['VarID'] = var_id
-
-        # Добавляем и в кросс-словарь ключами VarID, значения - HIP.
-        if not(var_id in cross_bayer_hip):
-            cross_bayer_hip[var_id] = HIP
-f.close()
-
-fw = open('cross_bayer_hip.csv', 'w')
-for key in cross_bayer_hip:
-    fw.write(key + ',' + cross_bayer_hip[key] + '\n')
-fw.close()
+# Этап var: обозначения переменных звёзд.
+# Результат: var_ids - поле VarID для датасета, столбцами (с полем 'HIP'); cross_bayer_hip - словарь из этапа cross,
+# дополненный обозначениями переменных звёзд.
+@stage('var', files=[filename_hip_var], deps=['hip_index', 'cross'])
+def read_var(index, cross):
+    hips = hip_set(index) # звёзды основного датасета
+    var_ids = dict()
+    cross_bayer_hip = dict(cross['cross_bayer_hip']) # копия, чтобы не менять результат этапа cross
+
+    f = open(filename_hip_var)
+    for s in f:
+        if len(s) < 3: # пустая строка
+            continue
+
+        var_id, HIP = s.split('|')
+        var_id = var_id.strip().replace('_', ' ')
+        var_id = var_id.replace('  ', ' ')
+        HIP = HIP.strip()
+        count('rows_read')
+
+        if HIP in hips:
+            var_ids[HIP] = var_id
+            count('rows_in_dataset')
+
+            # Добавляем и в кросс-словарь ключами VarID, значения - HIP.
+            if not(var_id in cross_bayer_hip):
+                cross_bayer_hip[var_id] = HIP
+    f.close()
+
+    columns = {'HIP': np.array(list(var_ids), dtype=np.int32), 'VarID': np.array(list(var_ids.values()), dtype=str)}
+    return {'var_ids': columns, 'cross_bayer_hip': cross_bayer_hip}
+
 # ------------------------------------------------------------------
 # PASTEL - каталог, откуда можно взять температуру поверхности Teff.
 # ------------------------------------------------------------------
@@ -404,144 +525,401 @@ except_bayer = {
 'DQ Gru': '115510', # 6.108 6.364 7191
 'V1022 Cas': '118077', # 5.561 6.033 6327
 }
-dict_hip_teff = dict() # словарь, ключ: HIP, значение: массив температур Teff
-
 fields_pastel = (
     ('ID', 1, 33),  # ID звезды
-    #('RAdeg', 35, 49), # Right Ascension (J2000)
-    #('DEdeg', 51, 65), # Declination (J2000)
+    ('RAdeg', 35, 49, 'f'), # Right Ascension (J2000)
+    ('DEdeg', 51, 65, 'f'), # Declination (J2000)
     #('Bmag', 69, 74), # Johnson B magnitude from Simbad
-    #('Vmag', 83, 88),  # Johnson V magnitude from Simbad
-    ('Teff', 141, 145) )  # Effective temperature
-
-f = open(filename_pastel)
-for s in f:
-    if len(s) < 5: # пустые строки
-        continue
+    ('Vmag', 83, 88, 'f'),  # Johnson V magnitude from Simbad
+    ('Teff', 141, 145, 'f') )  # Effective temperature
 
-    data = dict() # строка каталога
-    for field in fields_pastel: # по полям данных строки
-        data[field[0]] = s[field[1]-1 : field[2]].strip()
-
-    if data['Teff'] == '': # без эффективной температуры строка не нужна
-        continue
+# Этап pastel_raw: чтение каталога PASTEL. Ни от чего не зависит, поэтому может выполняться
+# одновременно с чтением других каталогов.
+# Результат: поля fields_pastel строк каталога, в которых есть Teff (ID и Teff - списки, остальные - массивы).
+@stage('pastel_raw', files=[filename_pastel, 'src/fixed_width.py'])
+def read_pastel_raw():
+    f = FixedWidthFile(filename_pastel, min_length=4) # пустые строки пропускаются
 
+    # Без эффективной температуры строка не нужна (NaN).
     # Обнаружено три строки, где Teff - не цифра или слишком маленькое (7 и 1). Убираем.
-    try:
-        Teff_float = float(data['Teff'])
-    except:
-        continue
-    if Teff_float < 2000:
-        continue
-
-    # Переводим обозначение ID, которые записывались авторами как попало, в HIP.
-    ID = data['ID']
-    HIP = ''
-    
-    if ID[:3] == 'HIP':  # Номер по HIP.
-        HIP = ID[3:].strip()
-    
-    elif ID[:2] == 'HD': # Номер по HD.
-        HD = ID[2:].strip()
-        if HD in cross_hd_hip:
-            HIP = cross_hd_hip[HD]
-        elif HD in except_hd: # бывает, что указана буква компонента
-            HIP = except_hd[HD] # смотрим в исключениях
-        # Остальные HD игнорируются, их нет в нашем датасете.
-
-    elif ID[0] == '*' or ID[:2] == 'V*':  # обозначение по Байеру или обозн-е переменной звезды
-        Bayer = ID[2:].strip()
-        while '  ' in Bayer: # избавляемся от лишних пробелов
-            Bayer = Bayer.replace('  ', ' ')
-        if Bayer[:3] == 'tet': # в этом каталоге тэта пишется как tet
-            Bayer = 'the' + Bayer[3:]
-    
-        if Bayer in cross_bayer_hip:
-            HIP = cross_bayer_hip[Bayer]
-        elif Bayer in except_bayer: # в исключениях
-            HIP = except_bayer[Bayer]
-            # Поиск похожей звезды в Hip.
-            # Критерии: координаты, зв. вел-на.
-            # for H in df_compiled:
-            #     dRA = abs(float(data['RAdeg']) - float(df_compiled[H]['RAdeg']))
-            #     dDec = abs(float(data['DEdeg']) - float(df_compiled[H]['DEdeg']))
-            #     dVmag = abs(float(data['Vmag']) - float(df_compiled[H]['Vmag']))
-            #     if dRA < 0.2 and dDec < 0.2 and dVmag < 0.8 and not(ID in problem):
-            #         print(data['ID'], '|', data['Vmag'], '|', data['Teff'])
-            #         print(df_compiled[H]['Fl'], df_compiled[H]['Bayer'], df_compiled[H]['Bayer_cst'], '|', df_compiled[H]['Vmag'], '|', df_compiled[H]['SpType'], '|', 'HIP', H, '\n')
-            #         problem.append(ID)
-            #     if counter > 20:
-            #         break
-
-    # Запись в специальный словарь dict_hip_teff . Дело в том, что в каталоге PASTEL
-    # к одной звезде много измерений, и они отличаются. Нужно вычислить среднее значение
-    # в случае нескольких. Ключ: HIP, значение: массив Teff.
-    if HIP in df_compiled:
-        if not(HIP in dict_hip_teff): # новая звезда
-            dict_hip_teff[HIP] = [float(data['Teff'])]
-        else:
-            dict_hip_teff[HIP].append(float(data['Teff']))
-f.close()
-
-# Запись Teff в датасет.
-for HIP in dict_hip_teff:
-    if len(dict_hip_teff[HIP]) == 1: # одно значение Teff
-        Teff = str(int(dict_hip_teff[HIP][0]))
-    else: # вычисляется среднее значение
-        Teff = str(int(sum(dict_hip_teff[HIP]) / len(dict_hip_teff[HIP])))
-    df_compiled[HIP]['Teff'] = Teff
+    Teff = f.floats(141, 145)
+    rows = np.flatnonzero(Teff >= 2000)
+    blank = f.nulls(141, 145)
+    count('rows_read', len(f))
+    count('rejected_no_teff', blank.sum())
+    count('rejected_unparsable', (np.isnan(Teff) & ~blank).sum())
+    count('rejected_teff_lt_2000', (Teff < 2000).sum())
+    count('rows_selected', rows.size)
+    columns = f.read(fields_pastel, rows)
+    columns['ID'] = columns['ID'].tolist()
+    columns['Teff'] = columns['Teff'].tolist()
+    return columns
+
+# Этап pastel: эффективная температура. ID каталога PASTEL переводятся в номера HIP.
+# teff_method - как из нескольких измерений получается одно значение: 'mean' - среднее,
+# 'median' - медиана, 'clip' - среднее без выбросов (дальше 3 стандартных отклонений).
+# pastel_crossmatch - радиус (угловые секунды) для отождествления по координатам и звёздной величине
+# тех звёзд, обозначения которых не нашлись (0 - не отождествлять).
+# pastel_names - искать звёзды PASTEL и по собственным именам из указателя обозначений (по умолчанию нет,
+# как было раньше: тогда больше звёзд получает Teff).
+# Результат: поля Teff, Teff_n (кол-во измерений) и Teff_err (погрешность среднего)
+# для датасета, столбцами (с полем 'HIP').
+@stage('pastel', files=['src/fixed_width.py', 'src/running_stats.py', 'src/crossmatch.py'], deps=['pastel_raw', 'hip_index', 'ids'], params=['teff_method', 'pastel_crossmatch', 'pastel_names'])
+def read_pastel(pastel_raw, index, ids, teff_method = 'mean', pastel_crossmatch = 0, pastel_names = False):
+    hip_row = {HIP: i for i, HIP in enumerate(index['HIP'].tolist())} # номер строки датасета по HIP
+
+    list_ID = pastel_raw['ID']
+    list_Teff = pastel_raw['Teff']
+
+    # Переводим обозначения ID, которые записывались авторами как попало, в HIP - по указателю
+    # обозначений (этап ids). Обозначения, которых в нём нет (например, звёзд, которых нет
+    # в нашем датасете), игнорируются.
+    # Бывает, что указана буква компонента, которой нет в Hip, - такие обозначения взяты из исключений.
+    # Каждое разное обозначение ищется один раз; source - откуда оно взято (HIP, HD, except_hd,
+    # Bayer, except_bayer, name), для отчёта.
+    unique_IDs, inverse = np.unique(np.array(list_ID, dtype=str), return_inverse=True)
+    unique_rows = []
+    unique_sources = []
+    for ID in unique_IDs.tolist():
+        row = hip_row.get(ids.resolve(ID), -1)
+        source = ids.source(ID) if row >= 0 else ''
+        if source == 'name' and not pastel_names:
+            row, source = -1, ''
+        unique_rows.append(row)
+        unique_sources.append(source)
+    # номер строки датасета для каждого измерения (-1 - звезды нет)
+    rows = np.array(unique_rows, dtype=np.int64)[inverse.ravel()]
+    sources = np.array(unique_sources or [''], dtype=object)[inverse.ravel()]
+
+    # Звёзды, обозначения которых не нашлись, можно отождествить по координатам (см. crossmatch.py):
+    # ближайшая звезда датасета в пределах pastel_crossmatch угл. секунд, разница звёздных величин
+    # не больше 0,8m. Координаты PASTEL - на эпоху J2000, Hipparcos - J1991.25, поэтому радиус
+    # должен учитывать собственное движение. Неоднозначные отождествления не используются.
+    if pastel_crossmatch > 0:
+        rest = np.flatnonzero(rows < 0)
+        # Координаты и звёздные величины звёзд датасета - из Hipparcos (в результате этапа hip_index их нет).
+        f = FixedWidthFile(filename_hip, min_length=4)
+        cm = CrossMatch(f.floats(52, 63, index['rows']), f.floats(65, 76, index['rows']), f.floats(42, 46, index['rows']))
+        match = cm.match(pastel_raw['RAdeg'][rest], pastel_raw['DEdeg'][rest], pastel_raw['Vmag'][rest], \
+            radius=pastel_crossmatch, dmag=0.8)
+        matched = match['index'] >= 0
+        rows[rest[matched]] = match['index'][matched]
+        sources[rest[matched]] = 'crossmatch'
+        count('id_ambiguous', match['ambiguous'].sum())
+        print(f'PASTEL: по координатам отождествлено измерений: {matched.sum()}, неоднозначно: {match["ambiguous"].sum()}.')
+        for ID in sorted(set(np.array(list_ID)[rest[match['ambiguous']]].tolist())):
+            print(f'  неоднозначно: {ID}')
+
+    # Дело в том, что в каталоге PASTEL к одной звезде много измерений, и они отличаются.
+    # Нужно вычислить среднее значение в случае нескольких. Измерения собираются
+    # в статистику по строкам датасета за один проход (см. running_stats.py).
+    found = rows >= 0
+    # Для отчёта: как в итоге нашлась звезда каждого измерения (каждое учитывается один раз).
+    for source, n in zip(*np.unique(sources[found], return_counts=True)):
+        count('id_' + str(source), int(n))
+    count('id_unresolved', (~found).sum())
+    stats = RunningStats(len(hip_row), keep_values = teff_method != 'mean')
+    stats.add(rows[found], np.array(list_Teff)[found])
+    if teff_method == 'clip':
+        stats = stats.clipped(3)
+    Teff = stats.median() if teff_method == 'median' else stats.mean()
+
+    # Значения Teff для датасета.
+    present = np.flatnonzero(stats.n > 0)
+    return {'HIP': index['HIP'][present],
+        'Teff': Teff[present].astype(dtypes_compiled['Teff']), # дробная часть отбрасывается
+        'Teff_n': stats.n[present].astype(dtypes_compiled['Teff_n']),
+        'Teff_err': stats.err()[present]}
 
 # ------------------------------------------------------------------------------------------
 # Собственные имена звёзд взяты c Википедии.
 # Сформирован файл csv, который здесь читается.
 # ------------------------------------------------------------------------------------------
-f = open(filename_proper_names, encoding='utf-8')
-doub = []
-for s in f:
-    if len(s) < 3 or s[:3] == 'HIP': # пустая строка или заголовок
-        continue
-    l = s.split(',')
-    HIP = l[0].strip()
-    Name_r = l[1].strip()
-    Name = l[2].strip()
-    Bayer = l[3].strip()
-
-    if HIP in df_compiled:
-        df_compiled[HIP]['Name'] = Name
-        df_compiled[HIP]['Name_r'] = Name_r
-f.close()
+# Этап names: собственные имена.
+# Результат: поля Name и Name_r для датасета, столбцами (с полем 'HIP').
+@stage('names', files=[filename_proper_names], deps=['hip_index'])
+def read_names(index):
+    hips = hip_set(index) # звёзды основного датасета
+    names = dict()
+
+    f = open(filename_proper_names, encoding='utf-8')
+    for s in f:
+        if len(s) < 3 or s[:3] == 'HIP': # пустая строка или заголовок
+            continue
+        l = s.split(',')
+        HIP = l[0].strip()
+        Name_r = l[1].strip()
+        Name = l[2].strip()
+        Bayer = l[3].strip()
+        count('rows_read')
+
+        if HIP in hips:
+            names[HIP] = (Name, Name_r)
+            count('rows_in_dataset')
+    f.close()
+
+    return {'HIP': np.array(list(names), dtype=np.int32), \
+        'Name': np.array([Name for Name, Name_r in names.values()], dtype=str), \
+        'Name_r': np.array([Name_r for Name, Name_r in names.values()], dtype=str)}
+
+# Этап ids: единый указатель обозначений звёзд датасета -> HIP (см. identifiers.py):
+# номера HIP и HD, обозначения по Байеру и Флемстиду, переменных звёзд, собственные имена
+# и исключения для PASTEL (только если таких обозначений нет в каталогах).
+@stage('ids', files=['src/identifiers.py'], deps=['hip_index', 'var', 'names'])
+def build_ids(index, var, names):
+    ids = IdIndex()
+    list_HIP = index['HIP'].astype(str).tolist()
+    for HIP in list_HIP:
+        ids.add('HIP ' + HIP, HIP, source='HIP')
+
+    # Кросс-словарь, ключ - номер HD, значение - номер HIP
+    cross_hd_hip = dict()
+    for HIP, HD in zip(list_HIP, index['HD'].tolist()):
+        if HD != 0:
+            HD = str(HD)
+            if not(HD in cross_hd_hip):
+                cross_hd_hip[HD] = HIP
+            else:
+                print(f'HD {HD} дублируется, было HIP {cross_hd_hip[HD]}, записываетя {HIP}')
+        # Оказалось, что до 6,5m дубликатов HD нет.
+    for HD, HIP in cross_hd_hip.items():
+        ids.add('HD ' + HD, HIP, source='HD')
+    ids.update(var['cross_bayer_hip'], source='Bayer') # Байер, Флемстид, переменные звёзды
+
+    for HD, HIP in except_hd.items():
+        ids.add('HD ' + HD, HIP, replace=False, source='except_hd')
+    ids.update(except_bayer, replace=False, source='except_bayer')
+
+    # Собственные имена - последними, чтобы не заслонить обозначения. Для PASTEL они
+    # используются только с ключом --pastel-names (см. read_pastel).
+    for key in ('Name', 'Name_r'):
+        for HIP, name in zip(names['HIP'].tolist(), names[key].tolist()):
+            ids.add(name, HIP, replace=False, source='name')
+    count('ids', len(ids))
+    return ids
+
+# Поля датасета из результатов этапов cross, var, pastel, names - столбцы с полем 'HIP'.
+def enrich_sources(cross, var, teff, names):
+    return [cross['cross_data'], var['var_ids'], teff, names]
+
+# Дополнение таблицы датасета результатами этапов: созвездия (массив в порядке строк таблицы),
+# обозначения, Teff, имена (sources - столбцы с полем 'HIP', см. enrich_sources). Таблица изменяется на месте.
+def enrich(table, cst, sources):
+    table.set('Cst', cst)
+    for columns in sources:
+        table.update(columns)
+    return table
+
+# Этап compiled: сведение результатов всех этапов в окончательный датасет.
+@stage('compiled', deps=['hip', 'cst', 'cross', 'var', 'pastel', 'names'])
+def compile_dataset(table_hip, cst, cross, var, teff, names):
+    # Копия таблицы Hipparcos, чтобы не менять результат этапа hip.
+    return enrich(table_hip.copy(), cst, enrich_sources(cross, var, teff, names))
+
+# Дополнение таблицы полями для показа: расстояние, абсолютная величина, подписи (см. display_columns.py).
+# Таблица изменяется на месте.
+def add_display(table):
+    for key, values in display_columns(table).items():
+        table.set(key, values)
+    return table
+
+# Этап derived: поля датасета, вычисляемые из других (для показа звёзд).
+@stage('derived', files=['src/display_columns.py'], deps=['compiled'])
+def derive_dataset(table):
+    return add_display(table.copy())
 
 # ---------------------------------
 # Запись датафрейма в файл.
 # ---------------------------------
-fw = open('dataset_bright_stars.csv', 'w', encoding='utf-8')
-fe = open('dataset_bright_stars_excel.csv', 'w', encoding='cp1251') # для работы в русском Excel-е
-
-fw.write(','.join(keys_compiled) + '\n') # Строка заголовков.
-fe.write(';'.join(keys_compiled) + '\n') # Строка заголовков.
-
-for HIP in df_compiled:
-    data = df_compiled[HIP]
-    sw = '' # строка записи в датасет
-    se = ''
-    for key in keys_compiled: # цикл по последнему объеденённому словарю
-        sw += data[key] + ',' # для нормального датасета
-        # для Экселя
-        if '.' in data[key] and key != 'SpType':
-            se += data[key].replace('.', ',') + ';' # для Экселя десятичная часть отделяется ","
+# Запись кросс-словаря обозначений (результат этапа var).
+def write_cross_bayer(var):
+    cross_bayer_hip = var['cross_bayer_hip']
+    fw = open(filename_cross_bayer, 'w')
+    for key in cross_bayer_hip:
+        fw.write(key + ',' + cross_bayer_hip[key] + '\n')
+    fw.close()
+
+# Значения поля key таблицы датасета в виде строк - как в исходном каталоге.
+# Положения на другие эпохи (RAdeg_J2000 и т.п.) пишутся так же, как RAdeg и DEdeg.
+def column_text(table, key):
+    base = key.split('_J')[0]
+    if not base in formats_compiled:
+        return table.text(key)
+    values = table.text(key, formats_compiled[base])
+    # Поле каталога фиксированной ширины: если число не помещается, ноль перед точкой не пишется (-.03).
+    widths = [field[2] - field[1] + 1 for field in fields_hip if field[0] == base]
+    if not widths:
+        return values
+    return [s.replace('0.', '.', 1) if len(s) > widths[0] else s for s in values]
+
+# Объекты записи датасета (см. writers.py) в форматах formats (список: 'csv', 'excel', 'parquet',
+# 'feather', 'npy', 'sqlite', 'bin'). keys - список полей.
+def open_writers(formats, keys):
+    writers = []
+    for fmt in formats:
+        if fmt == 'csv':
+            writers.append(CsvWriter(filename_dataset, keys, column_text))
+        elif fmt == 'excel': # для работы в русском Excel-е
+            writers.append(ExcelCsvWriter(filename_dataset_excel, [key for key in keys if not key in keys_unicode], \
+                column_text, keys_text=['SpType']))
+        elif fmt == 'parquet':
+            writers.append(ArrowWriter(filename_dataset_parquet, keys, 'parquet'))
+        elif fmt == 'feather':
+            writers.append(ArrowWriter(filename_dataset_feather, keys, 'feather'))
+        elif fmt == 'npy':
+            writers.append(NpyWriter(dirname_dataset_npy, keys))
+        elif fmt == 'sqlite':
+            writers.append(SqliteWriter(filename_dataset_sqlite, keys))
+        elif fmt == 'bin':
+            writers.append(BinaryWriter(filename_dataset_bin, keys))
         else:
-            se += data[key] + ';'
-    sw = sw[:-1] + '\n'
-    se = se[:-1] + '\n'
-
-    # Для Экселя - удаление символов, не входящих в кодировку 1251.
-    se2 = ''
-    for sym in se:
-        if 40 <= ord(sym) <= 125 or 1040 <= ord(sym) <= 1103 or sym == '\n': # если разрешённый символ
-            se2 += sym
-    
-    fw.write(sw)
-    fe.write(se2)
-
-fw.close()
-fe.close()
\ No newline at end of file
+            raise ValueError(f'Неизвестный формат датасета: {fmt}')
+    return writers
+
+# Запись порций датасета (таблиц) во все форматы сразу.
+def write_tables(tables, formats, keys):
+    writers = open_writers(formats, keys)
+    for table in tables:
+        count('rows_written', len(table))
+        for writer in writers:
+            writer.write(table)
+    for writer in writers:
+        writer.close()
+
+# Файлы, которые записывает этап write: датасет в форматах formats (для npy - файл поля HIP в папке),
+# кросс-словарь и указатель обозначений. Если какого-то нет, этап выполняется заново.
+def write_outputs(teff_stats = False, formats = ('csv', 'excel'), epochs = ()):
+    filenames = {'csv': filename_dataset, 'excel': filename_dataset_excel, 'parquet': filename_dataset_parquet, \
+        'feather': filename_dataset_feather, 'npy': os.path.join(dirname_dataset_npy, 'HIP.npy'), \
+        'sqlite': filename_dataset_sqlite, 'bin': filename_dataset_bin}
+    return [filenames[fmt] for fmt in formats if fmt in filenames] + [filename_cross_bayer, filename_ids]
+
+# Положения звёзд таблицы на эпохи epochs по собственному движению (см. epochs.py) -
+# поля RAdeg_J<эпоха>, DEdeg_J<эпоха>. Таблица дополняется на месте.
+def add_epochs(table, epochs):
+    if epochs:
+        pos = Epochs(table['RAdeg'], table['DEdeg'], table['pmRA'], table['pmDE'], table['Plx'])
+        for epoch in epochs:
+            for key, values in zip(epoch_keys(epoch), pos.at(epoch)):
+                table.set(key, values)
+    return table
+
+# Этап write: запись датасета, кросс-словаря и указателя обозначений.
+# teff_stats - записывать и поля Teff_n, Teff_err; formats - форматы датасета (см. open_writers);
+# epochs - эпохи, положения на которые добавляются в датасет (по умолчанию нет).
+@stage('write', files=['src/writers.py', 'src/binary_catalog.py', 'src/epochs.py'], deps=['derived', 'var', 'ids'], \
+    outputs=write_outputs, params=['teff_stats', 'formats', 'epochs'])
+def write_dataset(table, var, ids, teff_stats = False, formats = ('csv', 'excel'), epochs = ()):
+    write_cross_bayer(var)
+    ids.save(filename_ids)
+    if epochs: # таблица этапа derived не меняется
+        table = add_epochs(table.copy(), epochs)
+    write_tables([table], formats, keys_dataset(teff_stats, epochs))
+
+# Этап sqlite: только база SQLite (python src/compile_catalogs.py --stage sqlite).
+# Индексы на HIP (первичный ключ), HD, Cst, Vmag, SpType; полнотекстовый поиск по Name, Name_r, VarID;
+# R-дерево по координатам (см. SqliteWriter в writers.py).
+@stage('sqlite', files=['src/writers.py'], deps=['derived'], outputs=[filename_dataset_sqlite], params=['teff_stats'])
+def write_sqlite(table, teff_stats = False):
+    write_tables([table], ['sqlite'], keys_dataset(teff_stats))
+
+# ---------------------------------------------------------------------------------
+# Потоковая сборка - для глубоких каталогов (большое vmag_limit), когда держать в памяти
+# весь датасет накладно. Строки Hipparcos проходят порциями по chunk_size
+# через цепочку генераторов: чтение и отбор -> дополнение -> запись.
+# Справочные этапы (hip_index, cross, var, pastel, names, ids) выполняются заранее, как обычно
+# (из кэша, если он есть). Кросс-словарь и указатель обозначений сразу записываются в файлы,
+# а от результатов этапов остаются только поля датасета, упорядоченные по HIP (SortedColumns):
+# каждой порции достаётся только её диапазон номеров HIP, без поиска по всем строкам каталогов.
+# Во время записи в памяти:
+#   - одна порция - chunk_size строк со всеми полями датасета;
+#   - номера отобранных строк Hipparcos (8 байт на звезду датасета) и начала и длины строк
+#     файла Hipparcos (16 байт на строку файла), сам файл отображается в память (memmap);
+#   - поля других каталогов (обозначения, Teff, имена) массивами - только для звёзд, у которых они есть.
+# Форматы npy, feather и bin собирают перед записью весь датасет (bin упорядочивается по положению
+# на небе), поэтому в потоковой сборке памяти не экономят; csv, excel, parquet и sqlite пишутся порциями.
+# ---------------------------------------------------------------------------------
+# Чтение и отбор: порции датасета (таблицы StarTable) с данными из Hip. rows - номера строк каталога.
+def stream_hip(rows, chunk_size):
+    f = FixedWidthFile(filename_hip, min_length=4)
+    for start in range(0, rows.size, chunk_size):
+        yield hip_table(f, rows[start : start + chunk_size])
+
+# Дополнение порций созвездиями, обозначениями, Teff, именами и полями для показа.
+# sources - поля других каталогов (SortedColumns).
+def stream_enrich(chunks, sources):
+    from constellations import Constellations
+    cons = Constellations() # объект с каталогом созвездий
+    for table in chunks:
+        yield add_display(enrich(table, find_cst(cons, table), [columns.part(table) for columns in sources]))
+
+# Запись порций в файлы датасета.
+def stream_write(chunks, teff_stats = False, formats = ('csv', 'excel'), epochs = ()):
+    chunks = (add_epochs(table, epochs) for table in chunks)
+    write_tables(chunks, formats, keys_dataset(teff_stats, epochs))
+
+# Справочные этапы выполняются заранее (при jobs > 1 - параллельно).
+def compile_stream(pipeline, chunk_size, jobs = 1):
+    names_stages = ['hip_index', 'cross', 'var', 'pastel', 'names', 'ids']
+    if jobs > 1:
+        pipeline.run_parallel(names_stages, jobs)
+    index, cross, var, teff, names, ids = [pipeline.run(name) for name in names_stages]
+    write_cross_bayer(var)
+    ids.save(filename_ids)
+    rows = index['rows']
+    sources = [SortedColumns(columns) for columns in enrich_sources(cross, var, teff, names)]
+    # Словари этапов дальше не нужны - память освобождается до начала потока.
+    del index, cross, var, teff, names, ids
+    pipeline.release(names_stages)
+
+    chunks = stream_hip(rows, chunk_size)
+    chunks = stream_enrich(chunks, sources)
+    # Чтение, дополнение и запись идут вместе, порциями, - в отчёте это один шаг stream.
+    pipeline.measure('stream', stream_write, chunks, pipeline.params['teff_stats'], pipeline.params['formats'], \
+        pipeline.params['epochs'])
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Сборка датасета ярких звёзд из астрономических каталогов.')
+    parser.add_argument('--stage', default='write', help='этап, который нужно выполнить (по умолчанию write - весь датасет)')
+    parser.add_argument('--force', action='store_true', help='выполнить все этапы заново, без кэша')
+    parser.add_argument('--cache-dir', default='src/cache', help='папка для кэша этапов')
+    parser.add_argument('--list', action='store_true', help='показать список этапов')
+    parser.add_argument('--vmag-limit', type=float, default=6.5, help='предельная звёздная величина (по умолчанию 6.5)')
+    parser.add_argument('--stream', action='store_true', help='потоковая сборка порциями (для глубоких каталогов)')
+    parser.add_argument('--chunk-size', type=int, default=10000, help='размер порции строк для --stream')
+    parser.add_argument('--teff-method', choices=['mean', 'median', 'clip'], default='mean', \
+        help='Teff из нескольких измерений PASTEL: среднее, медиана или среднее без выбросов')
+    parser.add_argument('--teff-stats', action='store_true', help='добавить поля Teff_n и Teff_err')
+    parser.add_argument('--pastel-crossmatch', type=float, default=0, \
+        help='радиус (угл. сек.) отождествления по координатам звёзд PASTEL, не найденных по обозначениям (0 - нет)')
+    parser.add_argument('--pastel-names', action='store_true', \
+        help='искать звёзды PASTEL и по собственным именам (больше звёзд с Teff; по умолчанию - только по обозначениям)')
+    parser.add_argument('--formats', default='csv,excel', \
+        help='форматы датасета через запятую: csv, excel, parquet, feather, npy, sqlite, bin (по умолчанию csv,excel)')
+    parser.add_argument('--epochs', nargs='?', const='2000,2016', default='', \
+        help='добавить положения звёзд на эпохи через запятую, например 2000,2016 (без значения - J2000 и J2016)')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help='кол-во процессов для параллельного выполнения этапов (1 - без параллельности)')
+    parser.add_argument('--report', default=None, \
+        help='записать отчёт о сборке в файл JSON: время, память и счётчики строк по этапам')
+    parser.add_argument('--profile', default='', \
+        help='этапы через запятую, которые выполняются под профилировщиком (all - все); результаты - в папке кэша')
+    parser.add_argument('--profiler', choices=['cprofile', 'pyinstrument'], default='cprofile', help='профилировщик для --profile')
+    args = parser.parse_args()
+
+    params = {'vmag_limit': args.vmag_limit, 'teff_method': args.teff_method, 'teff_stats': args.teff_stats, \
+        'pastel_crossmatch': args.pastel_crossmatch, 'pastel_names': args.pastel_names, 'formats': args.formats.split(','), \
+        'epochs': [float(epoch) for epoch in args.epochs.split(',') if epoch]}
+    profile = 'all' if args.profile == 'all' else [name for name in args.profile.split(',') if name]
+    pipeline = Pipeline(args.cache_dir, args.force, params, profile, args.profiler)
+    if args.list:
+        for name, st in stages.items():
+            files = ', '.join(st.files) if len(st.files) <= 3 else f'{st.files[0]} и ещё {len(st.files) - 1}'
+            print(f'{name}: зависит от {", ".join(st.deps) or "-"}; файлы: {files or "-"}')
+    elif args.stream:
+        compile_stream(pipeline, args.chunk_size, args.jobs)
+    elif args.jobs > 1:
+        pipeline.run_parallel(args.stage, args.jobs)
+    else:
+        pipeline.run(args.stage)
+    if args.report:
+        pipeline.write_report(args.report)
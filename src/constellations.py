@@ -4,8 +4,23 @@
 # Дмитрий Клыков, 2025. dyuk108.ru
 
 from shapely import geometry # модуль для работы с геометрией
+import shapely
+import numpy as np
+import hashlib
+import json
 import os
 
+# Кэш прочитанных границ созвездий (см. saveCache). Пересоздаётся автоматически при изменении файлов границ
+# или кода этого модуля.
+filename_cache = 'src/cache/boundaries_cache.npz'
+# Файл с сеткой созвездий на небе (см. buildGrid). Создаётся командой: python src/constellations.py
+filename_grid = 'src/cache/cons_grid.npz'
+# Контрольная сумма файлов границ вместе с их размерами и временем изменения (см. hashBoundaries).
+filename_hash = 'src/cache/boundaries_hash.json'
+# Код этого модуля - входит в контрольную сумму границ (см. hashBoundaries).
+filename_code = os.path.abspath(__file__)
+GRID_BOUNDARY = 255 # код ячейки сетки, через которую проходит граница созвездий
+
 class Constellations:
     # Функция, читающая из файла filename точки, обозначающие границы созвездий,
     # и выдающая их в виде списка.
@@ -103,23 +118,202 @@ class Constellations:
             
         f.close()
 
-        # Для Змеи имена ser1.txt и ser1.txt (два участка).
-        for key in self.clist: # по созвездиям
-            if key != 'Ser': # Змея
-                filename = 'src/boundaries/' + key.lower() + '.txt'
-            else:
-                filename = 'src/boundaries/ser1.txt' # второй кусок Змеи добавим после
-            if not os.path.isfile(filename):
-                print(f'Не найден файл {filename} . Пропуск.')
+        # Границы берутся из кэша, если файлы границ с тех пор не менялись. Иначе читаются из
+        # текстовых файлов, и кэш записывается заново.
+        self.source_hash = self.hashBoundaries()
+        if not self.loadCache(filename_cache):
+            # Для Змеи имена ser1.txt и ser1.txt (два участка).
+            for key in self.clist: # по созвездиям
+                if key != 'Ser': # Змея
+                    filename = 'src/boundaries/' + key.lower() + '.txt'
+                else:
+                    filename = 'src/boundaries/ser1.txt' # второй кусок Змеи добавим после
+                if not os.path.isfile(filename):
+                    print(f'Не найден файл {filename} . Пропуск.')
+                    continue
+                self.clist[key]['polygon'] = self.getPolygon(filename) # добавляем в словарь массив точек
+                self.clist[key]['polygon_norm'] = self.normPolygon(key) # добавляем в словарь массив точек
+
+                if key == 'Ser' and os.path.isfile('src/boundaries/ser2.txt'): # ох уж эта Змея, добавляем второй кусок
+                    self.clist[key]['polygon2'] = self.getPolygon('src/boundaries/ser2.txt') # добавляем в словарь массив точек
+                    self.clist[key]['polygon2_norm'] = self.clist[key]['polygon2'].copy() # здесь просто копия
+            self.saveCache(filename_cache)
+
+        self.prepareShapes()
+
+        # Сетка созвездий, если она уже построена.
+        self.grid = None
+        if os.path.isfile(filename_grid):
+            self.loadGrid(filename_grid)
+
+    # Контрольная сумма (sha1) списка созвездий, всех файлов границ из папки boundaries и кода этого
+    # модуля (разбор границ, normPolygon, построение сетки - при их правке кэш и сетка строятся заново).
+    # По ней проверяется, актуальны ли кэш границ и сетка созвездий.
+    # Файлы читаются, только если изменились их размеры или время изменения (os.stat) -
+    # иначе берётся сумма, записанная в filename_hash в прошлый раз.
+    def hashBoundaries(self):
+        filenames = sorted(os.listdir('src/boundaries')) if os.path.isdir('src/boundaries') else []
+        filenames = [filename for filename in filenames if filename.endswith('.txt')]
+        st = os.stat(filename_code)
+        stats = [' '.join(self.clist), ['constellations.py', st.st_size, st.st_mtime_ns]]
+        for filename in filenames:
+            st = os.stat('src/boundaries/' + filename)
+            stats.append([filename, st.st_size, st.st_mtime_ns])
+        if os.path.isfile(filename_hash):
+            with open(filename_hash, encoding='utf-8') as f:
+                saved = json.load(f)
+            if saved.get('stats') == stats:
+                return saved['hash']
+
+        h = hashlib.sha1()
+        h.update(' '.join(self.clist).encode())
+        with open(filename_code, 'rb') as f:
+            h.update(f.read())
+        for filename in filenames:
+            h.update(filename.encode())
+            with open('src/boundaries/' + filename, 'rb') as f:
+                h.update(f.read())
+        if filenames:
+            os.makedirs(os.path.dirname(filename_hash), exist_ok=True)
+            with open(filename_hash, 'w', encoding='utf-8') as f:
+                json.dump({'stats': stats, 'hash': h.hexdigest()}, f)
+        return h.hexdigest()
+
+    # Запись прочитанных границ в кэш - один файл .npz. Точки всех созвездий записаны подряд
+    # в массивы points и points_norm, а кол-во точек каждого созвездия - в counts и counts_norm.
+    def saveCache(self, filename):
+        if not os.path.isdir('src/boundaries'): # границ нет - кэшировать нечего
+            return
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        names = [key for key in self.clist if 'polygon' in self.clist[key]]
+        ser2 = self.clist['Ser'].get('polygon2', []) if 'Ser' in self.clist else []
+        np.savez(filename, hash=self.source_hash, names=names,
+            counts=[len(self.clist[key]['polygon']) for key in names],
+            counts_norm=[len(self.clist[key]['polygon_norm']) for key in names],
+            points=np.array([p for key in names for p in self.clist[key]['polygon']]).reshape(-1, 2),
+            points_norm=np.array([p for key in names for p in self.clist[key]['polygon_norm']]).reshape(-1, 2),
+            ser2=np.array(ser2).reshape(-1, 2))
+
+    # Чтение границ из кэша. Возвращает False, если кэша нет или он устарел.
+    def loadCache(self, filename):
+        if not os.path.isfile(filename):
+            return False
+        data = np.load(filename)
+        if str(data['hash']) != self.source_hash:
+            return False
+
+        points = data['points'].tolist()
+        points_norm = data['points_norm'].tolist()
+        start = start_norm = 0
+        for key, count, count_norm in zip(data['names'], data['counts'], data['counts_norm']):
+            key = str(key)
+            self.clist[key]['polygon'] = list(map(tuple, points[start : start + count]))
+            self.clist[key]['polygon_norm'] = list(map(tuple, points_norm[start_norm : start_norm + count_norm]))
+            start += count
+            start_norm += count_norm
+        if len(data['ser2']) > 0:
+            self.clist['Ser']['polygon2'] = list(map(tuple, data['ser2'].tolist()))
+            self.clist['Ser']['polygon2_norm'] = self.clist['Ser']['polygon2'].copy() # здесь просто копия
+        return True
+
+    # Подготовка геометрии для быстрого определения созвездий.
+    # Многоугольники shapely строятся один раз (а не при каждом вызове whatCons) и "подготавливаются"
+    # (prepare) - так проверка попадания точки идёт намного быстрее. Признак перехода через нулевой
+    # мередиан check0RA() тоже вычисляется один раз.
+    # Для предварительного отбора точек запоминаются габаритные прямоугольники созвездий (bounds).
+    def prepareShapes(self):
+        self.shapes = [] # список кортежей (краткое название, многоугольник, признак 0-го мередиана)
+        bounds = []
+        for key in self.clist:
+            if not 'polygon_norm' in self.clist[key]: # нет файла с границами
                 continue
-            self.clist[key]['polygon'] = self.getPolygon(filename) # добавляем в словарь массив точек
-            self.clist[key]['polygon_norm'] = self.normPolygon(key) # добавляем в словарь массив точек
+            polygon = geometry.Polygon(self.clist[key]['polygon_norm'])
+            shapely.prepare(polygon)
+            self.shapes.append((key, polygon, self.check0RA(key)))
+            bounds.append(polygon.bounds)
+        self.bounds = np.array(bounds).reshape(-1, 4) # minRA, minDec, maxRA, maxDec
 
-            if key == 'Ser' and os.path.isfile('src/boundaries/ser2.txt'): # ох уж эта Змея, добавляем второй кусок
-                self.clist[key]['polygon2'] = self.getPolygon('src/boundaries/ser2.txt') # добавляем в словарь массив точек
-                self.clist[key]['polygon2_norm'] = self.clist[key]['polygon2'].copy() # здесь просто копия
+        # Второй ("левый") участок Змеи.
+        self.shape_ser2 = None
+        if 'Ser' in self.clist and 'polygon2_norm' in self.clist['Ser']:
+            self.shape_ser2 = geometry.Polygon(self.clist['Ser']['polygon2_norm'])
+            shapely.prepare(self.shape_ser2)
+
+        # Названия созвездий по кодам сетки (см. gridNames) - для ser=False и ser=True.
+        names = [key for key, polygon, wrap0 in self.shapes]
+        self.grid_names = {False: np.array(names + ['Ser'], dtype=object),
+            True: np.array(['Ser1' if name == 'Ser' else name for name in names] + ['Ser2'], dtype=object)}
+
+    # Построение сетки созвездий на небе: RA от 0 до 360, Dec от -90 до 90 с шагом step градусов.
+    # Почти все ячейки сетки целиком лежат внутри одного созвездия, тогда для любой точки внутри ячейки
+    # созвездие определяется просто по индексу массива. В ячейке записывается номер созвездия в списке
+    # self.shapes (номер len(self.shapes) - второй участок Змеи) или GRID_BOUNDARY, если ячейку пересекает
+    # граница (или ячейку не удалось однозначно отнести к одному созвездию). Для таких ячеек созвездие
+    # определяется точной проверкой по многоугольникам.
+    # Шаг лучше брать вида 1/2**n (0.5, 0.25), чтобы деление на шаг было точным.
+    def buildGrid(self, step = 0.5):
+        nRA = int(round(360 / step))
+        nDec = int(round(180 / step))
+        RA0, Dec0 = np.meshgrid(np.arange(nRA) * step, np.arange(nDec) * step - 90) # левые нижние углы ячеек
+        RA0 = RA0.ravel()
+        Dec0 = Dec0.ravel()
+
+        code = np.full(RA0.size, GRID_BOUNDARY, dtype=np.uint8) # созвездие, целиком содержащее ячейку
+        count = np.zeros(RA0.size, dtype=np.int32) # сколько созвездий задевает ячейку
+
+        polygons = [(polygon, wrap0) for key, polygon, wrap0 in self.shapes]
+        if self.shape_ser2 is not None:
+            polygons.append((self.shape_ser2, False))
+        for i, (polygon, wrap0) in enumerate(polygons):
+            RA_norm = RA0
+            if wrap0: # ячейки правее RA = 270 сдвигаем так же, как точки в whatCons
+                RA_norm = np.where(RA0 >= 270, RA0 - 360, RA0)
+            minRA, minDec, maxRA, maxDec = polygon.bounds
+            cells = np.flatnonzero((RA_norm <= maxRA) & (RA_norm + step >= minRA) & (Dec0 <= maxDec) & (Dec0 + step >= minDec))
+            boxes = shapely.box(RA_norm[cells], Dec0[cells], RA_norm[cells] + step, Dec0[cells] + step)
+            count[cells] += shapely.intersects(polygon, boxes)
+            code[cells[shapely.contains_properly(polygon, boxes)]] = i
+
+        code[count != 1] = GRID_BOUNDARY
+        # Ячейки, в которые попадает RA = 270 (если шаг не делит 270 нацело), - на точную проверку.
+        code[(RA0 < 270) & (RA0 + step > 270)] = GRID_BOUNDARY
+
+        self.grid = code.reshape(nDec, nRA)
+        self.grid_step = step
+        return self.grid
+
+    # Запись сетки в файл (сжатый .npz). Вместе с сеткой записывается контрольная сумма файлов границ,
+    # чтобы при чтении убедиться, что сетка построена по тем же границам.
+    def saveGrid(self, filename = filename_grid):
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        np.savez_compressed(filename, grid=self.grid, step=self.grid_step, hash=self.source_hash)
+
+    # Чтение сетки из файла. Если файлы границ с тех пор изменились, сетка не используется.
+    def loadGrid(self, filename = filename_grid):
+        data = np.load(filename)
+        if not 'hash' in data or str(data['hash']) != self.source_hash:
+            print(f'Сетка созвездий {filename} не соответствует границам. Нужно построить заново.')
+            return
+        self.grid = data['grid']
+        self.grid_step = float(data['step'])
+
+    # Коды ячеек сетки для массивов RA и Dec. Точки, лежащие на линиях сетки (принадлежат сразу
+    # нескольким ячейкам) или вне диапазона координат, получают код GRID_BOUNDARY - для точной проверки.
+    def gridCodes(self, RA, Dec):
+        x = RA / self.grid_step
+        y = (Dec + 90) / self.grid_step
+        nDec, nRA = self.grid.shape
+        i = np.floor(x)
+        j = np.floor(y)
+        ok = (i >= 0) & (i < nRA) & (j >= 0) & (j < nDec) & (np.abs(x - np.round(x)) > 1e-9) & (np.abs(y - np.round(y)) > 1e-9)
+        codes = np.full(RA.shape, GRID_BOUNDARY, dtype=np.uint8)
+        codes[ok] = self.grid[j[ok].astype(np.intp), i[ok].astype(np.intp)]
+        return codes
+
+    # Названия созвездий по кодам сетки (массив для индексирования кодами, строится в prepareShapes).
+    def gridNames(self, ser = False):
+        return self.grid_names[bool(ser)]
 
-    
     # Функция, определяющая принадлежность точке с указанными координатами, тому или иному созвездию.
     # Выдаёт строку из краткого названия созвездия (маленькими буквами).
     # Если необязательный параметр ser установлен в True, то для Змеи выдаётся 'ser1' или 'ser2'
@@ -127,30 +321,30 @@ class Constellations:
     def whatCons(self, RA, Dec, ser = False):
         sCons = None # Возвращаемое значение. None не должно остаться, должно определиться.
 
+        # Если есть сетка и точка не в граничной ячейке - ответ сразу.
+        if self.grid is not None:
+            code = self.gridCodes(np.array([RA], dtype=float), np.array([Dec], dtype=float))[0]
+            if code != GRID_BOUNDARY:
+                return self.gridNames(ser)[code]
+
         # Проходим циклом по созвездиям, на какой участок попадёт, тот и будет ответом.
         # Для начала каждый раз будем прогонять полным циклом, вдруг будет ошибка и определится более одного созвездия.
-        for key in self.clist:
+        for key, polygon, wrap0 in self.shapes:
             RA_norm = RA
             # Если по созвездию проходит 0-й мередиан, корректируем RA.
-            if self.check0RA(key) and RA > 270:
+            if wrap0 and RA > 270:
                 RA_norm = RA - 360
 
             # Работа с библиотекой shapely.
-            line = geometry.LineString(self.clist[key]['polygon_norm'])
-            point = geometry.Point(RA_norm, Dec)
-            polygon = geometry.Polygon(line)
-            if polygon.contains(point): # если точка внутри фигуры
+            if shapely.contains_xy(polygon, RA_norm, Dec): # если точка внутри фигуры
                 sCons = key # краткое название
                 if key == 'Ser' and ser:
                     sCons = 'Ser1' # если нужно знать, какая часть; ser1 - "правая" Змея 
                 break # нашли - больше не ищем
 
         # Вторая Змея ("левая")
-        if sCons is None: # если ни один перечисленный участок не подошёл, проверм левую Змею
-            line = geometry.LineString(self.clist['Ser']['polygon2_norm'])
-            point = geometry.Point(RA, Dec)
-            polygon = geometry.Polygon(line)
-            if polygon.contains(point): # если точка внутри фигуры
+        if sCons is None and self.shape_ser2 is not None: # если ни один перечисленный участок не подошёл, проверм левую Змею
+            if shapely.contains_xy(self.shape_ser2, RA, Dec): # если точка внутри фигуры
                 sCons = 'Ser' # краткое название
                 if ser:
                     sCons = 'Ser2' # если нужно знать, какая часть; ser2 - "левая" Змея 
@@ -158,3 +352,64 @@ class Constellations:
         if sCons is None: # если ни один участок не опознан (такого не должно быть)
             print(f'Для точки {RA} {Dec} не найдено ни одно созвездие.')
         return sCons
+
+    # То же, что whatCons, но сразу для массивов координат RA и Dec (в градусах).
+    # Возвращает массив numpy (dtype=object) с краткими названиями созвездий, той же формы, что RA.
+    # Результат для каждой точки в точности совпадает с результатом whatCons: созвездия проверяются
+    # в том же порядке, каждая точка получает первое подошедшее.
+    # Если построена сетка (buildGrid), большинство точек определяется по ней, одним индексированием.
+    # Вместо цикла по звёздам - цикл по созвездиям: сначала отбираются ещё не определённые точки,
+    # попавшие в габаритный прямоугольник созвездия, затем они проверяются все разом (shapely.contains_xy).
+    def whatCons_many(self, RA, Dec, ser = False):
+        RA = np.asarray(RA, dtype=float)
+        Dec = np.asarray(Dec, dtype=float)
+        shape = RA.shape
+        RA = RA.ravel()
+        Dec = Dec.ravel()
+
+        result = np.full(RA.size, None, dtype=object)
+        rest = np.arange(RA.size) # индексы точек, для которых созвездие ещё не определено
+
+        if self.grid is not None:
+            codes = self.gridCodes(RA, Dec)
+            inner = codes != GRID_BOUNDARY
+            result[inner] = self.gridNames(ser)[codes[inner]]
+            rest = np.flatnonzero(~inner)
+
+        for i, (key, polygon, wrap0) in enumerate(self.shapes):
+            if rest.size == 0:
+                break
+            RA_norm = RA[rest]
+            if wrap0: # по созвездию проходит 0-й мередиан
+                RA_norm = np.where(RA_norm > 270, RA_norm - 360, RA_norm)
+            Dec_rest = Dec[rest]
+
+            # Отбор по габаритному прямоугольнику.
+            minRA, minDec, maxRA, maxDec = self.bounds[i]
+            inbox = np.flatnonzero((RA_norm >= minRA) & (RA_norm <= maxRA) & (Dec_rest >= minDec) & (Dec_rest <= maxDec))
+            if inbox.size == 0:
+                continue
+            inside = inbox[shapely.contains_xy(polygon, RA_norm[inbox], Dec_rest[inbox])]
+
+            if key == 'Ser' and ser:
+                result[rest[inside]] = 'Ser1'
+            else:
+                result[rest[inside]] = key
+            rest = np.delete(rest, inside)
+
+        # Вторая Змея ("левая").
+        if rest.size > 0 and self.shape_ser2 is not None:
+            inside = shapely.contains_xy(self.shape_ser2, RA[rest], Dec[rest])
+            result[rest[inside]] = 'Ser2' if ser else 'Ser'
+            rest = rest[~inside]
+
+        for i in rest: # если ни один участок не опознан (такого не должно быть)
+            print(f'Для точки {RA[i]} {Dec[i]} не найдено ни одно созвездие.')
+        return result.reshape(shape)
+
+# Построение сетки созвездий и запись её в файл filename_grid.
+if __name__ == '__main__':
+    cons = Constellations()
+    grid = cons.buildGrid()
+    cons.saveGrid()
+    print(f'Сетка {grid.shape[1]}x{grid.shape[0]} записана в {filename_grid}, граничных ячеек: {(grid == GRID_BOUNDARY).sum()}')
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+#
+# Отождествление звёзд разных каталогов по координатам (crossmatch).
+# Звёзды каталога, с которым сравнивают, переводятся в единичные векторы на небесной сфере
+# и помещаются в KD-дерево (scipy.spatial.cKDTree). Для целой порции внешних звёзд сразу
+# ищутся ближайшие звёзды каталога в пределах радиуса (угловые секунды) с разницей
+# звёздных величин не больше dmag. Если подходящих звёзд несколько, отождествление
+# неоднозначное - о нём сообщается, а звезда не отождествляется.
+# Векторы не зависят от RA, поэтому нет проблем ни с переходом через 0h, ни с полюсами.
+#
+# Пример:
+#   cm = CrossMatch(RA, Dec, Vmag) # каталог
+#   match = cm.match(RA_ext, Dec_ext, Vmag_ext, radius=30, dmag=0.8)
+#   match['index'] - номер звезды каталога (-1 - не найдена или неоднозначно)
+#
+# Дмитрий Клыков, 2025. dyuk108.ru
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+# Единичные векторы направлений на звёзды (координаты в градусах) - массив N x 3.
+def unit_vectors(RA, Dec):
+    RA = np.radians(np.asarray(RA, dtype=float))
+    Dec = np.radians(np.asarray(Dec, dtype=float))
+    return np.column_stack((np.cos(Dec) * np.cos(RA), np.cos(Dec) * np.sin(RA), np.sin(Dec)))
+
+# Длина хорды между единичными векторами, соответствующая углу (угловые секунды).
+def chord(arcsec):
+    return 2 * np.sin(np.radians(np.asarray(arcsec, dtype=float) / 3600) / 2)
+
+# Угол (угловые секунды), соответствующий длине хорды.
+def chord_to_arcsec(d):
+    return np.degrees(2 * np.arcsin(np.minimum(np.asarray(d, dtype=float) / 2, 1))) * 3600
+
+class CrossMatch:
+    # RA, Dec - координаты звёзд каталога (градусы), Vmag - звёздные величины (не обязательно).
+    # Звёзды без координат (NaN) в поиске не участвуют.
+    def __init__(self, RA, Dec, Vmag = None):
+        vectors = unit_vectors(RA, Dec)
+        self.ok = np.flatnonzero(np.isfinite(vectors).all(axis=1)) # номера звёзд с координатами
+        self.tree = cKDTree(vectors[self.ok])
+        self.Vmag = None if Vmag is None else np.asarray(Vmag, dtype=float)[self.ok]
+
+    def __len__(self):
+        return self.ok.size
+
+    # Отождествление порции внешних звёзд. radius - радиус поиска (угловые секунды),
+    # dmag - наибольшая разница звёздных величин (None - не проверять), k - сколько ближайших
+    # звёзд рассматривать. Звёзды с неизвестной величиной по величине не проходят.
+    # Результат - словарь массивов (по одному значению на внешнюю звезду):
+    # index - номер звезды каталога (-1 - не найдена или неоднозначно), sep - расстояние до
+    # ближайшей подходящей звезды (угл. сек., NaN - нет), count - кол-во подходящих звёзд,
+    # ambiguous - признак неоднозначного отождествления (подходящих звёзд больше одной).
+    def match(self, RA, Dec, Vmag = None, radius = 30.0, dmag = None, k = 8):
+        vectors = unit_vectors(RA, Dec)
+        n = vectors.shape[0]
+        index = np.full(n, -1)
+        sep = np.full(n, np.nan)
+        count = np.zeros(n, dtype=np.int64)
+
+        points = np.flatnonzero(np.isfinite(vectors).all(axis=1))
+        k = min(k, len(self))
+        if points.size > 0 and k > 0:
+            dist, nearest = self.tree.query(vectors[points], k=k, distance_upper_bound=chord(radius))
+            dist = dist.reshape(points.size, k)
+            nearest = nearest.reshape(points.size, k)
+            good = np.isfinite(dist) # в пределах радиуса (иначе расстояние - inf)
+            if dmag is not None and self.Vmag is not None:
+                V = np.asarray(Vmag, dtype=float)[points]
+                Vmag_cat = self.Vmag[np.minimum(nearest, len(self) - 1)]
+                good &= np.abs(Vmag_cat - V[:, np.newaxis]) <= dmag
+            count[points] = good.sum(axis=1)
+            # Ближайшая подходящая звезда: расстояния упорядочены, берётся первая подходящая.
+            first = np.argmax(good, axis=1)
+            found = good.any(axis=1)
+            rows = np.arange(points.size)
+            index[points[found]] = self.ok[nearest[rows, first][found]]
+            sep[points[found]] = chord_to_arcsec(dist[rows, first][found])
+
+        ambiguous = count > 1
+        index[ambiguous] = -1
+        return {'index': index, 'sep': sep, 'count': count, 'ambiguous': ambiguous}
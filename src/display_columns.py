@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+#
+# Поля датасета для показа звёзд (подписи на картах и диаграммах), вычисляемые из других полей
+# один раз при сборке, чтобы программам не нужно было делать это построчно:
+#   Dist_pc - расстояние (пк) по параллаксу, M_V - абсолютная звёздная величина
+#             (для неположительного параллакса и без него - пусто);
+#   Bayer_greek - буква Байера греческой буквой, номер - верхним индексом: 'alf' -> 'α', 'pi.02' -> 'π²';
+#   Label - обозначение: по Байеру ('α² CVn'), иначе по Флемстиду ('61 Cyg'), иначе переменной
+#           звезды ('V639 Cas'), иначе 'HIP 25'; если есть собственное имя - оно в скобках: 'α CMa (Sirius)';
+#   Label_r - то же с русским именем: 'α CMa (Сириус)'.
+# Разных обозначений по Байеру немного, каждое переводится один раз; подписи собираются
+# операциями над массивами строк numpy.
+#
+# Дмитрий Клыков, 2025. dyuk108.ru
+
+import numpy as np
+
+# Словарь греческих букв - написание латиницей как в доп файле ident4.doc для Hip.
+greek_hip = {'alf': 'α', 'bet': 'β', 'gam': 'γ', 'del': 'δ', 'eps': 'ε', 'zet': 'ζ', \
+        'eta': 'η', 'the': 'θ', 'iot': 'ι', 'kap': 'κ', 'lam': 'λ', 'mu.': 'μ', \
+        'nu.': 'ν', 'ksi': 'ξ', 'omi': 'ο', 'pi.': 'π', 'rho': 'ρ', 'sig': 'σ', \
+        'tau': 'τ', 'ups': 'υ', 'phi': 'φ', 'chi': 'χ', 'psi': 'ψ', 'ome': 'ω' }
+
+# Цифры верхним индексом.
+superscripts = str.maketrans('0123456789', '⁰¹²³⁴⁵⁶⁷⁸⁹')
+
+# Поля, которые здесь вычисляются.
+keys_display = ['Dist_pc', 'M_V', 'Bayer_greek', 'Label', 'Label_r']
+
+# Обозначение по Байеру одной строкой: буква (латиницей, как в Hip) и номер - 'pi.02' -> 'π²'.
+# Латинские буквы и обозначения переменных ('c', 'AR') остаются как есть.
+def to_greek(s):
+    letter = s.rstrip('0123456789')
+    number = s[len(letter):].lstrip('0')
+    return greek_hip.get(letter, letter) + number.translate(superscripts)
+
+# to_greek для массива строк: каждое разное значение переводится один раз.
+def greek_array(values):
+    distinct, inverse = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+    return np.array([to_greek(s) for s in distinct.tolist()] or [''], dtype=str)[inverse.ravel()]
+
+# Расстояние (пк) и абсолютная звёздная величина по Vmag и параллаксу Plx (mas).
+def distance_magnitude(Vmag, Plx):
+    Plx = np.where(np.asarray(Plx, dtype=float) > 0, Plx, np.nan)
+    return 1000 / Plx, np.asarray(Vmag, dtype=float) + 5 + 5 * np.log10(Plx / 1000)
+
+# Поля показа для таблицы датасета (StarTable или словарь полей; Fl - номера, 0 - нет).
+# Результат - словарь поле -> массив.
+def display_columns(table):
+    Dist_pc, M_V = distance_magnitude(table['Vmag'], table['Plx'])
+    cst = ' ' + np.asarray(table['Bayer_cst'], dtype=str)
+    bayer = greek_array(table['Bayer'])
+    Fl = np.asarray(table['Fl'])
+    # Переменные звёзды с обозначением по Байеру ('alf And') - тоже греческой буквой.
+    VarID = np.asarray(table['VarID'], dtype=str)
+    first, sep, rest = np.moveaxis(np.char.partition(VarID, ' '), -1, 0)
+    greek = np.isin(np.char.rstrip(first, '0123456789'), list(greek_hip))
+    VarID = np.where(greek, np.char.add(greek_array(first), np.char.add(sep, rest)), VarID)
+
+    label = np.char.add('HIP ', np.asarray(table['HIP']).astype(str))
+    label = np.where(VarID != '', VarID, label)
+    label = np.where(Fl != 0, np.char.add(Fl.astype(str), cst), label)
+    label = np.where(bayer != '', np.char.add(bayer, cst), label)
+    columns = {'Dist_pc': Dist_pc, 'M_V': M_V, 'Bayer_greek': bayer}
+    for key, name in (('Label', 'Name'), ('Label_r', 'Name_r')):
+        name = np.asarray(table[name], dtype=str)
+        columns[key] = np.where(name != '', np.char.add(label, np.char.add(np.char.add(' (', name), ')')), label)
+    return columns
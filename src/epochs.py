@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+#
+# Перенос положений звёзд на другую эпоху по собственному движению - сразу для всего каталога,
+# одним проходом по массивам numpy. Координаты Hipparcos даны на эпоху J1991.25.
+#   - Звёзды с параллаксом: строгая формула движения в пространстве (ESA 1997, т. 1, п. 1.5.5) -
+#     звезда летит по прямой с постоянной скоростью, направление на неё получается из вектора
+#     положения. Лучевая скорость в датасете не указана и считается нулевой (её можно передать - RV),
+#     тогда параллакс влияет на результат через изменение расстояния (перспективное ускорение).
+#   - Звёзды без параллакса (или с неположительным): линейно, RA += pmRA / cos(Dec) * t, Dec += pmDE * t.
+#   - Звёзды без собственного движения остаются на месте.
+# Положения на одну эпоху вычисляются один раз: последние cache_size эпох хранятся (LRU),
+# результат - массивы только для чтения.
+#
+# Пример:
+#   pos = Epochs(df['RAdeg'], df['DEdeg'], df['pmRA'], df['pmDE'], df['Plx'])
+#   RA, Dec = pos.at(2000) # J2000.0
+#   RA, Dec = pos.at('J2016.0'), pos.at(datetime.now(timezone.utc))
+#
+# Дмитрий Клыков, 2025. dyuk108.ru
+
+from collections import OrderedDict
+from datetime import date, datetime, timezone
+import numpy as np
+
+from crossmatch import unit_vectors
+from frames import lon_lat
+
+epoch_hip = 1991.25 # эпоха координат Hipparcos
+mas = np.radians(1 / 3.6e6) # миллисекунда дуги в радианах
+A = 4.740470446 # км/с, соответствующие 1 а.е. в год
+
+# Эпоха (юлианский год, например 2000.0) по числу, строке 'J2000' / '2016.5' или дате и времени
+# (datetime без часового пояса считается UTC, date - полночь UTC).
+def julian_epoch(epoch):
+    if isinstance(epoch, str):
+        return float(epoch.strip().lstrip('Jj'))
+    if isinstance(epoch, datetime):
+        if epoch.tzinfo is None:
+            epoch = epoch.replace(tzinfo=timezone.utc)
+        j2000 = datetime(2000, 1, 1, 12, tzinfo=timezone.utc)
+        return 2000.0 + (epoch - j2000).total_seconds() / 86400 / 365.25
+    if isinstance(epoch, date):
+        return julian_epoch(datetime(epoch.year, epoch.month, epoch.day))
+    return float(epoch)
+
+# Имена полей положений на эпоху: ('RAdeg_J2000', 'DEdeg_J2000').
+def epoch_keys(epoch):
+    return f'RAdeg_J{julian_epoch(epoch):g}', f'DEdeg_J{julian_epoch(epoch):g}'
+
+class Epochs:
+    # RA, Dec - координаты (градусы) на эпоху epoch; pmRA (mu_alpha * cos(delta)), pmDE - собственное
+    # движение (mas/год); Plx - параллакс (mas), RV - лучевая скорость (км/с), не обязательны.
+    # cache_size - сколько последних эпох хранить.
+    def __init__(self, RA, Dec, pmRA, pmDE, Plx = None, RV = None, epoch = epoch_hip, cache_size = 8):
+        self.RA = np.asarray(RA, dtype=float)
+        self.Dec = np.asarray(Dec, dtype=float)
+        self.pmRA = np.nan_to_num(np.asarray(pmRA, dtype=float))
+        self.pmDE = np.nan_to_num(np.asarray(pmDE, dtype=float))
+        Plx = np.full(self.RA.shape, np.nan) if Plx is None else np.asarray(Plx, dtype=float)
+        RV = np.zeros(self.RA.shape) if RV is None else np.nan_to_num(np.asarray(RV, dtype=float))
+        self.epoch = julian_epoch(epoch)
+        self.cache_size = cache_size
+        self.cache = OrderedDict() # эпоха -> (RA, Dec)
+
+        # Для строгой формулы: единичный вектор r, вектор собственного движения p * pmRA + q * pmDE
+        # (p, q - направления роста RA и Dec), лучевое движение zeta = RV * Plx / A (всё - в радианах в год).
+        self.rigorous = np.flatnonzero(Plx > 0)
+        RA, Dec = np.radians(self.RA[self.rigorous]), np.radians(self.Dec[self.rigorous])
+        p = np.column_stack((-np.sin(RA), np.cos(RA), np.zeros(RA.size)))
+        q = np.column_stack((-np.sin(Dec) * np.cos(RA), -np.sin(Dec) * np.sin(RA), np.cos(Dec)))
+        self.r = unit_vectors(self.RA[self.rigorous], self.Dec[self.rigorous])
+        self.pm = (p * self.pmRA[self.rigorous, None] + q * self.pmDE[self.rigorous, None]) * mas
+        self.zeta = RV[self.rigorous] * Plx[self.rigorous] / A * mas
+        self.linear = np.flatnonzero(~(Plx > 0))
+
+    def __len__(self):
+        return self.RA.size
+
+    # Положения (RA, Dec) на эпоху epoch (см. julian_epoch) - массивы только для чтения.
+    def at(self, epoch):
+        epoch = julian_epoch(epoch)
+        if epoch in self.cache:
+            self.cache.move_to_end(epoch)
+            return self.cache[epoch]
+        result = self.propagate(epoch - self.epoch)
+        for values in result:
+            values.setflags(write=False)
+        self.cache[epoch] = result
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return result
+
+    # Перенос на t лет (без кэша).
+    def propagate(self, t):
+        RA, Dec = self.RA.copy(), self.Dec.copy()
+        if t == 0:
+            return RA, Dec
+
+        # Строго: r(t) = (r * (1 + zeta * t) + pm * t) * f, f - нормировка вектора.
+        f = 1 / np.sqrt(1 + 2 * self.zeta * t + ((self.pm ** 2).sum(axis=1) + self.zeta ** 2) * t ** 2)
+        vectors = (self.r * (1 + self.zeta * t)[:, None] + self.pm * t) * f[:, None]
+        RA[self.rigorous], Dec[self.rigorous] = lon_lat(vectors)
+
+        # Линейно (у полюса, где cos(Dec) = 0, RA не меняется).
+        i = self.linear
+        cos = np.cos(np.radians(self.Dec[i]))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            dRA = np.where(cos > 0, self.pmRA[i] / cos, 0) * t / 3.6e6
+        RA[i] = (self.RA[i] + dRA) % 360
+        Dec[i] = np.clip(self.Dec[i] + self.pmDE[i] * t / 3.6e6, -90, 90)
+        return RA, Dec
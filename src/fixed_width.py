@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+#
+# Чтение текстовых каталогов с полями фиксированной ширины (формат CDS/VizieR) сразу столбцами.
+# Поля задаются так же, как в compile_catalogs.py: (имя, первый байт, последний байт), байты с 1.
+# Четвёртым элементом можно указать тип: 's' - строка (по умолчанию), 'f' - число с плавающей точкой,
+# 'i' - целое. Описание полей можно получить и из файла ReadMe каталога (fields_from_readme).
+#
+# Файл отображается в память (numpy.memmap), строки не разбираются по одной: для каждого поля
+# из всех строк сразу берутся нужные байты и превращаются в массив numpy. Пустые поля дают
+# NaN (для 'f'), 0 (для 'i') или '' (для 's'); какие поля пустые, показывает nulls().
+#
+# Дмитрий Клыков, 2025. dyuk108.ru
+
+import re
+import numpy as np
+
+class FixedWidthFile:
+    # min_length - строки короче этого (без символа перевода строки) пропускаются, как пустые.
+    # block_size - по сколько байт файла искать концы строк: файл просматривается кусками,
+    # чтобы не создавать вспомогательный массив размером с весь файл. В памяти остаются только
+    # начала и длины строк (16 байт на строку), байты полей читаются из файла по мере надобности.
+    def __init__(self, filename, min_length = 1, block_size = 1 << 24):
+        self.buf = np.memmap(filename, dtype=np.uint8, mode='r') if _file_size(filename) > 0 else np.zeros(0, dtype=np.uint8)
+        ends = [np.flatnonzero(self.buf[i : i + block_size] == 10) + i for i in range(0, self.buf.size, block_size)]
+        ends = np.concatenate(ends) if ends else np.zeros(0, dtype=np.intp) # позиции символов '\n'
+        if self.buf.size > 0 and self.buf[-1] != 10: # последняя строка без перевода строки
+            ends = np.append(ends, self.buf.size)
+        starts = np.concatenate(([0], ends[:-1] + 1))
+        # Символ '\r' в конце строки (файлы из Windows) в длину строки не входит.
+        has_cr = (ends > starts) & (self.buf[np.maximum(ends - 1, 0)] == 13)
+        lengths = ends - starts - has_cr
+
+        keep = lengths >= min_length
+        self.starts = starts[keep]
+        self.lengths = lengths[keep]
+
+    def __len__(self):
+        return self.starts.size
+
+    # Байты поля (start, end) всех строк (или строк с номерами rows) - матрица uint8 (строки x ширина поля).
+    # Если строка короче, недостающие байты заполняются пробелами.
+    def bytes(self, start, end, rows = None):
+        starts = self.starts if rows is None else self.starts[rows]
+        lengths = self.lengths if rows is None else self.lengths[rows]
+        offsets = np.arange(start - 1, end)
+        if lengths.size > 0 and lengths.min() >= end: # все строки достаточно длинные
+            return self.buf[starts[:, np.newaxis] + offsets[np.newaxis, :]]
+        inside = offsets[np.newaxis, :] < lengths[:, np.newaxis]
+        index = np.where(inside, starts[:, np.newaxis] + offsets[np.newaxis, :], 0)
+        data = self.buf[index] if self.buf.size > 0 else np.zeros(index.shape, dtype=np.uint8)
+        return np.where(inside, data, np.uint8(32))
+
+    # Признак пустого поля (одни пробелы).
+    def nulls(self, start, end, rows = None):
+        return (self.bytes(start, end, rows) == 32).all(axis=1)
+
+    # Поле как массив строк. strip=False - без удаления пробелов (нужно, если важны позиции символов).
+    def strings(self, start, end, rows = None, strip = True):
+        data = self.bytes(start, end, rows)
+        s = np.ascontiguousarray(data).view(f'S{end - start + 1}').ravel()
+        if strip:
+            s = np.char.strip(s)
+        if (data > 127).any(): # не только ASCII
+            return np.char.decode(s, 'latin-1')
+        return s.astype(f'U{end - start + 1}')
+
+    # Поле как массив чисел float64. Пустые и нечисловые значения - NaN.
+    def floats(self, start, end, rows = None):
+        data = self.bytes(start, end, rows)
+        blank = (data == 32).all(axis=1)
+        s = np.ascontiguousarray(data).view(f'S{end - start + 1}').ravel().copy()
+        s[blank] = b'nan'
+        try:
+            return s.astype(np.float64)
+        except ValueError: # есть нечисловые значения - разбираем по одному
+            return np.array([_to_float(x) for x in s], dtype=np.float64)
+
+    # Поле как массив целых int64. Пустые и нечисловые значения - 0.
+    def ints(self, start, end, rows = None):
+        values = self.floats(start, end, rows)
+        return np.where(np.isnan(values), 0, values).astype(np.int64)
+
+    # Чтение нескольких полей сразу. Возвращает словарь: имя поля -> массив.
+    def read(self, fields, rows = None):
+        columns = dict()
+        for field in fields:
+            kind = field[3] if len(field) > 3 else 's'
+            if kind == 'f':
+                columns[field[0]] = self.floats(field[1], field[2], rows)
+            elif kind == 'i':
+                columns[field[0]] = self.ints(field[1], field[2], rows)
+            else:
+                columns[field[0]] = self.strings(field[1], field[2], rows)
+        return columns
+
+def _file_size(filename):
+    with open(filename, 'rb') as f:
+        f.seek(0, 2)
+        return f.tell()
+
+def _to_float(s):
+    try:
+        return float(s)
+    except ValueError:
+        return np.nan
+
+# Описание полей из файла ReadMe каталога CDS (раздел "Byte-by-byte Description of file: ...").
+# Строки описания имеют вид:
+#    42- 46  F5.2   mag     Vmag      ? Magnitude in Johnson V (H5)
+#    48      I1     ---     VarFlag   *?[1,3] Coarse variability flag (H6)
+# filename - имя файла каталога, описание которого нужно (если в ReadMe описано несколько файлов).
+# labels - если указан, берутся только эти поля и в этом порядке.
+# Возвращает кортеж (имя, первый байт, последний байт, тип) для каждого поля.
+def fields_from_readme(readme, filename = None, labels = None):
+    pattern = re.compile(r'^\s*(\d+)(?:\s*-\s*(\d+))?\s+([AIFE])\d+(?:\.\d+)?\s+\S+\s+(\S+)')
+    kinds = {'A': 's', 'I': 'i', 'F': 'f', 'E': 'f'}
+    fields = dict()
+
+    section = False
+    f = open(readme, encoding='latin-1')
+    for s in f:
+        if s.startswith('Byte-by-byte Description of file'):
+            if section: # начался следующий раздел
+                break
+            section = filename is None or filename in s
+            continue
+        if not section:
+            continue
+        m = pattern.match(s)
+        if m:
+            start = int(m.group(1))
+            end = int(m.group(2)) if m.group(2) else start
+            fields[m.group(4)] = (m.group(4), start, end, kinds[m.group(3)])
+    f.close()
+
+    if labels is None:
+        return tuple(fields.values())
+    return tuple(fields[label] for label in labels)
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+#
+# Перевод координат между системами: экваториальная ICRS (RA, Dec), галактическая (l, b)
+# и эклиптическая J2000 (λ, β). Без astropy: каждая система получается из ICRS поворотом -
+# постоянной матрицей 3 x 3, которая умножается сразу на массив единичных векторов всех звёзд.
+#   - Галактическая: матрица из описания Hipparcos (ESA 1997, т. 1, п. 1.5.3) - полюс RA 192.85948°,
+#     Dec +27.12825°, начало долгот - по направлению на центр Галактики.
+#   - Эклиптическая: средние эклиптика и равноденствие J2000, наклон эклиптики 84381.406″ (IAU 2006).
+#     Отличие ICRS от равноденствия J2000 (менее 0,03″) не учитывается.
+#
+# Пример:
+#   GLON, GLAT = transform(RA, Dec, 'icrs', 'galactic')
+#   RA, Dec = transform(ELON, ELAT, 'ecliptic', 'icrs')
+#
+# Дмитрий Клыков, 2025. dyuk108.ru
+
+import numpy as np
+
+from crossmatch import unit_vectors
+
+# Матрица поворота ICRS -> галактическая система.
+matrix_galactic = np.array([[-0.0548755604162154, -0.8734370902348850, -0.4838350155487132],
+                            [+0.4941094278755837, -0.4448296299600112, +0.7469822444972189],
+                            [-0.8676661490190047, -0.1980763734312015, +0.4559837761750669]])
+
+# Матрица поворота ICRS -> эклиптическая система J2000: поворот вокруг оси x на наклон эклиптики.
+obliquity = np.radians(84381.406 / 3600)
+matrix_ecliptic = np.array([[1, 0, 0],
+                            [0, np.cos(obliquity), np.sin(obliquity)],
+                            [0, -np.sin(obliquity), np.cos(obliquity)]])
+
+# Системы координат: имя -> матрица поворота из ICRS.
+frames = {'icrs': np.eye(3), 'galactic': matrix_galactic, 'ecliptic': matrix_ecliptic}
+
+# Долгота (0..360) и широта (градусы) по массиву единичных векторов N x 3.
+def lon_lat(vectors):
+    lon = np.degrees(np.arctan2(vectors[:, 1], vectors[:, 0])) % 360
+    lat = np.degrees(np.arcsin(np.clip(vectors[:, 2], -1, 1)))
+    return lon, lat
+
+# Перевод координат (градусы; числа или массивы) из системы frame_from в frame_to.
+# Возвращает (долгота, широта) - массивы (для чисел - числа).
+def transform(lon, lat, frame_from, frame_to):
+    for frame in (frame_from, frame_to):
+        if not frame in frames:
+            raise ValueError(f'Неизвестная система координат: {frame} (есть {", ".join(frames)})')
+    # Из frame_from в ICRS - обратный (транспонированный) поворот, затем из ICRS в frame_to.
+    matrix = frames[frame_to] @ frames[frame_from].T
+    lon_to, lat_to = lon_lat(unit_vectors(np.ravel(lon), np.ravel(lat)) @ matrix.T)
+    if np.ndim(lon) == 0 and np.ndim(lat) == 0:
+        return float(lon_to[0]), float(lat_to[0])
+    return lon_to.reshape(np.shape(lon)), lat_to.reshape(np.shape(lat))
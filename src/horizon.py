@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+#
+# Горизонтальные координаты (высота, азимут) всех звёзд для наблюдателя и момента времени -
+# быстро, чтобы пересчитывать положения много раз в секунду (планетарий, анимация).
+# Звёзды один раз переводятся в единичные векторы (float32). Для каждого момента вычисляется
+# одна матрица 3 x 3: прецессия от J2000 на дату (IAU 1976), поворот на местное звёздное время
+# и на широту места. Она умножается сразу на векторы всех звёзд: вектор (север, восток, зенит).
+# Высота - arcsin третьей компоненты, азимут - от севера через восток.
+# Нутация, аберрация и разница UT1 - UTC не учитываются (ошибка меньше минуты дуги).
+# Координаты звёзд - ICRS (как в датасете), собственное движение можно учесть заранее (epochs.py).
+#   - Много моментов сразу (массив времени): результат - матрицы моменты x звёзды, вычисляются
+#     порциями моментов (chunk_size), чтобы не расходовать память.
+#   - Рефракция (refraction=True): к высоте добавляется поправка по формуле Беннета
+#     с учётом давления и температуры.
+#   - Отбор звёзд над горизонтом (visible): только сравнение одной компоненты вектора с порогом,
+#     без тригонометрии по звёздам; высота и азимут затем вычисляются лишь для видимых.
+#
+# Пример:
+#   sky = Horizon(df['RAdeg'], df['DEdeg'], lat=55.75, lon=37.62, refraction=True)
+#   t = np.datetime64('2025-01-01T20:00') # UTC; или юлианская дата, или datetime
+#   rows = sky.visible(t) # номера звёзд над горизонтом
+#   alt, az = sky.altaz(t, rows)
+#   alt, az = sky.altaz(t + np.arange(600) * np.timedelta64(1, 's')) # 600 моментов x все звёзды
+#
+# Дмитрий Клыков, 2025. dyuk108.ru
+
+from datetime import datetime, timezone
+from functools import lru_cache
+import numpy as np
+
+from crossmatch import unit_vectors
+
+jd2000 = 2451545.0 # юлианская дата эпохи J2000.0
+
+# Юлианская дата по моментам времени (UTC): число или массив - уже юлианские даты,
+# numpy.datetime64, datetime (без часового пояса - UTC) или массив таких значений.
+def julian_date(times):
+    if isinstance(times, datetime):
+        times = [times]
+        scalar = True
+    else:
+        scalar = np.ndim(times) == 0
+    times = np.asarray(times)
+    if times.dtype.kind == 'O':
+        times = np.array([t.astimezone(timezone.utc).replace(tzinfo=None) if t.tzinfo else t \
+            for t in times.ravel().tolist()], dtype='datetime64[us]').reshape(times.shape)
+    if times.dtype.kind == 'M':
+        jd = (times - np.datetime64('2000-01-01T12:00')) / np.timedelta64(1, 'D') + jd2000
+    else:
+        jd = times.astype(float)
+    return float(np.ravel(jd)[0]) if scalar else jd
+
+# Среднее звёздное время по Гринвичу (градусы, IAU 1982) для юлианских дат jd.
+def gmst(jd):
+    d = np.asarray(jd, dtype=float) - jd2000
+    T = d / 36525
+    return (280.46061837 + 360.98564736629 * d + 0.000387933 * T ** 2 - T ** 3 / 38710000) % 360
+
+# Матрицы поворота системы координат вокруг оси z и y на углы angle (радианы, число или массив K)
+# - массив 3 x 3 или K x 3 x 3.
+def rotation_z(angle):
+    c, s = np.cos(angle), np.sin(angle)
+    m = np.zeros(np.shape(angle) + (3, 3))
+    m[..., 0, 0], m[..., 0, 1], m[..., 1, 0], m[..., 1, 1], m[..., 2, 2] = c, s, -s, c, 1
+    return m
+
+def rotation_y(angle):
+    c, s = np.cos(angle), np.sin(angle)
+    m = np.zeros(np.shape(angle) + (3, 3))
+    m[..., 0, 0], m[..., 0, 2], m[..., 2, 0], m[..., 2, 2], m[..., 1, 1] = c, -s, s, c, 1
+    return m
+
+# Матрицы прецессии J2000 -> средний экватор и равноденствие даты (IAU 1976) для юлианских дат jd.
+def precession(jd):
+    T = (np.asarray(jd, dtype=float) - jd2000) / 36525
+    arcsec = np.radians(1 / 3600)
+    zeta = (2306.2181 * T + 0.30188 * T ** 2 + 0.017998 * T ** 3) * arcsec
+    z = (2306.2181 * T + 1.09468 * T ** 2 + 0.018203 * T ** 3) * arcsec
+    theta = (2004.3109 * T - 0.42665 * T ** 2 - 0.041833 * T ** 3) * arcsec
+    return rotation_z(-z) @ rotation_y(theta) @ rotation_z(-zeta)
+
+# Матрица прецессии на юлианскую дату day (целое число - полдень). За сутки прецессия меняется
+# на десятые доли секунды дуги, поэтому для всех моментов одних суток берётся одна матрица.
+@lru_cache(maxsize=1024)
+def daily_precession(day):
+    return precession(day)
+
+# Поправка за рефракцию (градусы) для истинной высоты alt (градусы), формула Беннета (Сэмундссона).
+# pressure - давление (гПа), temperature - температура (°C). Ниже -1° поправка не вычисляется (0).
+# Вычисляется в типе alt (float32 - быстрее), умножением на константы вместо np.radians и np.where.
+def refraction(alt, pressure = 1010.0, temperature = 10.0):
+    alt = np.asarray(alt)
+    h = np.maximum(alt, -1)
+    k = 1.02 / 60 * (pressure / 1010) * (283 / (273 + temperature))
+    return k / np.tan((h + 10.3 / (h + 5.11)) * (np.pi / 180)) * (alt > -1)
+
+# Поправка за рефракцию (градусы) для видимой высоты alt (градусы) - для перевода видимой высоты в истинную.
+def refraction_apparent(alt, pressure = 1010.0, temperature = 10.0):
+    R = 1 / np.tan(np.radians(alt + 7.31 / (alt + 4.4))) / 60
+    return R * (pressure / 1010) * (283 / (273 + temperature))
+
+class Horizon:
+    # RA, Dec - координаты звёзд (градусы, ICRS); lat, lon - широта и долгота места (градусы, восток - плюс).
+    # refraction - учитывать рефракцию (при давлении pressure гПа и температуре temperature °C).
+    def __init__(self, RA, Dec, lat, lon, refraction = False, pressure = 1010.0, temperature = 10.0):
+        self.vectors = unit_vectors(RA, Dec).T.astype(np.float32).copy() # 3 x N - строки x, y, z
+        self.lat = float(lat)
+        self.lon = float(lon)
+        self.refraction = refraction
+        self.pressure = pressure
+        self.temperature = temperature
+        # Матрица: экватор даты, повёрнутый на местное звёздное время, -> (север, восток, зенит).
+        phi = np.radians(self.lat)
+        self.local = np.array([[-np.sin(phi), 0, np.cos(phi)], [0, 1, 0], [np.cos(phi), 0, np.sin(phi)]])
+
+    def __len__(self):
+        return self.vectors.shape[1]
+
+    # Местное звёздное время (градусы) для моментов times (см. julian_date).
+    def lst(self, times):
+        return (gmst(julian_date(times)) + self.lon) % 360
+
+    # Матрицы ICRS -> горизонтальная система для моментов times - массив K x 3 x 3 (float32).
+    def matrices(self, times):
+        jd = np.atleast_1d(julian_date(times))
+        lst = np.radians(self.lst(jd))
+        days, inverse = np.unique(np.round(jd), return_inverse=True)
+        P = np.stack([daily_precession(day) for day in days.tolist()])[inverse.ravel()]
+        # Поворот вокруг оси мира на звёздное время: ось x - на точку экватора в меридиане (часовой угол 0),
+        # ось y - на точку востока (часовой угол -90°).
+        return (self.local @ rotation_z(lst) @ P).astype(np.float32)
+
+    # Истинная высота (градусы), ниже которой звезда не видна на видимой высоте min_alt.
+    def true_altitude(self, min_alt):
+        if not self.refraction:
+            return min_alt
+        return min_alt - refraction_apparent(min_alt, self.pressure, self.temperature)
+
+    # Номера звёзд выше min_alt (градусы, видимая высота) в момент times. Для массива моментов - список массивов.
+    # chunk_size - сколько моментов обрабатывать за раз (None - подобрать по числу звёзд).
+    def visible(self, times, min_alt = 0.0, chunk_size = None):
+        jd = julian_date(times)
+        zenith = self.matrices(jd)[:, 2] # K x 3: высота - только по третьей строке матрицы
+        threshold = np.float32(np.sin(np.radians(self.true_altitude(min_alt))))
+        result = []
+        step = self.chunk(chunk_size)
+        for start in range(0, zenith.shape[0], step):
+            z = zenith[start : start + step] @ self.vectors
+            result.extend(np.flatnonzero(row >= threshold) for row in z)
+        return result if np.ndim(jd) > 0 else result[0]
+
+    # Высота и азимут (градусы, float32) звёзд rows (None - всех) в моменты times.
+    # Для одного момента - массивы по звёздам, для массива моментов - матрицы моменты x звёзды.
+    def altaz(self, times, rows = None, chunk_size = None):
+        jd = julian_date(times)
+        matrices = self.matrices(jd)
+        vectors = self.vectors if rows is None else self.vectors[:, rows]
+        alt = np.empty((matrices.shape[0], vectors.shape[1]), dtype=np.float32)
+        az = np.empty_like(alt)
+        step = self.chunk(chunk_size)
+        for start in range(0, matrices.shape[0], step):
+            h = matrices[start : start + step] @ vectors # моменты x (север, восток, зенит) x звёзды
+            alt[start : start + step] = np.arcsin(np.clip(h[:, 2], -1, 1)) * (180 / np.pi)
+            az[start : start + step] = np.arctan2(h[:, 1], h[:, 0]) * (180 / np.pi)
+        az[az < 0] += 360
+        if self.refraction:
+            alt += refraction(alt, self.pressure, self.temperature)
+        if np.ndim(jd) > 0:
+            return alt, az
+        return alt[0], az[0]
+
+    # Сколько моментов обрабатывать за раз: промежуточный массив - около миллиона чисел.
+    def chunk(self, chunk_size):
+        return chunk_size or max(1, 2 ** 20 // (3 * max(len(self), 1)))
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+#
+# Единый указатель обозначений звёзд: HIP, HD, Байер, Флемстид, обозначения переменных звёзд,
+# собственные имена -> номер HIP.
+# Все обозначения приводятся к одному виду функцией normalize_id, поэтому, например,
+# "* tet  Aur", "tet Aur" и "the Aur" - одно и то же обозначение.
+# Для каждого обозначения можно запомнить источник (source, например, 'HD' или 'except_bayer') -
+# откуда оно взято; это нужно для отчёта о сборке.
+# Указатель сохраняется в файл .npz (массивы обозначений, номеров HIP и источников) и быстро загружается:
+#   ids = IdIndex.load('identifiers_hip.npz')
+#   ids.resolve('HD 48915') -> 32349
+# Из командной строки (из корня репозитория):
+#   python src/identifiers.py "alf CMa" "HD 48915"
+#
+# Дмитрий Клыков, 2025. dyuk108.ru
+
+import re
+import sys
+import numpy as np
+
+filename_ids = 'identifiers_hip.npz'
+
+# Приставки обозначений в SIMBAD: "* " - звезда, "** " - двойная звезда, "V* " - переменная звезда.
+prefix_simbad = re.compile(r'^(\*\*?|V\*)\s*')
+# Номер по каталогу: HIP 12345, HD 48915, HD 26015B.
+prefix_catalog = re.compile(r'^(HIP|HD)\s*(\S+)$')
+
+# Приведение обозначения к единому виду: без приставок SIMBAD, одиночные пробелы,
+# тэта - как в Hipparcos (the, а не tet), номер по каталогу - через пробел (HD 48915).
+def normalize_id(ID):
+    s = ' '.join(ID.split())
+    s = prefix_simbad.sub('', s)
+    if s[:3] == 'tet':
+        s = 'the' + s[3:]
+    m = prefix_catalog.match(s)
+    if m:
+        s = m.group(1) + ' ' + m.group(2)
+    return s
+
+class IdIndex:
+    def __init__(self):
+        self.ids = dict() # обозначение (приведённое) -> HIP
+        self.sources = dict() # обозначение (приведённое) -> источник (если указан)
+        self.memo = dict() # уже найденные обозначения (как есть) -> HIP
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, ID):
+        return self.resolve(ID) != 0
+
+    # Добавление обозначения ID звезды HIP. replace=False - не заменять уже имеющееся обозначение.
+    # source - откуда взято обозначение.
+    def add(self, ID, HIP, replace = True, source = ''):
+        key = normalize_id(ID)
+        if key == '' or not replace and key in self.ids:
+            return
+        self.ids[key] = int(HIP)
+        if source:
+            self.sources[key] = source
+        else:
+            self.sources.pop(key, None)
+        self.memo.clear()
+
+    # Добавление обозначений из словаря обозначение -> HIP.
+    def update(self, ids, replace = True, source = ''):
+        for ID, HIP in ids.items():
+            self.add(ID, HIP, replace, source)
+
+    # Номер HIP по обозначению (0, если обозначение неизвестно).
+    def resolve(self, ID):
+        HIP = self.memo.get(ID)
+        if HIP is None:
+            HIP = self.ids.get(normalize_id(ID), 0)
+            self.memo[ID] = HIP
+        return HIP
+
+    # Номера HIP по списку обозначений - массив int32 (0 - обозначение неизвестно).
+    def resolve_many(self, IDs):
+        return np.array([self.resolve(ID) for ID in IDs], dtype=np.int32)
+
+    # Источник обозначения ('' - неизвестно или обозначения нет).
+    def source(self, ID):
+        return self.sources.get(normalize_id(ID), '')
+
+    # Обозначения звезды HIP.
+    def names(self, HIP):
+        return [ID for ID, H in self.ids.items() if H == HIP]
+
+    def save(self, filename = filename_ids):
+        np.savez(filename, ids=np.array(list(self.ids), dtype=str), hips=np.array(list(self.ids.values()), dtype=np.int32), \
+            sources=np.array([self.sources.get(key, '') for key in self.ids], dtype=str))
+
+    @staticmethod
+    def load(filename = filename_ids):
+        data = np.load(filename, allow_pickle=False)
+        index = IdIndex()
+        index.ids = dict(zip(data['ids'].tolist(), data['hips'].tolist()))
+        if 'sources' in data.files: # в старых файлах источников нет
+            index.sources = {key: source for key, source in zip(data['ids'].tolist(), data['sources'].tolist()) if source}
+        return index
+
+    # Для pickle (кэш этапов) запоминание не нужно.
+    def __getstate__(self):
+        return {'ids': self.ids, 'sources': self.sources}
+
+    def __setstate__(self, state):
+        self.ids = state['ids']
+        self.sources = state.get('sources', dict())
+        self.memo = dict()
+
+if __name__ == '__main__':
+    ids = IdIndex.load()
+    for ID in sys.argv[1:]:
+        HIP = ids.resolve(ID)
+        print(f'{ID}: HIP {HIP}' if HIP else f'{ID}: не найдено')
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+#
+# Простой механизм сборки датасета по этапам (stages) с кэшированием результатов.
+# Этап - функция, которая получает результаты этапов, от которых зависит (deps), и читает
+# свои исходные файлы (files). Результат этапа сохраняется в кэш (pickle) вместе с ключом -
+# контрольной суммой исходных файлов, кода функции и ключей предыдущих этапов.
+# Если ничего из этого не изменилось, этап не выполняется, результат берётся из кэша.
+# Например, при правке списка имён звёзд заново выполняются только этапы, которые от него зависят.
+# Этап может иметь параметры сборки (params, например, предельная звёздная величина) - они передаются
+# функции этапа именованными аргументами и тоже входят в ключ.
+# Независимые этапы можно выполнять параллельно, в нескольких процессах (run_parallel).
+# Для каждого этапа замеряются время, память и счётчики строк (см. build_report.py) - отчёт о сборке
+# записывается методом write_report. Этапы из списка profile выполняются под профилировщиком.
+#
+# Дмитрий Клыков, 2025. dyuk108.ru
+
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import hashlib
+import inspect
+import os
+import pickle
+import time
+import types
+
+from build_report import measure, write_report
+
+# Зарегистрированные этапы. Ключ - имя этапа.
+stages = dict()
+
+class Stage:
+    def __init__(self, name, func, files, deps, outputs, params):
+        self.name = name
+        self.func = func # функция этапа, аргументы - результаты этапов deps
+        self.files = files # исходные файлы
+        self.deps = deps # имена этапов, от которых зависит этот
+        # Файлы, которые этап записывает (если их нет, этап выполняется заново): список или функция,
+        # получающая параметры этапа и возвращающая список (если файлы зависят от параметров).
+        self.outputs = outputs
+        self.params = params # имена параметров сборки, нужных этапу
+
+# Декоратор, регистрирующий функцию как этап сборки.
+def stage(name, files = (), deps = (), outputs = (), params = ()):
+    def register(func):
+        stages[name] = Stage(name, func, list(files), list(deps), outputs if callable(outputs) else list(outputs), list(params))
+        return func
+    return register
+
+# Контрольная сумма кода функции этапа. Учитываются и глобальные объекты, к которым она
+# обращается: вспомогательные функции (их код) и таблицы данных (словари, списки полей и т.п.).
+# Поэтому правка, например, списка исключений для PASTEL перезапустит только этап PASTEL.
+# Вспомогательные функции просматриваются так же, рекурсивно (seen - уже учтённые функции).
+def code_hash(func, seen = None):
+    if seen is None:
+        seen = set()
+    seen.add(func)
+    h = hashlib.sha1(inspect.getsource(func).encode())
+    for name in func.__code__.co_names:
+        obj = func.__globals__.get(name)
+        if isinstance(obj, types.FunctionType):
+            if not obj in seen:
+                h.update(code_hash(obj, seen).encode())
+        elif isinstance(obj, (dict, list, tuple, str, int, float)):
+            h.update(repr(obj).encode())
+    return h.hexdigest()
+
+# Контрольная сумма файла.
+def file_hash(filename):
+    h = hashlib.sha1()
+    with open(filename, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+class Pipeline:
+    # cache_dir - папка для кэша результатов этапов.
+    # force - выполнить все этапы заново, не глядя в кэш.
+    # params - словарь параметров сборки (имя -> значение).
+    # profile - имена этапов, которые выполняются под профилировщиком profiler ('cprofile' или
+    # 'pyinstrument'), 'all' - все этапы. Результаты профилировщика записываются в папку кэша.
+    def __init__(self, cache_dir = 'src/cache', force = False, params = None, profile = (), profiler = 'cprofile'):
+        self.cache_dir = cache_dir
+        self.force = force
+        self.params = params or dict()
+        self.profile = profile
+        self.profiler = profiler
+        self.keys = dict() # ключи этапов
+        self.results = dict() # результаты этапов, уже полученные в этом запуске
+        self.report = dict() # замеры этапов для отчёта о сборке
+        self.started = time.perf_counter()
+
+    # Ключ этапа: имя, код, исходные файлы, параметры и ключи этапов, от которых он зависит.
+    def key(self, name):
+        if not name in self.keys:
+            st = stages[name]
+            h = hashlib.sha1(name.encode())
+            h.update(code_hash(st.func).encode())
+            for filename in st.files:
+                h.update(filename.encode())
+                h.update(file_hash(filename).encode())
+            for param in st.params:
+                h.update(f'{param}={self.params[param]!r}'.encode())
+            for dep in st.deps:
+                h.update(self.key(dep).encode())
+            self.keys[name] = h.hexdigest()
+        return self.keys[name]
+
+    # Результат этапа name из кэша, если ключ совпадает. Возвращает True, если результат загружен.
+    def load(self, name):
+        st = stages[name]
+        cache_file = os.path.join(self.cache_dir, name + '.pickle')
+        outputs_ok = all(os.path.isfile(filename) for filename in self.outputs(name))
+        if self.force or not outputs_ok or not os.path.isfile(cache_file):
+            return False
+
+        wall = time.perf_counter()
+        with open(cache_file, 'rb') as f:
+            cached = pickle.load(f)
+        if cached['key'] != self.key(name):
+            return False
+        print(f'Этап {name}: результат взят из кэша.')
+        self.results[name] = cached['result']
+        # Счётчики - те, что были при выполнении этапа.
+        self.report[name] = {'cached': True, 'wall': time.perf_counter() - wall, 'counters': cached.get('counters', dict())}
+        return True
+
+    # Результаты этапов names больше не нужны в этом запуске - освобождение памяти
+    # (при повторном обращении этап загружается из кэша).
+    def release(self, names):
+        for name in names:
+            self.results.pop(name, None)
+
+    # Файлы, которые записывает этап name (при параметрах сборки этого запуска).
+    def outputs(self, name):
+        st = stages[name]
+        if callable(st.outputs):
+            return st.outputs(**{param: self.params[param] for param in st.params})
+        return st.outputs
+
+    # Запись результата этапа в кэш. stats - замеры этапа (см. build_report.py).
+    def save(self, name, result, stats = None):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        cache_file = os.path.join(self.cache_dir, name + '.pickle')
+        counters = stats['counters'] if stats else dict()
+        with open(cache_file, 'wb') as f:
+            pickle.dump({'key': self.key(name), 'result': result, 'counters': counters}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        self.results[name] = result
+        if stats:
+            self.report[name] = dict(stats, cached=False)
+
+    # Профилировщик для этапа name и файл для его результатов: (None, None) - без профилирования.
+    def profiling(self, name):
+        if self.profile != 'all' and not name in self.profile:
+            return None, None
+        os.makedirs(self.cache_dir, exist_ok=True)
+        ext = '.html' if self.profiler == 'pyinstrument' else '.prof'
+        return self.profiler, os.path.join(self.cache_dir, f'profile_{name}{ext}')
+
+    # Выполнение функции, которая не является этапом (например, потоковой сборки), с замерами для отчёта под именем name.
+    def measure(self, name, func, *args):
+        result, self.report[name] = measure(func, args, None, *self.profiling(name))
+        return result
+
+    # Запись отчёта о сборке (JSON): параметры, общее время и замеры этапов.
+    def write_report(self, filename):
+        write_report(filename, self.report, self.params, time.perf_counter() - self.started)
+
+    # Аргументы функции этапа: результаты этапов deps и параметры.
+    def arguments(self, name):
+        st = stages[name]
+        return [self.results[dep] for dep in st.deps], {param: self.params[param] for param in st.params}
+
+    # Результат этапа name: из памяти, из кэша или выполнением этапа.
+    def run(self, name):
+        if name in self.results or self.load(name):
+            return self.results[name]
+
+        for dep in stages[name].deps:
+            self.run(dep)
+        args, kwargs = self.arguments(name)
+        print(f'Этап {name}: выполняется.')
+        self.save(name, *measure(stages[name].func, args, kwargs, *self.profiling(name)))
+        return self.results[name]
+
+    # Список этапов, которые нужно выполнить для получения результата этапа name (в порядке зависимостей).
+    # Этапы, результат которых есть в кэше, загружаются сразу, их зависимости не нужны.
+    def plan(self, name, todo):
+        if name in self.results or name in todo or self.load(name):
+            return
+        for dep in stages[name].deps:
+            self.plan(dep, todo)
+        todo.append(name)
+
+    # Параллельное выполнение: этапы, которые не зависят друг от друга (например, чтение разных каталогов),
+    # выполняются одновременно в пуле из workers процессов. Этап запускается, как только готовы
+    # результаты всех этапов, от которых он зависит. targets - имя этапа или список имён.
+    # Возвращает результат этапа (или список результатов).
+    def run_parallel(self, targets, workers = None):
+        names = [targets] if isinstance(targets, str) else list(targets)
+        todo = []
+        for name in names:
+            self.plan(name, todo)
+
+        if todo:
+            with ProcessPoolExecutor(workers) as pool:
+                running = dict() # future -> имя этапа
+                while todo or running:
+                    for name in [name for name in todo if all(dep in self.results for dep in stages[name].deps)]:
+                        todo.remove(name)
+                        args, kwargs = self.arguments(name)
+                        print(f'Этап {name}: выполняется.')
+                        running[pool.submit(measure, stages[name].func, args, kwargs, *self.profiling(name))] = name
+                    done, not_done = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self.save(running.pop(future), *future.result())
+
+        if isinstance(targets, str):
+            return self.results[targets]
+        return [self.results[name] for name in names]
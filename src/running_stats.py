@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+#
+# Статистика измерений по звёздам за один проход, без списка значений для каждой звезды.
+# Измерения поступают порциями (add): номера строк (звёзд) и значения. Для каждой строки
+# в массивах фиксированного размера накапливаются количество, сумма, сумма квадратов
+# отклонений (для дисперсии, объединение порций по формуле Чана), минимум и максимум.
+# Медиане и среднему с отбрасыванием выбросов (sigma clipping) нужны сами значения -
+# они хранятся, только если это указано (keep_values), в виде общих массивов, а не списков.
+#
+# Дмитрий Клыков, 2025. dyuk108.ru
+
+import numpy as np
+
+class RunningStats:
+    # size - кол-во строк (звёзд). keep_values - хранить значения (для median и clipped).
+    def __init__(self, size, keep_values = False):
+        self.n = np.zeros(size, dtype=np.int64) # кол-во измерений
+        self.sum = np.zeros(size) # сумма значений
+        self.m2 = np.zeros(size) # сумма квадратов отклонений от среднего
+        self.min = np.full(size, np.inf)
+        self.max = np.full(size, -np.inf)
+        self.keep_values = keep_values
+        self.parts = [] # порции (rows, values), если значения хранятся
+
+    def __len__(self):
+        return self.n.size
+
+    # Добавление порции измерений: rows - номера строк, values - значения.
+    def add(self, rows, values):
+        rows = np.asarray(rows, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+        if rows.size == 0:
+            return
+        size = len(self)
+        n_b = np.bincount(rows, minlength=size)
+        sum_b = np.bincount(rows, values, minlength=size)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_b = np.where(n_b > 0, sum_b / n_b, 0)
+            m2_b = np.bincount(rows, (values - mean_b[rows]) ** 2, minlength=size)
+            n = self.n + n_b
+            delta = mean_b - np.where(self.n > 0, self.sum / self.n, 0)
+            self.m2 += m2_b + np.where(n > 0, delta ** 2 * self.n * n_b / n, 0)
+        self.n = n
+        self.sum += sum_b
+        np.minimum.at(self.min, rows, values)
+        np.maximum.at(self.max, rows, values)
+        if self.keep_values:
+            self.parts.append((rows, values))
+
+    # Среднее значение (NaN, если измерений нет).
+    def mean(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.n > 0, self.sum / self.n, np.nan)
+
+    # Дисперсия (несмещённая, NaN, если измерений меньше двух).
+    def var(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.n > 1, self.m2 / (self.n - 1), np.nan)
+
+    # Стандартное отклонение.
+    def std(self):
+        return np.sqrt(self.var())
+
+    # Погрешность среднего: стандартное отклонение / корень из кол-ва измерений.
+    def err(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.std() / np.sqrt(self.n)
+
+    # Все значения, упорядоченные по строкам, а внутри строки - по возрастанию.
+    # Возвращает (rows, values, starts): starts - начало значений каждой строки.
+    def sorted_values(self):
+        if not self.keep_values:
+            raise ValueError('Значения не хранятся (keep_values=False).')
+        rows = np.concatenate([part[0] for part in self.parts]) if self.parts else np.zeros(0, dtype=np.int64)
+        values = np.concatenate([part[1] for part in self.parts]) if self.parts else np.zeros(0)
+        order = np.lexsort((values, rows))
+        starts = np.concatenate(([0], np.cumsum(self.n)[:-1]))
+        return rows[order], values[order], starts
+
+    # Медиана (NaN, если измерений нет).
+    def median(self):
+        rows, values, starts = self.sorted_values()
+        result = np.full(len(self), np.nan)
+        present = np.flatnonzero(self.n > 0)
+        n = self.n[present]
+        low = values[starts[present] + (n - 1) // 2]
+        high = values[starts[present] + n // 2]
+        result[present] = (low + high) / 2
+        return result
+
+    # Статистика без выбросов: значения, отличающиеся от среднего больше чем на k стандартных
+    # отклонений, отбрасываются. Строки, где меньше трёх измерений, не изменяются.
+    # Возвращает новый объект RunningStats.
+    def clipped(self, k = 3.0):
+        rows, values, starts = self.sorted_values()
+        mean = self.mean()[rows]
+        std = self.std()[rows]
+        keep = (self.n[rows] < 3) | ~(std > 0) | (np.abs(values - mean) <= k * std)
+        stats = RunningStats(len(self), keep_values=True)
+        stats.add(rows[keep], values[keep])
+        return stats
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+#
+# Разбор спектральных классов MK (поле SpType Hipparcos), например 'B9.5IIIpe', 'K2/K3V', 'G8III + A2V',
+# 'WC8 + O9I', 'C5,4'. Для каждого компонента: класс (O, B, ..., M, C, S, N, WN, WC, DA и т.п.),
+# подкласс (число, например 9.5), класс светимости ('III', 'IV-V', 'Ia' ...) и особенности -
+# кортеж флагов из peculiarities ('e' - эмиссионные линии, 'p' - пекулярный спектр, 'SB' - двойная и т.д.).
+# Составной спектр ('+') разбирается на компоненты, первый - основной.
+# Если указан диапазон ('K2/K3', 'G8/K0', 'F5-G1'), берутся класс и подкласс до косой черты или дефиса.
+#
+# Разных строк SpType всего несколько тысяч, поэтому каждая разбирается один раз (lru_cache),
+# а на весь столбец результат переносится по кодам кодированного поля (см. sptype_columns).
+#
+# Дмитрий Клыков, 2025. dyuk108.ru
+
+from collections import namedtuple
+from functools import lru_cache
+import re
+import numpy as np
+
+# Компонент спектра: класс, подкласс (NaN - не указан), класс светимости, особенности.
+SpComponent = namedtuple('SpComponent', ['SpClass', 'SpSub', 'LumClass', 'SpPec'])
+
+# Класс, подкласс (у углеродных и циркониевых звёзд бывает ещё индекс через запятую: C5,4)
+# и, если указан диапазон, второй класс (не используется).
+re_class = re.compile(r'(WN|WC|WO|W|D[ABOQZCX]?|[OBAFGKMLTCSNR])(\d+(?:\.\d+)?)?(?:,\d+)?:?' \
+    r'(?:[-/][OBAFGKM]?\d+(?:\.\d+)?:?)?')
+# Класс светимости, возможно диапазон: 'III', 'IIIb', 'IV-V', 'Ia/Iab', 'Ia0', 'Ia+', 'IA' (= Ia).
+lum_single = r'(?:Ia0|Ia\+|Iab|IA|Ia|Ib|III|II|IV|VI|V|0|I)[ab]?'
+re_lum = re.compile(f'{lum_single}(?:[-/]{lum_single})?')
+
+# Обозначения особенностей спектра (в порядке проверки: длинные раньше коротких).
+peculiarities = ('...', 'comp', 'var', 'SB1', 'SB2', 'SB', 'CN', 'CH', 'Ba', 'Si', 'Sr', 'Cr', 'Eu', \
+    'Hg', 'Mn', 'Fe', 'He', 'nn', 'sh', 'wl', 'e', 'p', 'm', 'n', 's', 'k', 'v', 'w', 'f', ':')
+
+# Префиксы класса светимости в старой записи: sd - субкарлик, d - карлик, g - гигант, c - сверхгигант.
+lum_prefixes = {'sd': 'VI', 'd': 'V', 'g': 'III', 'c': 'I'}
+
+# Разбор одного компонента. None - класс не распознан.
+def parse_component(s):
+    s = s.strip()
+    lum = ''
+    for prefix, value in lum_prefixes.items():
+        if s.startswith(prefix) and s[len(prefix) : len(prefix) + 1].isupper():
+            s, lum = s[len(prefix):], value
+            break
+    match = re_class.match(s)
+    if match is None:
+        return None
+    sp_class, sub = match.group(1), match.group(2)
+    rest = s[match.end():].lstrip()
+    match = re_lum.match(rest)
+    if match is not None:
+        lum = match.group().replace('IA', 'Ia')
+        rest = rest[match.end():]
+    # Особенности - всё, что после класса светимости; нераспознанные символы пропускаются.
+    pec = []
+    while rest:
+        for flag in peculiarities:
+            if rest.startswith(flag):
+                if not flag in pec:
+                    pec.append(flag)
+                rest = rest[len(flag):]
+                break
+        else:
+            rest = rest[1:]
+    return SpComponent(sp_class, float(sub) if sub else np.nan, lum, tuple(pec))
+
+# Разбор строки SpType: кортеж компонентов (первый - основной), пустой - класс не распознан.
+# '+' после Ia - часть класса светимости (Ia+), а не разделитель компонентов.
+@lru_cache(maxsize=None)
+def parse_sptype(sp):
+    components = (parse_component(s) for s in re.split(r'(?<!Ia)\+', sp))
+    return tuple(component for component in components if component is not None)
+
+# Поля SpClass, SpSub, LumClass основного компонента для столбца SpType, заданного кодами:
+# categories - список значений, codes - массив номеров значений (как в StarTable, см. star_table.py).
+# Каждое значение разбирается один раз, столбцы получаются выборкой по кодам.
+# Результат - словарь поле -> массив (строки; SpSub - float, NaN - подкласс не указан).
+def sptype_columns(categories, codes):
+    main = [(parse_sptype(sp) or (SpComponent('', np.nan, '', ()),))[0] for sp in categories]
+    return {'SpClass': np.array([c.SpClass for c in main], dtype=str)[codes], \
+        'SpSub': np.array([c.SpSub for c in main], dtype=float)[codes], \
+        'LumClass': np.array([c.LumClass for c in main], dtype=str)[codes]}
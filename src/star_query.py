@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+#
+# Поиск звёзд в собранном датасете: в круге вокруг точки неба (конус), в прямоугольнике по RA/Dec
+# (в том числе через 0h), k ближайших звёзд, по номерам HIP и HD. Любой поиск можно совместить
+# с отбором по звёздной величине (vmag - не слабее) и по значениям полей (where).
+# Звёзды один раз переводятся в единичные векторы и помещаются в KD-дерево (как в crossmatch.py),
+# поэтому запрос не просматривает весь датасет. Точки можно передавать сразу массивами -
+# тогда результат - список (для каждой точки свой).
+# Результат поиска - номера строк датасета; значения полей этих строк даёт read().
+#
+# Пример:
+#   stars = StarQuery.load('dataset_bright_stars.csv') # или .bin, папка .npy, или StarQuery(df)
+#   rows = stars.cone(83.8, -5.4, 5, vmag=4) # звёзды ярче 4m в пределах 5° от M42
+#   stars.read(rows, ['HIP', 'Name_r', 'Vmag'])
+#   stars.box(350, 10, -5, 5, where={'Cst': 'Psc'}) # через 0h
+#   rows, sep = stars.nearest(RA, Dec, k=3) # три ближайшие звезды
+#   stars.hip([32349, 91262]), stars.hd(48915)
+# Отбор where - словарь: поле -> значение (равенство), список или множество (одно из значений),
+# кортеж (мин, макс) (None - без границы) или функция, возвращающая по массиву поля массив True/False.
+#
+# Дмитрий Клыков, 2025. dyuk108.ru
+
+import csv
+import os
+import numpy as np
+from scipy.spatial import cKDTree
+
+from crossmatch import unit_vectors, chord, chord_to_arcsec
+
+# Чтение датасета CSV (как записывает compile_catalogs.py) - словарь поле -> массив.
+# Поля, где все значения - целые числа, - массивы int64 (пусто - 0), числа - float64 (пусто - NaN),
+# остальные - строки.
+# Значения с запятой пишутся в кавычках, но в датасетах, собранных раньше, спектральный класс с запятой
+# ('C0,0 (F8pe)') записан без кавычек - если в строке лишние значения, они относятся к полю key_commas.
+def read_csv(filename, key_commas = 'SpType'):
+    with open(filename, encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        keys = next(reader)
+        rows = [row for row in reader if row]
+    i = keys.index(key_commas) if key_commas in keys else len(keys) - 1
+    for row in rows:
+        extra = len(row) - len(keys)
+        if extra > 0:
+            row[i : i + extra + 1] = [','.join(row[i : i + extra + 1])]
+    columns = dict()
+    for key, values in zip(keys, zip(*rows) if rows else [()] * len(keys)):
+        try:
+            numbers = np.array([float(x) if x != '' else np.nan for x in values])
+        except ValueError:
+            columns[key] = np.array(values, dtype=str)
+            continue
+        if not any('.' in x or 'e' in x or 'n' in x for x in values):
+            numbers = np.where(np.isnan(numbers), 0, numbers).astype(np.int64)
+        columns[key] = numbers
+    return columns
+
+class StarQuery:
+    # columns - поля датасета: словарь поле -> массив, DataFrame, BinaryCatalog, StarTable.
+    # RA, Dec - поля координат (градусы).
+    def __init__(self, columns, RA = 'RAdeg', Dec = 'DEdeg'):
+        keys = list(columns.keys()) if hasattr(columns, 'keys') else list(columns.columns)
+        self.columns = {key: np.asarray(columns[key]) for key in keys}
+        self.RA = self.columns[RA].astype(float)
+        self.Dec = self.columns[Dec].astype(float)
+        self.vectors = unit_vectors(self.RA, self.Dec)
+        self.ok = np.flatnonzero(np.isfinite(self.vectors).all(axis=1)) # звёзды с координатами
+        self.tree = cKDTree(self.vectors[self.ok])
+        self.dec_order = self.ok[np.argsort(self.Dec[self.ok], kind='stable')] # для поиска в прямоугольнике
+        self.indexes = dict() # поле -> (упорядоченные значения, порядок строк) для поиска по номерам
+
+    # Загрузка датасета из файла: .csv, .bin (двоичный каталог) или папки с файлами .npy.
+    @staticmethod
+    def load(filename, RA = 'RAdeg', Dec = 'DEdeg'):
+        if os.path.isdir(filename):
+            from writers import load_npy
+            return StarQuery(load_npy(filename), RA, Dec)
+        if filename.endswith('.bin'):
+            from binary_catalog import BinaryCatalog
+            return StarQuery(BinaryCatalog(filename).read(), RA, Dec)
+        return StarQuery(read_csv(filename), RA, Dec)
+
+    def __len__(self):
+        return self.RA.size
+
+    def __contains__(self, key):
+        return key in self.columns
+
+    def __getitem__(self, key):
+        return self.columns[key]
+
+    def keys(self):
+        return list(self.columns)
+
+    # Значения полей names (по умолчанию всех) строк rows - словарь поле -> массив.
+    def read(self, rows, names = None):
+        rows = np.asarray(rows, dtype=np.int64)
+        return {key: self.columns[key][rows] for key in (names or self.keys())}
+
+    # Отбор звёзд: массив True/False по всем строкам или None, если отбора нет.
+    # vmag - звёзды не слабее этой величины; where - отбор по полям (см. в начале файла).
+    def mask(self, vmag = None, where = None):
+        if vmag is None and not where:
+            return None
+        mask = np.ones(len(self), dtype=bool)
+        if vmag is not None:
+            mask &= self.columns['Vmag'] <= vmag
+        for key, condition in (where or dict()).items():
+            values = self.columns[key]
+            if callable(condition):
+                mask &= np.asarray(condition(values), dtype=bool)
+            elif isinstance(condition, tuple): # диапазон
+                low, high = condition
+                if low is not None:
+                    mask &= values >= low
+                if high is not None:
+                    mask &= values <= high
+            elif isinstance(condition, (list, set, frozenset)):
+                mask &= np.isin(values, list(condition))
+            else:
+                mask &= values == condition
+        return mask
+
+    # Звёзды в пределах radius градусов от точки (RA, Dec) - номера строк по возрастанию расстояния.
+    # RA, Dec - числа или массивы (тогда результат - список массивов, по одному на точку).
+    def cone(self, RA, Dec, radius, vmag = None, where = None):
+        mask = self.mask(vmag, where)
+        points = unit_vectors(np.atleast_1d(RA), np.atleast_1d(Dec))
+        found = self.tree.query_ball_point(points, chord(radius * 3600))
+        result = []
+        for point, index in zip(points, found):
+            rows = self.ok[np.array(index, dtype=np.int64)]
+            if mask is not None:
+                rows = rows[mask[rows]]
+            result.append(rows[np.argsort(-(self.vectors[rows] @ point), kind='stable')])
+        return result if np.ndim(RA) > 0 else result[0]
+
+    # Звёзды в прямоугольнике RA1..RA2, Dec1..Dec2 (градусы) - номера строк по возрастанию.
+    # Если RA1 > RA2, прямоугольник проходит через 0h (например, 350..10).
+    def box(self, RA1, RA2, Dec1, Dec2, vmag = None, where = None):
+        Dec_sorted = self.Dec[self.dec_order]
+        rows = self.dec_order[np.searchsorted(Dec_sorted, Dec1, 'left') : np.searchsorted(Dec_sorted, Dec2, 'right')]
+        RA = self.RA[rows]
+        inside = (RA >= RA1) & (RA <= RA2) if RA1 <= RA2 else (RA >= RA1) | (RA <= RA2)
+        rows = rows[inside]
+        mask = self.mask(vmag, where)
+        if mask is not None:
+            rows = rows[mask[rows]]
+        return np.sort(rows)
+
+    # k ближайших к точке (RA, Dec) звёзд, не дальше radius градусов (None - без ограничения).
+    # Возвращает (rows, sep): номера строк и расстояния (градусы) - массивы k значений по возрастанию
+    # расстояния (для массивов точек - матрицы точки x k). Если звёзд меньше k, rows = -1, sep = NaN.
+    def nearest(self, RA, Dec, k = 1, radius = None, vmag = None, where = None):
+        mask = self.mask(vmag, where)
+        points = unit_vectors(np.atleast_1d(RA), np.atleast_1d(Dec))
+        tree, ok = self.tree, self.ok
+        # Если отбор проходит небольшая доля звёзд, для них быстрее построить отдельное дерево.
+        if mask is not None and mask[ok].sum() < 0.25 * ok.size:
+            ok = ok[mask[ok]]
+            tree = cKDTree(self.vectors[ok])
+            mask = None
+        n = len(ok)
+        bound = chord(radius * 3600) if radius is not None else np.inf
+        rows = np.full((points.shape[0], k), -1)
+        sep = np.full((points.shape[0], k), np.nan)
+        # При отборе подходящих звёзд среди k ближайших может не хватить - сразу берём больше
+        # (с учётом того, какая доля звёзд проходит отбор), а если и этого мало - вчетверо больше,
+        # пока не наберётся k или звёзды не кончатся.
+        todo = np.arange(points.shape[0])
+        kk = k if mask is None else int(np.ceil(2 * k * n / max(mask[ok].sum(), 1)))
+        while todo.size > 0 and n > 0:
+            dist, index = tree.query(points[todo], k=min(kk, n), distance_upper_bound=bound)
+            dist = dist.reshape(todo.size, -1)
+            index = index.reshape(todo.size, -1)
+            valid = index < n # найдена (иначе - дальше radius)
+            found = ok[np.minimum(index, n - 1)]
+            if mask is not None:
+                valid &= mask[found]
+            done = (valid.sum(axis=1) >= k) | ~np.isfinite(dist[:, -1]) | (kk >= n)
+            # Первые k подходящих: сортировка сохраняет порядок по расстоянию.
+            order = np.argsort(~valid, axis=1, kind='stable')[:, :k]
+            first = np.take_along_axis(valid, order, axis=1)
+            rows[todo[done], : order.shape[1]] = np.where(first, np.take_along_axis(found, order, axis=1), -1)[done]
+            sep[todo[done], : order.shape[1]] = np.where(first, chord_to_arcsec(np.take_along_axis(dist, order, axis=1)) / 3600, np.nan)[done]
+            todo = todo[~done]
+            kk *= 4
+        if np.ndim(RA) > 0:
+            return rows, sep
+        return rows[0], sep[0]
+
+    # Номера строк звёзд по значениям поля key (номерам), -1 - такой звезды нет или она не проходит отбор.
+    def lookup(self, key, values, vmag = None, where = None):
+        if not key in self.indexes:
+            order = np.argsort(self.columns[key], kind='stable')
+            self.indexes[key] = (self.columns[key][order], order)
+        sorted_values, order = self.indexes[key]
+        values = np.asarray(values, dtype=sorted_values.dtype)
+        if len(self) == 0:
+            return np.full(values.shape, -1)
+        pos = np.minimum(np.searchsorted(sorted_values, values), len(self) - 1)
+        rows = np.where(sorted_values[pos] == values, order[pos], -1)
+        mask = self.mask(vmag, where)
+        if mask is not None:
+            rows = np.where((rows >= 0) & mask[rows], rows, -1)
+        return rows
+
+    # Номера строк по номерам HIP.
+    def hip(self, HIP, vmag = None, where = None):
+        return self.lookup('HIP', HIP, vmag, where)
+
+    # Номера строк по номерам HD (0 - нет номера, такие не находятся).
+    def hd(self, HD, vmag = None, where = None):
+        HD = np.asarray(HD)
+        return np.where(HD != 0, self.lookup('HD', HD, vmag, where), -1)
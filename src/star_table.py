@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+#
+# Таблица звёзд датасета, хранящаяся по столбцам (struct of arrays), вместо словаря словарей строк.
+# Каждое поле - массив numpy: числа с плавающей точкой (пусто - NaN), целые (пусто - 0),
+# строки (пусто - ''). Поля с небольшим числом разных значений (созвездия, спектральные классы,
+# типы переменности) хранятся кодами: массив int16 - номера значений в словаре поля (categories),
+# код 0 - пустая строка.
+# Строки таблицы идут в порядке каталога, номер строки по номеру HIP даёт метод rows().
+# Дополнение таблицы данными других каталогов (update) - операция над массивами, без циклов по звёздам.
+# Для дополнения таблицы порциями (потоковая сборка) поля другого каталога упорядочиваются
+# по HIP (SortedColumns), и каждой порции достаются только строки из её диапазона номеров.
+#
+# Дмитрий Клыков, 2025. dyuk108.ru
+
+import numpy as np
+
+class StarTable:
+    # HIP - номера HIP звёзд (в порядке строк таблицы).
+    # categorical - имена полей, которые хранятся кодами.
+    def __init__(self, HIP, categorical = ()):
+        self.columns = {'HIP': np.asarray(HIP).astype(np.int32)}
+        self.categories = {name: [''] for name in categorical} # словари значений кодированных полей
+        self.order = np.argsort(self.columns['HIP'], kind='stable') # для поиска строк по номеру HIP
+
+    def __len__(self):
+        return self.columns['HIP'].size
+
+    def __contains__(self, name):
+        return name in self.columns
+
+    # Значения поля (для кодированных полей - сами значения, а не коды).
+    def __getitem__(self, name):
+        if name in self.categories:
+            return np.array(self.categories[name])[self.columns[name]]
+        return self.columns[name]
+
+    def copy(self):
+        table = StarTable.__new__(StarTable)
+        table.columns = {name: values.copy() for name, values in self.columns.items()}
+        table.categories = {name: list(values) for name, values in self.categories.items()}
+        table.order = self.order
+        return table
+
+    # Номера строк звёзд с номерами HIP (массив, список, можно строками). Для звёзд, которых нет, -1.
+    def rows(self, HIP):
+        HIP = np.asarray(HIP).astype(np.int64)
+        if len(self) == 0:
+            return np.full(HIP.shape, -1)
+        hips = self.columns['HIP']
+        pos = np.minimum(np.searchsorted(hips, HIP, sorter=self.order), len(self) - 1)
+        rows = self.order[pos]
+        return np.where(hips[rows] == HIP, rows, -1)
+
+    # Коды значений кодированного поля name. Новые значения добавляются в словарь поля.
+    def encode(self, name, values):
+        categories = self.categories[name]
+        lookup = {value: code for code, value in enumerate(categories)}
+        distinct, inverse = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+        codes = []
+        for value in distinct.tolist():
+            if not value in lookup:
+                lookup[value] = len(categories)
+                categories.append(value)
+            codes.append(lookup[value])
+        return np.array(codes, dtype=np.int16)[inverse.ravel()]
+
+    # Запись значений поля name: всего поля или только строк rows.
+    # Если поля ещё нет, оно создаётся с пустыми значениями. dtype - тип нового поля.
+    def set(self, name, values, rows = None, dtype = None):
+        if name in self.categories:
+            values = self.encode(name, values)
+        else:
+            values = np.asarray(values, dtype=dtype)
+        if rows is None:
+            self.columns[name] = values
+            return
+
+        column = self.columns.get(name)
+        if column is None:
+            column = np.zeros(len(self), dtype=values.dtype)
+            if values.dtype.kind == 'f':
+                column[:] = np.nan
+        elif values.dtype.kind == 'U' and values.dtype.itemsize > column.dtype.itemsize:
+            column = column.astype(values.dtype) # новые строки длиннее старых
+        column[rows] = values
+        self.columns[name] = column
+
+    # Дополнение таблицы полями другого каталога. columns - словарь: 'HIP' - номера HIP,
+    # остальные - значения полей для этих звёзд. Звёзды, которых нет в таблице, пропускаются.
+    def update(self, columns):
+        rows = self.rows(columns['HIP'])
+        found = rows >= 0
+        for name, values in columns.items():
+            if name != 'HIP':
+                self.set(name, np.asarray(values)[found], rows[found])
+
+    # Значения поля в виде списка строк для записи в файл. Пустые значения - ''.
+    # fmt - формат чисел с плавающей точкой (по умолчанию как str()).
+    def text(self, name, fmt = ''):
+        if not name in self.columns: # поле не заполнено ни у одной звезды
+            return [''] * len(self)
+        values = self[name]
+        if values.dtype.kind == 'f':
+            return [format(x, fmt) if x == x else '' for x in values.tolist()]
+        if values.dtype.kind in 'iu':
+            return [str(x) if x != 0 else '' for x in values.tolist()]
+        return values.tolist()
+
+# Поля другого каталога (словарь, как для StarTable.update: 'HIP' и значения полей), упорядоченные по HIP.
+# slice() отдаёт строки звёзд из диапазона номеров HIP - срезами массивов, без копирования.
+# Если порции таблицы идут по возрастанию HIP (как строки каталога Hipparcos), каждая строка
+# каталога достаётся одной порции, а не просматривается при дополнении каждой порции.
+class SortedColumns:
+    def __init__(self, columns):
+        order = np.argsort(np.asarray(columns['HIP']), kind='stable') # повторы HIP - в прежнем порядке
+        self.columns = {name: np.asarray(values)[order] for name, values in columns.items()}
+
+    def __len__(self):
+        return self.columns['HIP'].size
+
+    # Строки звёзд с номерами HIP от first до last включительно.
+    def slice(self, first, last):
+        hips = self.columns['HIP']
+        start, end = np.searchsorted(hips, first, side='left'), np.searchsorted(hips, last, side='right')
+        return {name: values[start : end] for name, values in self.columns.items()}
+
+    # Строки звёзд таблицы (порции) table.
+    def part(self, table):
+        if len(table) == 0:
+            return self.slice(1, 0)
+        HIP = table.columns['HIP']
+        return self.slice(HIP.min(), HIP.max())
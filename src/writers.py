@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+#
+# Запись датасета (таблицы StarTable, см. star_table.py) в файлы разных форматов.
+# У всех классов записи одинаковый порядок работы: создание (открывается файл), write(table) -
+# запись очередной порции строк (можно вызывать несколько раз, например, при потоковой сборке),
+# close(). Поэтому одна и та же таблица в памяти за один проход записывается сразу во все форматы.
+#
+# Форматы:
+#   CsvWriter - CSV (строки полей получает от функции text, так что формат чисел задаёт вызывающий);
+#   ExcelCsvWriter - CSV для русского Excel-я: разделитель ";", десятичная запятая, кодировка cp1251;
+#   ArrowWriter - Parquet или Feather (Arrow IPC) с типами полей: числа - числами, кодированные поля -
+#                 словарными (dictionary), пустые значения - null. Нужна библиотека pyarrow;
+#   NpyWriter - папка с файлами .npy, по одному на поле (загрузка - np.load, без разбора текста);
+#   SqliteWriter - база SQLite: таблица stars с индексами, полнотекстовый поиск (FTS5) по именам
+#                  и R-дерево по координатам;
+#   BinaryWriter - двоичный каталог для чтения через numpy.memmap (см. binary_catalog.py).
+#
+# Дмитрий Клыков, 2025. dyuk108.ru
+
+import os
+import re
+import sqlite3
+import numpy as np
+
+from binary_catalog import write_catalog
+
+class CsvWriter:
+    # keys - список полей; text - функция (table, key), возвращающая значения поля списком строк.
+    def __init__(self, filename, keys, text, sep = ',', encoding = 'utf-8'):
+        self.keys = keys
+        self.text = text
+        self.sep = sep
+        self.f = open(filename, 'w', encoding=encoding)
+        self.f.write(sep.join(keys) + '\n') # Строка заголовков.
+
+    # Строки значений полей. Значения с разделителем или кавычкой (например, спектральный класс
+    # 'C0,0 (F8pe)') берутся в кавычки, как принято в CSV, иначе поля строки сдвигаются.
+    def columns(self, table):
+        columns = []
+        for key in self.keys:
+            values = self.text(table, key)
+            if any(self.sep in s or '"' in s for s in values):
+                values = [self.quote(s) for s in values]
+            columns.append(values)
+        return columns
+
+    def quote(self, s):
+        return '"' + s.replace('"', '""') + '"' if self.sep in s or '"' in s else s
+
+    def write(self, table):
+        if len(table) > 0:
+            self.f.write('\n'.join(map(self.sep.join, zip(*self.columns(table)))) + '\n')
+
+    def close(self):
+        self.f.close()
+
+class ExcelCsvWriter(CsvWriter):
+    # Символы, которые удаляются: всё, кроме ASCII с кодами 40-125 и русских букв (без Ё, ё).
+    forbidden = re.compile('[^\x28-\x7dА-я\n]')
+
+    # keys_text - поля, в которых точка - не десятичная (например, спектральный класс).
+    def __init__(self, filename, keys, text, keys_text = ()):
+        super().__init__(filename, keys, text, ';', 'cp1251')
+        self.keys_text = keys_text
+
+    # Для Экселя десятичная часть отделяется ","
+    def columns(self, table):
+        return [[s.replace('.', ',') for s in values] if not key in self.keys_text else values \
+            for key, values in zip(self.keys, super().columns(table))]
+
+    def write(self, table):
+        if len(table) > 0:
+            lines = '\n'.join(map(self.sep.join, zip(*self.columns(table)))) + '\n'
+            self.f.write(self.forbidden.sub('', lines)) # удаление символов, не входящих в кодировку 1251
+
+class ArrowWriter:
+    # kind - 'parquet' или 'feather'.
+    def __init__(self, filename, keys, kind = 'parquet'):
+        try:
+            import pyarrow
+        except ImportError:
+            raise ImportError(f'Для записи в формате {kind} нужна библиотека pyarrow (pip install pyarrow).')
+        self.pa = pyarrow
+        self.filename = filename
+        self.keys = keys
+        self.kind = kind
+        self.writer = None # ParquetWriter, открывается с первой порцией (нужна схема)
+        self.batches = [] # порции для Feather: словари полей нужно объединить перед записью
+
+    # Поле таблицы в виде массива Arrow. Пустые значения (NaN, 0, '') - null.
+    def array(self, table, key):
+        pa = self.pa
+        values = table.columns[key]
+        if key in table.categories: # код 0 - пустая строка, в словарь Arrow не входит
+            return pa.DictionaryArray.from_arrays(pa.array(np.maximum(values - 1, 0), mask=values == 0, type=pa.int16()), \
+                pa.array(table.categories[key][1:], type=pa.string()))
+        if values.dtype.kind == 'f':
+            return pa.array(values, mask=np.isnan(values))
+        if values.dtype.kind in 'iu':
+            return pa.array(values, mask=values == 0)
+        return pa.array(values.astype(object), mask=values == '', type=pa.string())
+
+    def write(self, table):
+        batch = self.pa.record_batch([self.array(table, key) for key in self.keys], names=self.keys)
+        if self.kind == 'feather':
+            self.batches.append(batch)
+            return
+        if self.writer is None:
+            import pyarrow.parquet
+            self.writer = pyarrow.parquet.ParquetWriter(self.filename, batch.schema)
+        self.writer.write_batch(batch)
+
+    def close(self):
+        if self.kind == 'feather':
+            import pyarrow.feather
+            if self.batches:
+                pyarrow.feather.write_feather(self.pa.Table.from_batches(self.batches).unify_dictionaries(), self.filename)
+        elif self.writer is not None:
+            self.writer.close()
+
+class NpyWriter:
+    # dirname - папка для файлов <поле>.npy. Кодированные поля записываются значениями (строками).
+    def __init__(self, dirname, keys):
+        self.dirname = dirname
+        self.keys = keys
+        self.parts = {key: [] for key in keys} # порции полей
+        os.makedirs(dirname, exist_ok=True)
+
+    def write(self, table):
+        for key in self.keys:
+            self.parts[key].append(table[key])
+
+    def close(self):
+        for key, parts in self.parts.items():
+            if parts:
+                np.save(os.path.join(self.dirname, key + '.npy'), np.concatenate(parts), allow_pickle=False)
+
+class SqliteWriter:
+    # Таблица stars: поле HIP - первичный ключ, пустые значения - NULL. Индексы - на поля index_keys.
+    # stars_fts - полнотекстовый поиск (FTS5) по полям fts_keys, rowid - HIP:
+    #   SELECT * FROM stars WHERE HIP IN (SELECT rowid FROM stars_fts WHERE stars_fts MATCH 'Сириус')
+    # stars_rtree - R-дерево по координатам (точка - прямоугольник нулевого размера), id - HIP:
+    #   SELECT stars.* FROM stars_rtree JOIN stars ON HIP = id
+    #   WHERE minRA >= 80 AND maxRA <= 90 AND minDec >= -10 AND maxDec <= 10
+    # Область, которая проходит через 0h, запрашивается двумя прямоугольниками. Координаты
+    # в R-дереве хранятся с точностью float32, поэтому для точной границы области запрос
+    # по R-дереву лучше дополнить условием на поля RAdeg, DEdeg таблицы stars.
+    def __init__(self, filename, keys, index_keys = ('HD', 'Cst', 'Vmag', 'SpType'), \
+            fts_keys = ('Name', 'Name_r', 'VarID'), RA = 'RAdeg', Dec = 'DEdeg'):
+        self.keys = keys
+        self.index_keys = [key for key in index_keys if key in keys]
+        self.fts_keys = [key for key in fts_keys if key in keys]
+        self.RA = RA
+        self.Dec = Dec
+        self.created = False
+        if os.path.isfile(filename):
+            os.remove(filename)
+        self.db = sqlite3.connect(filename)
+
+    # Создание таблицы по типам полей первой порции.
+    def create(self, table):
+        types = {'f': 'REAL', 'i': 'INTEGER', 'u': 'INTEGER'}
+        columns = []
+        for key in self.keys:
+            kind = 'U' if key in table.categories else table.columns[key].dtype.kind
+            columns.append(f'"{key}" ' + ('INTEGER PRIMARY KEY' if key == 'HIP' else types.get(kind, 'TEXT')))
+        self.db.execute(f'CREATE TABLE stars ({", ".join(columns)})')
+        self.created = True
+
+    # Значения поля для SQLite: пустые (NaN, 0, '') - None.
+    def values(self, table, key):
+        values = table[key]
+        if values.dtype.kind == 'f':
+            return [None if x != x else x for x in values.tolist()]
+        if values.dtype.kind in 'iu':
+            return [x if x != 0 else None for x in values.tolist()]
+        return [x if x != '' else None for x in values.tolist()]
+
+    def write(self, table):
+        if not self.created:
+            self.create(table)
+        marks = ', '.join('?' * len(self.keys))
+        rows = zip(*[self.values(table, key) for key in self.keys])
+        self.db.executemany(f'INSERT INTO stars VALUES ({marks})', rows)
+
+    # Индексы строятся после вставки всех строк - так быстрее.
+    def close(self):
+        if self.created:
+            for key in self.index_keys:
+                self.db.execute(f'CREATE INDEX "stars_{key}" ON stars ("{key}")')
+            if self.fts_keys:
+                keys = ', '.join(f'"{key}"' for key in self.fts_keys)
+                self.db.execute(f"CREATE VIRTUAL TABLE stars_fts USING fts5({keys}, content='stars', content_rowid='HIP')")
+                self.db.execute("INSERT INTO stars_fts(stars_fts) VALUES('rebuild')")
+            self.db.execute('CREATE VIRTUAL TABLE stars_rtree USING rtree(id, minRA, maxRA, minDec, maxDec)')
+            self.db.execute(f'INSERT INTO stars_rtree SELECT HIP, "{self.RA}", "{self.RA}", "{self.Dec}", "{self.Dec}" FROM stars ' + \
+                f'WHERE "{self.RA}" IS NOT NULL AND "{self.Dec}" IS NOT NULL')
+        self.db.commit()
+        self.db.close()
+
+class BinaryWriter:
+    # Строки упорядочиваются по положению на небе, поэтому файл записывается целиком при close().
+    def __init__(self, filename, keys):
+        self.filename = filename
+        self.keys = keys
+        self.parts = {key: [] for key in keys} # порции полей
+        self.categorical = set() # кодированные поля
+
+    def write(self, table):
+        self.categorical.update(key for key in self.keys if key in table.categories)
+        for key in self.keys:
+            self.parts[key].append(table[key])
+
+    def close(self):
+        if self.parts[self.keys[0]]:
+            columns = {key: np.concatenate(parts) for key, parts in self.parts.items()}
+            write_catalog(self.filename, columns, self.categorical)
+
+# Загрузка датасета, записанного NpyWriter-ом: словарь поле -> массив.
+def load_npy(dirname):
+    return {name[:-4]: np.load(os.path.join(dirname, name), allow_pickle=False) \
+        for name in sorted(os.listdir(dirname)) if name.endswith('.npy')}
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+#
+# Общие настройки тестов: модули из src/ и bench/ импортируются напрямую, синтетические каталоги
+# (см. bench/synthetic.py) создаются один раз на весь запуск тестов во временной папке.
+# Запуск из корня репозитория: python -m pytest -q
+#
+# Дмитрий Клыков, 2025. dyuk108.ru
+
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+dirname_repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(dirname_repo, 'src'))
+sys.path.insert(0, os.path.join(dirname_repo, 'bench'))
+
+from synthetic import generate
+
+# Папка с синтетическими каталогами - как корень репозитория: src/ с каталогами и исходными кодами.
+@pytest.fixture(scope='session')
+def synthetic_root(tmp_path_factory):
+    root = str(tmp_path_factory.mktemp('synthetic'))
+    generate(root, 3000, 3000, seed=1)
+    for name in os.listdir(os.path.join(dirname_repo, 'src')):
+        if name.endswith('.py'):
+            shutil.copy(os.path.join(dirname_repo, 'src', name), os.path.join(root, 'src'))
+    return root
+
+# Сборка датасета в папке root (отдельным процессом, как из командной строки).
+# Возвращает содержимое выходных файлов: имя -> байты.
+def build(root, *args):
+    command = [sys.executable, 'src/compile_catalogs.py', '--force', '--cache-dir', 'cache_test'] + list(args)
+    result = subprocess.run(command, cwd=root, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    outputs = dict()
+    for name in ('dataset_bright_stars.csv', 'dataset_bright_stars_excel.csv', 'cross_bayer_hip.csv'):
+        with open(os.path.join(root, name), 'rb') as f:
+            outputs[name] = f.read()
+    return outputs
+
+# Текущая папка - папка синтетических каталогов (модули сборки читают файлы по путям от корня репозитория).
+@pytest.fixture
+def in_synthetic_root(synthetic_root, monkeypatch):
+    monkeypatch.chdir(synthetic_root)
+    return synthetic_root
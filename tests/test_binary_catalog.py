@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+#
+# Тесты двоичного каталога (binary_catalog.py), записанного BinaryWriter-ом порциями.
+#
+# Дмитрий Клыков, 2025. dyuk108.ru
+
+import os
+
+import numpy as np
+
+from binary_catalog import BinaryCatalog
+from test_writers import keys, make_table, write
+from writers import BinaryWriter
+
+def test_binary(tmp_path):
+    table = make_table()
+    filename = str(tmp_path / 'stars.bin')
+    write(BinaryWriter(filename, keys), table)
+    catalog = BinaryCatalog(filename)
+    assert len(catalog) == len(table) and catalog.keys() == keys
+    rows = catalog.rows_by_hip(table['HIP'])
+    for key in keys:
+        values = catalog.column(key, rows)
+        assert np.array_equal(values, table[key], equal_nan=values.dtype.kind == 'f')
+    # Прямоугольник через 0h.
+    assert sorted(catalog.column('HIP', catalog.rows_in_box(350, 10, -20, 50)).tolist()) == [7, 25]
+    assert os.path.getsize(filename) > 0
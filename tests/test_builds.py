@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+#
+# Тесты сборки датасета на синтетических каталогах (bench/synthetic.py): последовательная,
+# параллельная и потоковая сборка дают побайтно одинаковые файлы.
+#
+# Дмитрий Клыков, 2025. dyuk108.ru
+
+from conftest import build
+
+def test_builds_identical(synthetic_root):
+    serial = build(synthetic_root, '--vmag-limit', '9', '--jobs', '1')
+    assert serial['dataset_bright_stars.csv'].count(b'\n') > 100
+    parallel = build(synthetic_root, '--vmag-limit', '9', '--jobs', '2')
+    assert parallel == serial
+    stream = build(synthetic_root, '--vmag-limit', '9', '--stream', '--chunk-size', '500', '--jobs', '1')
+    assert stream == serial
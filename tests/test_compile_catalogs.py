@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+#
+# Тесты сборки (compile_catalogs.py): чтение Hipparcos на строках в формате синтетических каталогов,
+# списки файлов этапов.
+#
+# Дмитрий Клыков, 2025. dyuk108.ru
+
+import os
+
+import numpy as np
+
+from fixed_width import FixedWidthFile
+from synthetic import make_stars, hip_lines
+
+# Звёзды без полей RAdeg, DEdeg: координаты вычисляются из Ч М С и Г М С. Знак склонения относится
+# ко всему значению, в том числе к минутам и секундам: -30°03'20" = -30.0556°, а не -29.9444°.
+def test_sexagesimal_fallback(in_synthetic_root, tmp_path):
+    import compile_catalogs
+    stars = make_stars(np.random.default_rng(3), 1, 4)
+    stars['RA'] = np.array([10.0, 123.456, 359.99, 200.0])
+    stars['Dec'] = np.array([-30.0555556, -0.5, 45.25, -89.9])
+    stars['has_deg'] = np.array([False, False, False, True])
+    filename = str(tmp_path / 'hip_main.dat')
+    with open(filename, 'wb') as f:
+        hip_lines(stars).write(f)
+
+    table = compile_catalogs.hip_table(FixedWidthFile(filename, min_length=4), np.arange(4))
+    assert np.allclose(table['DEdeg'], stars['Dec'], atol=1e-4)
+    assert np.allclose(table['RAdeg'], stars['RA'], atol=1e-4)
+    assert table.text('DEdeg', '+012.8f')[0] == '-30.05555556'
+    assert table.text('DEdeg', '+012.8f')[1] == '-00.50000000'
+
+# Классы, к которым обращается функция этапа, code_hash не просматривает - их файлы
+# должны быть в списке файлов этапа, иначе правка класса не перезапускает этап.
+def test_stage_files_list_classes(in_synthetic_root):
+    import inspect
+    import compile_catalogs # регистрирует этапы
+    from pipeline import stages
+    for name, st in stages.items():
+        for global_name in st.func.__code__.co_names:
+            obj = st.func.__globals__.get(global_name)
+            if inspect.isclass(obj) and obj.__module__ != 'builtins':
+                filename = 'src/' + obj.__module__ + '.py'
+                if os.path.isfile(filename): # модуль из src/, а не библиотека
+                    assert filename in st.files, f'{name}: {filename}'
+
+# Дополнительные поля - в конце строки: остальные поля не сдвигаются.
+def test_optional_keys_at_end(in_synthetic_root):
+    import compile_catalogs
+    keys = compile_catalogs.keys_dataset(teff_stats=True, epochs=[2000])
+    n = len(compile_catalogs.keys_compiled)
+    assert keys[:n] == compile_catalogs.keys_compiled
+    assert keys[n:] == ['Teff_n', 'Teff_err', 'RAdeg_J2000', 'DEdeg_J2000']
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+#
+# Тесты определения созвездий (constellations.py) на синтетических границах (bench/synthetic.py):
+# whatCons_many даёт то же, что whatCons, - и по сетке, и без неё, в том числе в граничных ячейках
+# сетки и на её линиях.
+#
+# Дмитрий Клыков, 2025. dyuk108.ru
+
+import copy
+import os
+
+import numpy as np
+import pytest
+
+from constellations import Constellations, GRID_BOUNDARY
+
+# Границы читаются из папки синтетических каталогов, сетка строится один раз на все тесты модуля.
+@pytest.fixture(scope='module')
+def cons(synthetic_root):
+    cwd = os.getcwd()
+    os.chdir(synthetic_root)
+    try:
+        result = Constellations()
+        result.buildGrid(1.0)
+    finally:
+        os.chdir(cwd)
+    return result
+
+# Точки: случайные по сфере, на линиях сетки и в граничных ячейках сетки.
+def points(cons):
+    rng = np.random.default_rng(2)
+    RA = rng.uniform(0, 360, 2000)
+    Dec = np.degrees(np.arcsin(rng.uniform(-1, 1, 2000)))
+    # Линии сетки (и стык 0h) - такие точки проверяются точно.
+    lines_RA = np.concatenate((rng.integers(0, 360, 200).astype(float), rng.uniform(0, 360, 200)))
+    lines_Dec = np.concatenate((rng.uniform(-89, 89, 200), rng.integers(-89, 90, 200).astype(float)))
+    # Середины и углы граничных ячеек.
+    j, i = np.nonzero(cons.grid == GRID_BOUNDARY)
+    pick = rng.choice(i.size, 500, replace=False)
+    cells_RA = np.concatenate((i[pick] + 0.5, i[pick] + 0.999)) * cons.grid_step
+    cells_Dec = np.concatenate((j[pick] + 0.5, j[pick] + 0.001)) * cons.grid_step - 90
+    RA = np.concatenate((RA, lines_RA, cells_RA))
+    Dec = np.concatenate((Dec, lines_Dec, cells_Dec))
+    # В условных границах у северного полюса при RA > 270 созвездия нет (см. make_stars в synthetic.py).
+    keep = ~((Dec > 80) & (RA > 270))
+    return RA[keep], Dec[keep]
+
+def test_grid(cons):
+    assert cons.grid.shape == (180, 360)
+    assert (cons.grid == GRID_BOUNDARY).any() and (cons.grid != GRID_BOUNDARY).mean() > 0.5
+
+@pytest.mark.parametrize('ser', [False, True])
+def test_many_matches_single(cons, ser):
+    RA, Dec = points(cons)
+    many = cons.whatCons_many(RA, Dec, ser)
+    assert many.shape == RA.shape
+    single = [cons.whatCons(a, d, ser) for a, d in zip(RA.tolist(), Dec.tolist())]
+    assert many.tolist() == single
+    # Без сетки - то же самое.
+    exact = copy.copy(cons)
+    exact.grid = None
+    assert exact.whatCons_many(RA, Dec, ser).tolist() == single
+    assert [exact.whatCons(a, d, ser) for a, d in zip(RA[:300].tolist(), Dec[:300].tolist())] == single[:300]
+
+def test_serpens(cons):
+    RA, Dec = points(cons)
+    plain = cons.whatCons_many(RA, Dec)
+    parts = cons.whatCons_many(RA, Dec, ser=True)
+    assert set(parts[plain == 'Ser'].tolist()) == {'Ser1', 'Ser2'}
+    assert (parts[plain != 'Ser'] == plain[plain != 'Ser']).all()
+
+# Форма результата совпадает с формой массивов координат.
+def test_shape(cons):
+    RA = np.array([[10.0, 100.0], [200.0, 300.0]])
+    Dec = np.array([[-70.0, -10.0], [30.0, 50.0]])
+    result = cons.whatCons_many(RA, Dec)
+    assert result.shape == (2, 2)
+    assert result[1, 0] == cons.whatCons(200.0, 30.0)
+
+# Правка кода модуля (например, normPolygon) меняет контрольную сумму - кэш границ и сетка строятся заново.
+def test_hash_includes_code(cons, in_synthetic_root, tmp_path, monkeypatch):
+    import constellations
+    assert cons.hashBoundaries() == cons.source_hash
+    code = tmp_path / 'constellations.py'
+    with open(constellations.filename_code, 'rb') as f:
+        code.write_bytes(f.read() + b'\n# changed\n')
+    monkeypatch.setattr(constellations, 'filename_code', str(code))
+    assert cons.hashBoundaries() != cons.source_hash
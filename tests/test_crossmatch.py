@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+#
+# Тесты отождествления звёзд по координатам (crossmatch.py).
+#
+# Дмитрий Клыков, 2025. dyuk108.ru
+
+import numpy as np
+
+from crossmatch import CrossMatch
+
+# Каталог: пара близких звёзд (10″) разной яркости, одиночная звезда у 0h и звезда без координат.
+RA = np.array([100.0, 100.0, 359.999, np.nan])
+Dec = np.array([20.0, 20.0 + 10 / 3600, 0.0, 0.0])
+Vmag = np.array([5.0, 9.0, 7.0, 6.0])
+
+def test_match():
+    cm = CrossMatch(RA, Dec, Vmag)
+    assert len(cm) == 3
+    match = cm.match([0.001, 100.0, 200.0], [0.0, 20.0 + 5 / 3600, 0.0], radius=30)
+    # Через 0h: 0.002° = 7.2″.
+    assert match['index'][0] == 2 and np.isclose(match['sep'][0], 7.2, atol=1e-3)
+    # Две звезды в радиусе - неоднозначно.
+    assert match['ambiguous'].tolist() == [False, True, False]
+    assert match['count'].tolist() == [1, 2, 0]
+    assert match['index'][1] == -1
+    # Далеко от всех звёзд.
+    assert match['index'][2] == -1 and np.isnan(match['sep'][2])
+
+# Разница звёздных величин снимает неоднозначность.
+def test_dmag():
+    cm = CrossMatch(RA, Dec, Vmag)
+    match = cm.match([100.0, 100.0, 100.0], [20.0 + 5 / 3600] * 3, [5.3, 8.8, np.nan], radius=30, dmag=0.8)
+    assert match['index'].tolist() == [0, 1, -1]
+    assert match['ambiguous'].tolist() == [False, False, False]
+    # Меньший радиус: подходит только ближайшая звезда.
+    assert cm.match([100.0], [20.0 + 1 / 3600], radius=3)['index'].tolist() == [0]
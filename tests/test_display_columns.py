@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+#
+# Тесты полей для показа звёзд (display_columns.py).
+#
+# Дмитрий Клыков, 2025. dyuk108.ru
+
+import numpy as np
+
+from display_columns import display_columns, to_greek
+
+def test_to_greek():
+    assert to_greek('alf') == 'α' and to_greek('pi.02') == 'π²' and to_greek('c') == 'c'
+
+def test_labels():
+    table = {'HIP': np.array([32349, 65477, 104214, 117863, 25, 65378]), \
+        'Vmag': np.array([-1.44, 4.01, 5.2, 7.5, 9.0, 2.2]), \
+        'Plx': np.array([379.21, 40.19, 287.13, 0.0, np.nan, 41.73]), \
+        'Bayer': np.array(['alf', 'pi.02', '', '', '', 'zet']), \
+        'Bayer_cst': np.array(['CMa', 'UMa', 'Cyg', 'Cas', '', 'UMa']), \
+        'Fl': np.array([9, 0, 61, 0, 0, 79]), \
+        'VarID': np.array(['', '', 'V1803 Cyg', 'V639 Cas', '', 'zet01 UMa']), \
+        'Name': np.array(['Sirius', '', '', '', '', 'Mizar']), \
+        'Name_r': np.array(['Сириус', '', '', '', '', 'Мицар'])}
+    columns = display_columns(table)
+    assert columns['Bayer_greek'].tolist() == ['α', 'π²', '', '', '', 'ζ']
+    assert columns['Label'].tolist() == ['α CMa (Sirius)', 'π² UMa', '61 Cyg', 'V639 Cas', 'HIP 25', 'ζ UMa (Mizar)']
+    assert columns['Label_r'][0] == 'α CMa (Сириус)'
+    assert np.isclose(columns['Dist_pc'][0], 1000 / 379.21)
+    assert np.isclose(columns['M_V'][0], -1.44 + 5 + 5 * np.log10(0.37921))
+    assert np.isnan(columns['Dist_pc'][3:5]).all() and np.isnan(columns['M_V'][3:5]).all()
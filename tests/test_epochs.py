@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+#
+# Тесты переноса положений на другую эпоху (epochs.py).
+#
+# Дмитрий Клыков, 2025. dyuk108.ru
+
+from datetime import date, datetime
+
+import numpy as np
+
+from epochs import Epochs, julian_epoch, epoch_keys
+
+# Звезда Барнарда (Hipparcos, J1991.25) и её положение J2000 по SIMBAD: 269.452075, +4.693391.
+barnard = dict(RA=[269.45402263], Dec=[4.66828815], pmRA=[-797.84], pmDE=[10326.93], Plx=[549.01])
+
+def test_julian_epoch():
+    assert julian_epoch('J2016.5') == 2016.5 and julian_epoch(2000) == 2000.0
+    assert julian_epoch(datetime(2000, 1, 1, 12)) == 2000.0
+    assert np.isclose(julian_epoch(date(2000, 1, 1)), 2000.0 - 0.5 / 365.25)
+    assert epoch_keys(2000) == ('RAdeg_J2000', 'DEdeg_J2000')
+
+def test_barnard():
+    RA, Dec = Epochs(**barnard).at('J2000')
+    assert abs(RA[0] - 269.452075) < 2e-5 and abs(Dec[0] - 4.693391) < 2e-5
+
+# Без параллакса - линейно; без собственного движения - на месте; эпоха Hipparcos - без изменений.
+def test_linear_and_cache():
+    pos = Epochs([10.0, 20.0], [60.0, -5.0], [3600.0, 0.0], [-3600.0, np.nan], [np.nan, 5.0])
+    RA, Dec = pos.at(1992.25)
+    assert np.isclose(RA[0], 10 + 1e-3 / np.cos(np.radians(60))) and np.isclose(Dec[0], 60 - 1e-3)
+    assert np.isclose(RA[1], 20.0) and np.isclose(Dec[1], -5.0)
+    assert pos.at(1992.25)[0] is RA # из кэша
+    assert not RA.flags.writeable
+    RA, Dec = pos.at(1991.25)
+    assert RA.tolist() == [10.0, 20.0] and Dec.tolist() == [60.0, -5.0]
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+#
+# Тесты чтения файлов с полями фиксированной ширины (fixed_width.py): пустые и короткие строки,
+# переводы строк Windows, пустые и нечисловые значения.
+#
+# Дмитрий Клыков, 2025. dyuk108.ru
+
+import numpy as np
+
+from fixed_width import FixedWidthFile
+
+lines = [b'  1 12.50 Sirius', b'', b'  2       Vega  ', b'  3  x.yz', b'  4  1.25']
+
+def write(tmp_path, data, name = 'cat.dat'):
+    filename = str(tmp_path / name)
+    with open(filename, 'wb') as f:
+        f.write(data)
+    return filename
+
+def test_nulls(tmp_path):
+    f = FixedWidthFile(write(tmp_path, b'\n'.join(lines) + b'\n'))
+    assert len(f) == 4 # пустая строка пропущена
+    assert f.ints(1, 3).tolist() == [1, 2, 3, 4]
+    values = f.floats(5, 9)
+    assert values[0] == 12.5 and values[3] == 1.25
+    assert np.isnan(values[1]) and np.isnan(values[2]) # пусто и нечисловое значение
+    assert f.nulls(5, 9).tolist() == [False, True, False, False]
+    # Короткие строки дополняются пробелами.
+    assert f.strings(11, 16).tolist() == ['Sirius', 'Vega', '', '']
+    assert f.strings(11, 17, strip=False).tolist() == ['Sirius ', 'Vega   ', '       ', '       ']
+
+def test_read_rows(tmp_path):
+    f = FixedWidthFile(write(tmp_path, b'\n'.join(lines)))
+    columns = f.read([('HIP', 1, 3, 'i'), ('Vmag', 5, 9, 'f'), ('Name', 11, 16)], rows=np.array([3, 0]))
+    assert columns['HIP'].tolist() == [4, 1]
+    assert columns['Vmag'].tolist() == [1.25, 12.5]
+    assert columns['Name'].tolist() == ['', 'Sirius']
+
+# Переводы строк Windows, строки короче min_length, пустой файл.
+def test_crlf_and_empty(tmp_path):
+    f = FixedWidthFile(write(tmp_path, b'\r\n'.join(lines) + b'\r\n'), min_length=5)
+    assert len(f) == 4
+    assert f.strings(11, 17).tolist() == ['Sirius', 'Vega', '', '']
+    assert len(FixedWidthFile(write(tmp_path, b'', 'empty.dat'))) == 0
+
+# Поиск концов строк кусками даёт то же, что и целиком.
+def test_block_size(tmp_path):
+    filename = write(tmp_path, b'\n'.join(lines * 50))
+    whole = FixedWidthFile(filename)
+    for block_size in (1, 7, 16, 1000):
+        f = FixedWidthFile(filename, block_size=block_size)
+        assert f.starts.tolist() == whole.starts.tolist()
+        assert f.lengths.tolist() == whole.lengths.tolist()
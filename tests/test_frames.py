@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+#
+# Тесты перевода координат (frames.py) по известным точкам.
+#
+# Дмитрий Клыков, 2025. dyuk108.ru
+
+import numpy as np
+import pytest
+
+from frames import transform
+
+# Угловое расстояние (градусы) с учётом перехода долготы через 0.
+def lon_diff(a, b):
+    return abs((a - b + 180) % 360 - 180)
+
+def test_galactic():
+    # Центр Галактики (Sgr A*) и северный полюс Галактики.
+    l, b = transform(266.40506655, -28.93616241, 'icrs', 'galactic')
+    assert lon_diff(l, 0) < 1e-3 and abs(b) < 1e-3
+    l, b = transform(192.85948, 27.12825, 'icrs', 'galactic')
+    assert np.isclose(b, 90, atol=1e-4)
+
+def test_ecliptic():
+    # Точка летнего солнцестояния: RA 90°, Dec - наклон эклиптики.
+    lon, lat = transform(90, 23.4392911, 'icrs', 'ecliptic')
+    assert np.isclose(lon, 90, atol=1e-4) and abs(lat) < 1e-4
+    lon, lat = transform(0, 90, 'icrs', 'ecliptic') # северный полюс мира
+    assert np.isclose(lon, 90, atol=1e-4) and np.isclose(lat, 90 - 23.4392911, atol=1e-4)
+
+# Перевод туда и обратно, массивы сохраняют форму.
+def test_round_trip():
+    rng = np.random.default_rng(1)
+    RA = rng.uniform(0, 360, (4, 5))
+    Dec = np.degrees(np.arcsin(rng.uniform(-1, 1, (4, 5))))
+    for frame in ('galactic', 'ecliptic'):
+        lon, lat = transform(RA, Dec, 'icrs', frame)
+        assert lon.shape == RA.shape
+        RA2, Dec2 = transform(lon, lat, frame, 'icrs')
+        assert lon_diff(RA2, RA).max() < 1e-9 and np.abs(Dec2 - Dec).max() < 1e-9
+
+def test_unknown_frame():
+    with pytest.raises(ValueError):
+        transform(0, 0, 'icrs', 'fk4')
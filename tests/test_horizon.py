@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+#
+# Тесты горизонтальных координат (horizon.py) по известным значениям.
+#
+# Дмитрий Клыков, 2025. dyuk108.ru
+
+from datetime import datetime, timezone
+
+import numpy as np
+
+from horizon import Horizon, julian_date, gmst, refraction
+
+vega = (279.23473479, 38.78368896)
+moscow = dict(lat=55.75, lon=37.62)
+
+def test_julian_date():
+    assert julian_date(np.datetime64('2000-01-01T12:00')) == 2451545.0
+    assert julian_date(datetime(2000, 1, 1, 12, tzinfo=timezone.utc)) == 2451545.0
+    assert julian_date(2451545.5) == 2451545.5
+    assert julian_date(np.array(['2000-01-02T12:00'], dtype='datetime64[s]')).tolist() == [2451546.0]
+
+def test_gmst():
+    assert np.isclose(gmst(2451545.0), 280.46061837)
+
+# Вега над Москвой 2025-01-01 в 20:00 UTC: высота 6.094°, азимут 344.373°.
+def test_vega():
+    sky = Horizon([vega[0]], [vega[1]], **moscow)
+    t = np.datetime64('2025-01-01T20:00')
+    alt, az = sky.altaz(t)
+    assert abs(alt[0] - 6.094) < 0.01 and abs(az[0] - 344.373) < 0.01
+    assert sky.visible(t).tolist() == [0]
+    assert sky.visible(t, min_alt=10).tolist() == []
+
+# Рефракция поднимает звезду; для массива моментов - матрица моменты x звёзды.
+def test_refraction_and_times():
+    t = np.datetime64('2025-01-01T20:00')
+    alt = Horizon([vega[0]], [vega[1]], **moscow).altaz(t)[0][0]
+    alt_r = Horizon([vega[0]], [vega[1]], refraction=True, **moscow).altaz(t)[0][0]
+    assert np.isclose(alt_r - alt, refraction(np.float32(alt)), atol=1e-4) and alt_r > alt
+    sky = Horizon([vega[0], 0.0], [vega[1], -89.0], **moscow)
+    times = t + np.arange(3) * np.timedelta64(1, 'h')
+    alt, az = sky.altaz(times, chunk_size=2)
+    assert alt.shape == (3, 2) and (alt[:, 1] < 0).all()
+    one = sky.altaz(times[1])
+    assert np.allclose(alt[1], one[0]) and np.allclose(az[1], one[1])
+    assert [rows.tolist() for rows in sky.visible(times)] == [[0]] * 3
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+#
+# Тесты указателя обозначений звёзд (identifiers.py).
+#
+# Дмитрий Клыков, 2025. dyuk108.ru
+
+import pickle
+
+from identifiers import normalize_id, IdIndex
+
+def test_normalize_id():
+    assert normalize_id('* tet  Aur') == 'the Aur'
+    assert normalize_id('V* alf Ori') == 'alf Ori'
+    assert normalize_id('** alf Cen') == 'alf Cen'
+    assert normalize_id('HD48915') == 'HD 48915'
+    assert normalize_id('HIP  32349') == 'HIP 32349'
+    assert normalize_id(' Sirius ') == 'Sirius'
+
+def make_index():
+    ids = IdIndex()
+    ids.add('HD 48915', 32349, source='HD')
+    ids.add('* alf CMa', 32349, source='bayer')
+    ids.add('Sirius', 32349)
+    return ids
+
+def test_resolve():
+    ids = make_index()
+    assert len(ids) == 3
+    assert ids.resolve('HD48915') == 32349 and ids.resolve('alf  CMa') == 32349
+    assert ids.resolve('Vega') == 0 and not 'Vega' in ids
+    assert ids.resolve_many(['Sirius', 'Vega']).tolist() == [32349, 0]
+    assert ids.source('HD 48915') == 'HD' and ids.source('Sirius') == ''
+    assert sorted(ids.names(32349)) == ['HD 48915', 'Sirius', 'alf CMa']
+
+# replace=False не заменяет имеющееся обозначение; замена сбрасывает запомненные результаты.
+def test_replace():
+    ids = make_index()
+    ids.add('Sirius', 1, replace=False)
+    assert ids.resolve('Sirius') == 32349
+    ids.add('Sirius', 1, source='except')
+    assert ids.resolve('Sirius') == 1 and ids.source('Sirius') == 'except'
+
+def test_save_load(tmp_path):
+    ids = make_index()
+    filename = str(tmp_path / 'ids.npz')
+    ids.save(filename)
+    loaded = IdIndex.load(filename)
+    assert loaded.ids == ids.ids and loaded.sources == ids.sources
+    restored = pickle.loads(pickle.dumps(ids))
+    assert restored.ids == ids.ids and restored.resolve('HD48915') == 32349
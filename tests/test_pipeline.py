@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+#
+# Тесты механизма сборки по этапам (pipeline.py): ключи этапов и кэш.
+#
+# Дмитрий Клыков, 2025. dyuk108.ru
+
+import os
+from collections import deque
+
+from pipeline import stage, stages, code_hash, Pipeline
+
+# Таблица данных, к которой обращается функция - её значения входят в контрольную сумму кода.
+limits = {'Vmag': 6.5}
+# Имена выполненных этапов. Не список: значения списков, к которым обращается этап, входят в его ключ.
+calls = deque()
+
+def selected(Vmag):
+    return Vmag <= limits['Vmag']
+
+def selected_other(Vmag):
+    return Vmag < limits['Vmag']
+
+@stage('test_source', files=['source.txt'], params=['n'])
+def source(n = 0):
+    calls.append('test_source')
+    with open('source.txt') as f:
+        return f.read() * n
+
+@stage('test_target', deps=['test_source'], outputs=lambda n = 0: [f'target_{n}.txt'], params=['n'])
+def target(text, n = 0):
+    calls.append('test_target')
+    with open(f'target_{n}.txt', 'w') as f:
+        f.write(text)
+    return len(text)
+
+# Ключи этапов test_source и test_target при параметре n.
+def keys(cache_dir, n):
+    pipeline = Pipeline(cache_dir, params={'n': n})
+    return pipeline.key('test_source'), pipeline.key('test_target')
+
+# Код функции и таблицы данных, к которым она обращается, входят в контрольную сумму.
+def test_code_hash(monkeypatch):
+    h = code_hash(selected)
+    assert code_hash(selected) == h
+    assert code_hash(selected_other) != h
+    monkeypatch.setitem(limits, 'Vmag', 9)
+    assert code_hash(selected) != h
+
+# Ключ меняется при изменении исходного файла, параметров и ключа этапа, от которого зависит этап.
+def test_key_invalidation(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'source.txt').write_text('a')
+    cache_dir = str(tmp_path / 'cache')
+    key_source, key_target = keys(cache_dir, 1)
+    assert keys(cache_dir, 1) == (key_source, key_target)
+
+    changed = keys(cache_dir, 2)
+    assert changed[0] != key_source and changed[1] != key_target
+
+    (tmp_path / 'source.txt').write_text('b')
+    changed = keys(cache_dir, 1)
+    assert changed[0] != key_source and changed[1] != key_target
+
+# Этап выполняется заново, только если изменился ключ или нет его выходного файла.
+def test_cache(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'source.txt').write_text('abc')
+    cache_dir = str(tmp_path / 'cache')
+    calls.clear()
+    assert Pipeline(cache_dir, params={'n': 2}).run('test_target') == 6
+    assert list(calls) == ['test_source', 'test_target']
+
+    calls.clear()
+    assert Pipeline(cache_dir, params={'n': 2}).run('test_target') == 6
+    assert list(calls) == []
+
+    os.remove('target_2.txt') # выходной файл зависит от параметра n
+    calls.clear()
+    Pipeline(cache_dir, params={'n': 2}).run('test_target')
+    assert list(calls) == ['test_target']
+    assert os.path.isfile('target_2.txt')
+
+    calls.clear()
+    Pipeline(cache_dir, force=True, params={'n': 2}).run('test_target')
+    assert list(calls) == ['test_source', 'test_target']
+
+# Освобождённый результат загружается из кэша, а не вычисляется заново.
+def test_release(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'source.txt').write_text('x')
+    pipeline = Pipeline(str(tmp_path / 'cache'), params={'n': 3})
+    calls.clear()
+    pipeline.run('test_source')
+    pipeline.release(['test_source'])
+    assert not 'test_source' in pipeline.results
+    assert pipeline.run('test_source') == 'xxx'
+    assert list(calls) == ['test_source']
+
+def test_stages_registered():
+    assert stages['test_target'].deps == ['test_source']
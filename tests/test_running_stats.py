@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+#
+# Тесты статистики измерений по звёздам (running_stats.py): результат по порциям совпадает
+# с вычислением по всем значениям сразу.
+#
+# Дмитрий Клыков, 2025. dyuk108.ru
+
+import numpy as np
+
+from running_stats import RunningStats
+
+# Измерения для 4 строк: у строки 2 - одно, у строки 3 - ни одного, у строки 1 - выброс.
+rows = np.array([0, 1, 0, 1, 2, 0, 1, 1, 1, 1, 0, 1, 1])
+values = np.array([5.0, 6000, 5100, 6100, 7000, 4900, 5900, 6050, 5950, 9900, 5050, 6020, 5980])
+
+def by_row(row):
+    return values[rows == row]
+
+def stats(keep_values = True):
+    result = RunningStats(4, keep_values)
+    result.add(rows[:6], values[:6]) # две порции - объединяются по формуле Чана
+    result.add(rows[6:], values[6:])
+    return result
+
+def test_moments():
+    s = stats(False)
+    assert s.n.tolist() == [4, 8, 1, 0]
+    for row in (0, 1):
+        assert np.isclose(s.mean()[row], by_row(row).mean())
+        assert np.isclose(s.var()[row], by_row(row).var(ddof=1))
+        assert np.isclose(s.err()[row], by_row(row).std(ddof=1) / np.sqrt(by_row(row).size))
+        assert s.min[row] == by_row(row).min() and s.max[row] == by_row(row).max()
+    assert s.mean()[2] == 7000 and np.isnan(s.var()[2])
+    assert np.isnan(s.mean()[3])
+
+def test_median():
+    median = stats().median()
+    assert median[0] == np.median(by_row(0)) and median[1] == np.median(by_row(1))
+    assert median[2] == 7000 and np.isnan(median[3])
+
+# Выброс 9900 отбрасывается при k = 2, строки с малым числом измерений не меняются.
+def test_clipped():
+    clipped = stats().clipped(k=2)
+    assert clipped.n.tolist() == [4, 7, 1, 0]
+    assert np.isclose(clipped.mean()[1], by_row(1)[by_row(1) < 9000].mean())
+    assert np.isclose(clipped.mean()[0], by_row(0).mean())
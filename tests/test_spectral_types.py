@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+#
+# Тесты разбора спектральных классов (spectral_types.py).
+#
+# Дмитрий Клыков, 2025. dyuk108.ru
+
+import numpy as np
+
+from spectral_types import parse_sptype, sptype_columns
+
+def main(sp):
+    return parse_sptype(sp)[0]
+
+def test_parse():
+    c = main('B9.5IIIpe')
+    assert (c.SpClass, c.SpSub, c.LumClass) == ('B', 9.5, 'III')
+    assert set(c.SpPec) == {'p', 'e'}
+    c = main('K2/K3V')
+    assert (c.SpClass, c.SpSub, c.LumClass) == ('K', 2.0, 'V')
+    c = main('C5,4')
+    assert (c.SpClass, c.SpSub) == ('C', 5.0)
+    c = main('gK0')
+    assert (c.SpClass, c.SpSub, c.LumClass) == ('K', 0.0, 'III')
+    c = main('B1Ia+')
+    assert (c.SpClass, c.LumClass) == ('B', 'Ia+')
+    c = main('M')
+    assert c.SpClass == 'M' and np.isnan(c.SpSub) and c.LumClass == ''
+
+# Составной спектр: компоненты по '+', но '+' после Ia - класс светимости.
+def test_composite():
+    components = parse_sptype('G8III + A2V')
+    assert [(c.SpClass, c.SpSub, c.LumClass) for c in components] == [('G', 8.0, 'III'), ('A', 2.0, 'V')]
+    assert len(parse_sptype('B1Ia+')) == 1
+    assert parse_sptype('') == () and parse_sptype('?') == ()
+
+def test_columns():
+    columns = sptype_columns(['', 'A0V', 'K2/K3V'], np.array([2, 0, 1, 2]))
+    assert columns['SpClass'].tolist() == ['K', '', 'A', 'K']
+    assert columns['LumClass'].tolist() == ['V', '', 'V', 'V']
+    assert columns['SpSub'][0] == 2 and np.isnan(columns['SpSub'][1])
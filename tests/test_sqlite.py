@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+#
+# Тесты записи датасета в базу SQLite (writers.py): таблица, полнотекстовый поиск и R-дерево.
+#
+# Дмитрий Клыков, 2025. dyuk108.ru
+
+import sqlite3
+
+from test_writers import keys, make_table, write
+from writers import SqliteWriter
+
+def test_sqlite(tmp_path):
+    table = make_table()
+    filename = str(tmp_path / 'stars.sqlite')
+    write(SqliteWriter(filename, keys), table)
+    db = sqlite3.connect(filename)
+    rows = db.execute('SELECT HIP, HD, Vmag, Cst, Name FROM stars ORDER BY HIP').fetchall()
+    assert rows == [(7, 224700, 6.1, None, None), (25, None, None, 'Cet', None), \
+        (32349, 48915, -1.44, 'CMa', 'Sirius'), (91262, 172167, 0.03, 'Lyr', 'Vega')]
+    assert db.execute("SELECT rowid FROM stars_fts WHERE stars_fts MATCH 'Vega'").fetchall() == [(91262,)]
+    found = db.execute('SELECT id FROM stars_rtree WHERE minRA >= 100 AND maxRA <= 102').fetchall()
+    assert found == [(32349,)]
+    db.close()
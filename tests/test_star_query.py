@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+#
+# Тесты поиска звёзд (star_query.py): конус и прямоугольник через 0h, ближайшие звёзды, поиск по номерам.
+#
+# Дмитрий Клыков, 2025. dyuk108.ru
+
+import numpy as np
+
+from star_query import StarQuery
+
+columns = {'HIP': np.array([1, 2, 3, 4, 5, 6]), \
+    'HD': np.array([10, 0, 30, 40, 50, 60]), \
+    'RAdeg': np.array([359.5, 0.5, 5.0, 180.0, 358.0, np.nan]), \
+    'DEdeg': np.array([0.0, 0.2, -3.0, 0.0, 8.0, 0.0]), \
+    'Vmag': np.array([3.0, 6.0, 4.0, 1.0, 5.0, 2.0]), \
+    'Cst': np.array(['Psc', 'Psc', 'Cet', 'Vir', 'Peg', ''])}
+
+def test_box_across_0h():
+    stars = StarQuery(columns)
+    assert stars.box(350, 10, -5, 5).tolist() == [0, 1, 2]
+    assert stars.box(350, 10, -5, 10, vmag=5).tolist() == [0, 2, 4]
+    assert stars.box(350, 10, -5, 5, where={'Cst': 'Psc'}).tolist() == [0, 1]
+    assert stars.box(1, 359, -5, 5).tolist() == [2, 3]
+
+# Конус вокруг 0h: звёзды по возрастанию расстояния.
+def test_cone_across_0h():
+    stars = StarQuery(columns)
+    assert stars.cone(0, 0, 1).tolist() == [0, 1]
+    assert stars.cone(359.9, 0, 1).tolist() == [0, 1]
+    assert stars.cone(0, 0, 10, vmag=4).tolist() == [0, 2]
+    found = stars.cone([0, 180], [0, 0], 1)
+    assert [rows.tolist() for rows in found] == [[0, 1], [3]]
+
+def test_nearest():
+    stars = StarQuery(columns)
+    rows, sep = stars.nearest(0.4, 0.2, k=2)
+    assert rows.tolist() == [1, 0] and np.isclose(sep[0], 0.1, atol=1e-6)
+    rows, sep = stars.nearest(0, 0, k=2, where={'Cst': {'Cet', 'Vir'}})
+    assert rows.tolist() == [2, 3]
+    rows, sep = stars.nearest(0, 0, k=3, radius=2)
+    assert rows.tolist() == [0, 1, -1] and np.isnan(sep[2])
+
+def test_lookup():
+    stars = StarQuery(columns)
+    assert stars.hip([4, 6, 99]).tolist() == [3, 5, -1]
+    assert stars.hd([30, 0, 99]).tolist() == [2, -1, -1]
+    assert stars.hip([4], vmag=0.5).tolist() == [-1]
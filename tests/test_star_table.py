@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+#
+# Тесты таблицы звёзд по столбцам (star_table.py).
+#
+# Дмитрий Клыков, 2025. dyuk108.ru
+
+import numpy as np
+
+from star_table import StarTable, SortedColumns
+
+def make_table():
+    table = StarTable([5, 3, 9, 1], categorical=('Cst',))
+    table.set('Vmag', [1.0, 2.0, np.nan, 4.0])
+    table.set('Cst', ['Ori', '', 'Ori', 'CMa'])
+    return table
+
+def test_rows():
+    table = make_table()
+    assert table.rows([9, 1, 2, '5']).tolist() == [2, 3, -1, 0]
+    assert StarTable([]).rows([1]).tolist() == [-1]
+
+def test_categorical():
+    table = make_table()
+    assert table.categories['Cst'] == ['', 'CMa', 'Ori']
+    assert table.columns['Cst'].tolist() == [2, 0, 2, 1]
+    assert table['Cst'].tolist() == ['Ori', '', 'Ori', 'CMa']
+    table.set('Cst', ['UMa'], rows=[1])
+    assert table['Cst'].tolist() == ['Ori', 'UMa', 'Ori', 'CMa']
+
+# Новое поле для части строк: остальные - пустые значения.
+def test_set_rows():
+    table = make_table()
+    table.set('Plx', [10.5], rows=[2])
+    assert np.isnan(table['Plx'][[0, 1, 3]]).all() and table['Plx'][2] == 10.5
+    table.set('Name', ['Sirius'], rows=[3])
+    table.set('Name', ['Betelgeuse'], rows=[0]) # длиннее прежних строк
+    assert table['Name'].tolist() == ['Betelgeuse', '', '', 'Sirius']
+
+# Дополнение полями другого каталога: звёзды, которых нет в таблице, пропускаются.
+def test_update():
+    table = make_table()
+    table.update({'HIP': np.array([1, 7, 5]), 'HD': np.array([100, 200, 300])})
+    assert table['HD'].tolist() == [300, 0, 0, 100]
+
+def test_text_and_copy():
+    table = make_table()
+    assert table.text('Vmag', '.2f') == ['1.00', '2.00', '', '4.00']
+    assert table.text('HIP') == ['5', '3', '9', '1']
+    assert table.text('Missing') == [''] * 4
+    copy = table.copy()
+    copy.set('Cst', ['Lyr'], rows=[0])
+    copy.columns['Vmag'][0] = 0
+    assert table['Cst'][0] == 'Ori' and table['Vmag'][0] == 1.0
+
+# Каждая порция таблицы получает строки другого каталога только из своего диапазона HIP.
+def test_sorted_columns():
+    sorted_columns = SortedColumns({'HIP': np.array([9, 2, 5, 2]), 'HD': np.array([90, 20, 50, 21])})
+    assert len(sorted_columns) == 4
+    part = sorted_columns.part(StarTable([1, 2, 3]))
+    assert part['HIP'].tolist() == [2, 2] and part['HD'].tolist() == [20, 21]
+    assert sorted_columns.part(StarTable([4, 9]))['HD'].tolist() == [50, 90]
+    assert len(sorted_columns.part(StarTable([]))['HIP']) == 0
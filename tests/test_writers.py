@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+#
+# Тесты записи датасета (writers.py): записанное порциями читается обратно без изменений.
+#
+# Дмитрий Клыков, 2025. dyuk108.ru
+
+import numpy as np
+import pytest
+
+from star_query import read_csv
+from star_table import StarTable
+from writers import CsvWriter, ExcelCsvWriter, ArrowWriter, NpyWriter, load_npy
+
+keys = ['HIP', 'HD', 'RAdeg', 'DEdeg', 'Vmag', 'Cst', 'SpType', 'Name']
+
+def make_table():
+    table = StarTable([32349, 91262, 25, 7], categorical=('Cst', 'SpType'))
+    table.set('HD', [48915, 172167, 0, 224700])
+    table.set('RAdeg', [101.28715539, 279.23473479, 0.08, 359.9])
+    table.set('DEdeg', [-16.71611582, 38.78368896, -10.5, 45.0])
+    table.set('Vmag', [-1.44, 0.03, np.nan, 6.1])
+    table.set('Cst', ['CMa', 'Lyr', 'Cet', ''])
+    table.set('SpType', ['A0m...', 'A0Vvar', 'C0,0 (F8pe)', ''])
+    table.set('Name', ['Sirius', 'Vega', '', ''])
+    return table
+
+# Запись двумя порциями, как при потоковой сборке.
+def write(writer, table):
+    writer.write(table_part(table, [0, 1]))
+    writer.write(table_part(table, [2, 3]))
+    writer.close()
+
+def table_part(table, rows):
+    part = table.copy()
+    part.columns = {name: values[rows] for name, values in table.columns.items()}
+    return part
+
+def text(table, key):
+    return table.text(key)
+
+def test_csv(tmp_path):
+    table = make_table()
+    filename = str(tmp_path / 'stars.csv')
+    write(CsvWriter(filename, keys, text), table)
+    columns = read_csv(filename)
+    assert list(columns) == keys
+    assert columns['HD'].tolist() == table['HD'].tolist()
+    assert columns['SpType'].tolist() == table['SpType'].tolist() # значение с запятой - в кавычках
+    assert np.array_equal(columns['Vmag'], table['Vmag'], equal_nan=True)
+
+def test_excel_csv(tmp_path):
+    table = make_table()
+    filename = str(tmp_path / 'stars_excel.csv')
+    write(ExcelCsvWriter(filename, keys, text, keys_text=('SpType',)), table)
+    with open(filename, encoding='cp1251') as f:
+        lines = f.read().splitlines()
+    assert lines[0] == ';'.join(keys)
+    assert lines[1].split(';')[4] == '-1,44' and lines[1].split(';')[6] == 'A0m...'
+
+def test_parquet(tmp_path):
+    pytest.importorskip('pyarrow')
+    import pyarrow.parquet
+    table = make_table()
+    filename = str(tmp_path / 'stars.parquet')
+    write(ArrowWriter(filename, keys), table)
+    result = pyarrow.parquet.read_table(filename).to_pydict()
+    assert result['HIP'] == table['HIP'].tolist()
+    assert result['HD'] == [48915, 172167, None, 224700]
+    assert result['Vmag'] == [-1.44, 0.03, None, 6.1]
+    assert result['Cst'] == ['CMa', 'Lyr', 'Cet', None]
+    assert result['Name'] == ['Sirius', 'Vega', None, None]
+
+def test_npy(tmp_path):
+    table = make_table()
+    dirname = str(tmp_path / 'npy')
+    write(NpyWriter(dirname, keys), table)
+    columns = load_npy(dirname)
+    assert sorted(columns) == sorted(keys)
+    for key in keys:
+        assert np.array_equal(columns[key], table[key], equal_nan=columns[key].dtype.kind == 'f')